@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+import io
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 from pydantic import BaseModel
 
 from app.database import get_db
-from app.models.car import Car, CarCreate
+from app.writes import create_row, insert_row
+from app.cache import invalidate_car
+from app.export import MEDIA_TYPES, export_response
+from app.ingest import FORMATS as IMPORT_FORMATS, import_cars
+from app.serializers import model_serializer, projection_serializer
+from app.models.car import Car, CarCreate, car_index
 from app.models.car_inventory import CarInventory
 from app.models.user import User, UserUpdate
 from app.models.order import Order
 from app.models.order_item import OrderItem
 from app.models.purchase import PurchaseModel
 from app.models.employee import Employee, EmployeeCreate
+from app.models.review import ReviewModel
+from app.models.car_review_stats import rebuild_review_stats
 
 class EmployeeUpdate(BaseModel):
     name: Optional[str] = None
@@ -40,24 +50,46 @@ class StockUpdate(BaseModel):
 
 admin_router = APIRouter()
 
-# Helper function to convert SQLAlchemy model to dict
-def model_to_dict(obj):
-    if obj is None:
-        return None
-    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+# Row -> dict serializers, compiled once at import
+users_out = model_serializer(User)
+orders_out = model_serializer(Order)
+order_items_out = model_serializer(OrderItem)
+purchases_out = model_serializer(PurchaseModel)
+employees_out = model_serializer(Employee)
+reviews_out = model_serializer(ReviewModel)
+
+def cars_with_stock():
+    return (
+        select(*model_serializer(Car).columns, func.coalesce(CarInventory.quantity, 0).label("quantity"))
+        .outerjoin(CarInventory, Car.car_id == CarInventory.car_id)
+        .order_by(Car.car_id)
+    )
+
+cars_with_stock_out = projection_serializer("car_with_stock", cars_with_stock())
 
 @admin_router.post("/admin/cars", response_model=dict)
 def create_car(car: CarCreate, db: Session = Depends(get_db)):
-    db_car = Car(**car.dict())
-    db.add(db_car)
-    db.commit()
-    db.refresh(db_car)
-    # Also create an inventory entry
-    inventory = CarInventory(car_id=db_car.car_id, quantity=10) # Default quantity
-    db.add(inventory)
+    db_car = insert_row(db, Car, car.dict())
+    # Also create an inventory entry, in the same transaction
+    insert_row(db, CarInventory, {"car_id": db_car.car_id, "quantity": 10}) # Default quantity
     db.commit()
+    car_index.invalidate()
+    invalidate_car(db_car.car_id)
     return {"message": "Car created successfully", "car_id": db_car.car_id}
 
+@admin_router.post("/admin/cars/import", response_model=dict)
+def import_car_feed(data: bytes = Body(..., media_type="text/csv"), fmt: str = Query("csv", alias="format")):
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format: {fmt}")
+    try:
+        feed = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Feed must be UTF-8 encoded")
+    progress = []
+    summary = import_cars(io.StringIO(feed, newline=None), fmt, on_batch=progress.append)
+    summary["batches"] = progress
+    return summary
+
 @admin_router.put("/admin/cars/{car_id}", response_model=dict)
 def update_car(car_id: int, car_update: CarUpdate, db: Session = Depends(get_db)):
     db_car = db.query(Car).filter(Car.car_id == car_id).first()
@@ -68,6 +100,8 @@ def update_car(car_id: int, car_update: CarUpdate, db: Session = Depends(get_db)
         setattr(db_car, key, value)
     db.commit()
     db.refresh(db_car)
+    car_index.invalidate()
+    invalidate_car(car_id)
     return {"message": "Car updated successfully", "car_id": db_car.car_id}
 
 @admin_router.put("/admin/cars/{car_id}/stock", response_model=dict)
@@ -80,6 +114,7 @@ def update_car_stock(car_id: int, stock_update: StockUpdate, db: Session = Depen
     else:
         db_inventory.quantity = stock_update.quantity
     db.commit()
+    invalidate_car(car_id)
     return {"message": "Car stock updated successfully", "car_id": car_id}
 
 
@@ -92,41 +127,34 @@ def delete_car(car_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Car not found")
     db.delete(db_car)
     db.commit()
+    car_index.invalidate()
+    invalidate_car(car_id)
     return {"message": "Car deleted successfully", "car_id": car_id}
 
 @admin_router.get("/admin/cars", response_model=List[dict])
 def get_all_cars(db: Session = Depends(get_db)):
-    results = db.query(Car, CarInventory.quantity).outerjoin(CarInventory, Car.car_id == CarInventory.car_id).all()
-    cars_list = []
-    for car, quantity in results:
-        car_dict = model_to_dict(car)
-        car_dict['quantity'] = quantity if quantity is not None else 0
-        cars_list.append(car_dict)
-    return cars_list
+    return cars_with_stock_out.rows(db.execute(cars_with_stock()))
 
 @admin_router.get("/admin/cars/{car_id}", response_model=dict)
 def get_car_details(car_id: int, db: Session = Depends(get_db)):
-    result = db.query(Car, CarInventory.quantity).outerjoin(CarInventory, Car.car_id == CarInventory.car_id).filter(Car.car_id == car_id).first()
+    result = db.execute(cars_with_stock().filter(Car.car_id == car_id)).first()
     if not result:
         raise HTTPException(status_code=404, detail="Car not found")
-    car, quantity = result
-    car_dict = model_to_dict(car)
-    car_dict['quantity'] = quantity if quantity is not None else 0
-    return car_dict
+    return cars_with_stock_out.from_row(result)
 
 @admin_router.get("/admin/users", response_model=List[dict])
 def get_all_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return [model_to_dict(user) for user in users]
+    return users_out.rows(db.execute(select(*users_out.columns)))
 
 @admin_router.get("/admin/users/{user_id}", response_model=dict)
 def get_user_details(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).options(joinedload(User.purchases), joinedload(User.reviews)).filter(User.user_id == user_id).first()
+    # One IN query per collection instead of a purchases x reviews join
+    user = db.query(User).options(selectinload(User.purchases), selectinload(User.reviews)).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user_dict = model_to_dict(user)
-    user_dict["purchases"] = [model_to_dict(p) for p in user.purchases]
-    user_dict["reviews"] = [model_to_dict(r) for r in user.reviews]
+    user_dict = users_out(user)
+    user_dict["purchases"] = purchases_out.objects(user.purchases)
+    user_dict["reviews"] = reviews_out.objects(user.reviews)
     return user_dict
 
 @admin_router.put("/admin/users/{user_id}", response_model=dict)
@@ -152,56 +180,50 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 
 @admin_router.get("/admin/orders", response_model=List[dict])
 def get_all_orders(db: Session = Depends(get_db)):
-    orders = db.query(Order).all()
-    return [model_to_dict(order) for order in orders]
+    return orders_out.rows(db.execute(select(*orders_out.columns)))
 
 @admin_router.get("/admin/orders/{order_id}", response_model=dict)
 def get_order_details(order_id: int, db: Session = Depends(get_db)):
-    order = db.query(Order).options(joinedload(Order.order_items)).filter(Order.order_id == order_id).first()
+    order = db.query(Order).options(selectinload(Order.order_items)).filter(Order.order_id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    order_dict = model_to_dict(order)
-    order_dict["order_items"] = [model_to_dict(item) for item in order.order_items]
+    order_dict = orders_out(order)
+    order_dict["order_items"] = order_items_out.objects(order.order_items)
     return order_dict
 
 @admin_router.get("/admin/order-items", response_model=List[dict])
 def get_all_order_items(db: Session = Depends(get_db)):
-    order_items = db.query(OrderItem).all()
-    return [model_to_dict(item) for item in order_items]
+    return order_items_out.rows(db.execute(select(*order_items_out.columns)))
 
 @admin_router.get("/admin/order-items/{order_item_id}", response_model=dict)
 def get_order_item_details(order_item_id: int, db: Session = Depends(get_db)):
     item = db.query(OrderItem).filter(OrderItem.order_item_id == order_item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Order Item not found")
-    return model_to_dict(item)
+    return order_items_out(item)
 
 @admin_router.get("/admin/purchases", response_model=List[dict])
 def get_all_purchases(db: Session = Depends(get_db)):
-    purchases = db.query(PurchaseModel).all()
-    return [model_to_dict(p) for p in purchases]
+    return purchases_out.rows(db.execute(select(*purchases_out.columns)))
 
 @admin_router.get("/admin/purchases/{purchase_id}", response_model=dict)
 def get_purchase_details(purchase_id: int, db: Session = Depends(get_db)):
-    purchase = db.query(PurchaseModel).options(joinedload(PurchaseModel.orders), joinedload(PurchaseModel.user)).filter(PurchaseModel.purchase_id == purchase_id).first()
+    # The many-to-one user joins in; the orders collection loads separately so it cannot multiply rows
+    purchase = db.query(PurchaseModel).options(selectinload(PurchaseModel.orders), joinedload(PurchaseModel.user)).filter(PurchaseModel.purchase_id == purchase_id).first()
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
-    purchase_dict = model_to_dict(purchase)
-    purchase_dict["orders"] = [model_to_dict(o) for o in purchase.orders]
-    purchase_dict["user"] = model_to_dict(purchase.user)
+    purchase_dict = purchases_out(purchase)
+    purchase_dict["orders"] = orders_out.objects(purchase.orders)
+    purchase_dict["user"] = users_out(purchase.user)
     return purchase_dict
 
 @admin_router.get("/admin/employees", response_model=List[dict])
 def get_all_employees(db: Session = Depends(get_db)):
-    employees = db.query(Employee).all()
-    return [model_to_dict(employee) for employee in employees]
+    return employees_out.rows(db.execute(select(*employees_out.columns)))
 
 @admin_router.post("/admin/employees", response_model=dict)
 def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
-    db_employee = Employee(**employee.dict())
-    db.add(db_employee)
-    db.commit()
-    db.refresh(db_employee)
+    db_employee = create_row(db, Employee, employee.dict())
     return {"message": "Employee created successfully", "employee_id": db_employee.emp_id}
 
 @admin_router.put("/admin/employees/{employee_id}", response_model=dict)
@@ -224,3 +246,27 @@ def delete_employee(employee_id: int, db: Session = Depends(get_db)):
     db.delete(db_employee)
     db.commit()
     return {"message": "Employee deleted successfully", "employee_id": employee_id}
+
+# Streaming exports of the admin lists: resource -> Core select, in primary-key order.
+# Password hashes are left out of the users export.
+EXPORTS = {
+    "cars": cars_with_stock,
+    "users": lambda: select(*[c for c in User.__table__.c if c.name != "password"]).order_by(User.user_id),
+    "orders": lambda: select(Order.__table__).order_by(Order.order_id),
+    "order-items": lambda: select(OrderItem.__table__).order_by(OrderItem.order_item_id),
+    "purchases": lambda: select(PurchaseModel.__table__).order_by(PurchaseModel.purchase_id),
+    "employees": lambda: select(Employee.__table__).order_by(Employee.emp_id),
+}
+
+@admin_router.get("/admin/export/{resource}")
+def export_resource(resource: str, fmt: str = Query("ndjson", alias="format")):
+    if resource not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {resource}")
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {fmt}")
+    return export_response(EXPORTS[resource](), fmt, resource)
+
+@admin_router.post("/admin/review-stats/rebuild", response_model=dict)
+def rebuild_car_review_stats(db: Session = Depends(get_db)):
+    cars = rebuild_review_stats(db)
+    return {"message": "Review stats rebuilt successfully", "cars": cars}
\ No newline at end of file
@@ -0,0 +1,76 @@
+# app/async_routes.py
+import functools
+import inspect
+
+from fastapi import APIRouter, Depends
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+
+def make_async_endpoint(endpoint):
+    """Wrap a sync `db: Session` endpoint as a coroutine on an AsyncSession.
+
+    The wrapped body runs through `AsyncSession.run_sync`, which drives the
+    ORM over the asyncio driver inside a greenlet. Database waits therefore
+    yield to the event loop instead of holding a threadpool thread.
+    """
+    signature = inspect.signature(endpoint)
+    parameters = [
+        param.replace(annotation=AsyncSession, default=Depends(get_async_db)) if name == "db" else param
+        for name, param in signature.parameters.items()
+    ]
+
+    @functools.wraps(endpoint)
+    async def async_endpoint(**kwargs):
+        db = kwargs.pop("db")
+        return await db.run_sync(lambda session: endpoint(db=session, **kwargs))
+
+    async_endpoint.__signature__ = signature.replace(parameters=parameters)
+    return async_endpoint
+
+def make_async_router(router: APIRouter) -> APIRouter:
+    """Return a copy of `router` whose database-backed routes run on the async stack.
+
+    Every route keeps its order and all its APIRoute settings, so both
+    stacks expose the same API and OpenAPI schema. A route already holds
+    the router's tags, dependencies, responses and callbacks, so the copy
+    takes only the prefix from the router.
+    """
+    async_router = APIRouter(prefix=router.prefix)
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        endpoint = route.endpoint
+        if "db" in inspect.signature(endpoint).parameters:
+            endpoint = make_async_endpoint(endpoint)
+        async_router.add_api_route(
+            route.path[len(router.prefix):],
+            endpoint,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=list(route.methods),
+            operation_id=route.operation_id,
+            response_model_include=route.response_model_include,
+            response_model_exclude=route.response_model_exclude,
+            response_model_by_alias=route.response_model_by_alias,
+            response_model_exclude_unset=route.response_model_exclude_unset,
+            response_model_exclude_defaults=route.response_model_exclude_defaults,
+            response_model_exclude_none=route.response_model_exclude_none,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+            route_class_override=type(route),
+            callbacks=route.callbacks,
+            openapi_extra=route.openapi_extra,
+            generate_unique_id_function=route.generate_unique_id_function,
+        )
+    return async_router
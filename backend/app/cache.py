@@ -0,0 +1,94 @@
+# app/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+class LRUCache:
+    """Thread-safe read-through LRU cache with hit/miss counters.
+
+    Writers call `invalidate(key)` after they commit. A load that started
+    before an invalidation is not stored, so a reader racing a write can
+    never put the pre-write value back. `ttl` bounds staleness for writes
+    committed by other worker processes.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: Optional[float] = 300.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value, generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable):
+        """Return the cached value for `key`, calling `loader()` on a miss. None is never cached."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        generation = self._generation
+        value = loader()
+        if value is not None:
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+# Catalog caches, invalidated by the write paths that change them
+category_cache = LRUCache("categories", maxsize=256)
+car_cache = LRUCache("cars", maxsize=4096)
+car_detail_cache = LRUCache("car_details", maxsize=4096)
+
+CATALOG_CACHES = (category_cache, car_cache, car_detail_cache)
+
+def invalidate_car(car_id: int):
+    car_cache.invalidate(car_id)
+    car_detail_cache.invalidate(car_id)
@@ -0,0 +1,139 @@
+# app/car_index.py
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, NamedTuple, Optional, Sequence, Set
+
+from sqlalchemy.orm import Session
+
+# Columns buyers can pick several values of at once
+FACET_FIELDS = ("manufacturer", "engine_type", "transmission", "color", "category_id")
+# Columns buyers filter with a [min, max] range
+RANGE_FIELDS = ("year", "price", "mileage", "seating_capacity")
+
+def _facet_key(value):
+    return value.lower() if isinstance(value, str) else value
+
+class _Snapshot(NamedTuple):
+    """One build of the index; replaced whole, so a search never mixes two builds."""
+    rows: Dict[int, dict]
+    available: Set[int]
+    facets: Dict[str, Dict[object, set]]
+    labels: Dict[str, Dict[object, object]]
+    ranges: Dict[str, tuple]
+
+EMPTY_SNAPSHOT = _Snapshot({}, set(), {}, {}, {})
+
+class CarFacetIndex:
+    """In-process inverted index over the car catalog for faceted search.
+
+    The whole catalog is loaded once into per-value posting sets and sorted
+    range arrays. Admin writes call `invalidate()` and the next search
+    rebuilds; `max_age` bounds staleness for writes made by other workers.
+    """
+
+    def __init__(self, model, max_age: float = 300.0):
+        self.model = model
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._snapshot = EMPTY_SNAPSHOT
+
+    def invalidate(self):
+        self._built_at = None
+
+    def _is_fresh(self):
+        return self._built_at is not None and time.monotonic() - self._built_at < self.max_age
+
+    def _build(self, db: Session):
+        columns = [c.name for c in self.model.__table__.columns]
+        rows = {}
+        facets = {field: {} for field in FACET_FIELDS}
+        labels = {field: {} for field in FACET_FIELDS}
+        ranged = {field: [] for field in RANGE_FIELDS}
+        for row in db.query(*[getattr(self.model, c) for c in columns]).order_by(self.model.car_id):
+            car = dict(zip(columns, row))
+            car_id = car["car_id"]
+            rows[car_id] = car
+            for field in FACET_FIELDS:
+                value = car[field]
+                if value is None:
+                    continue
+                key = _facet_key(value)
+                facets[field].setdefault(key, set()).add(car_id)
+                labels[field].setdefault(key, value)
+            for field in RANGE_FIELDS:
+                if car[field] is not None:
+                    ranged[field].append((car[field], car_id))
+        ranges = {}
+        for field, pairs in ranged.items():
+            pairs.sort()
+            ranges[field] = ([p[0] for p in pairs], [p[1] for p in pairs])
+        available = {car_id for car_id, car in rows.items() if car["available"]}
+        self._snapshot = _Snapshot(rows, available, facets, labels, ranges)
+        self._built_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session) -> _Snapshot:
+        """Rebuild if stale; returns the build to search, which a concurrent rebuild leaves intact."""
+        if not self._is_fresh():
+            with self._lock:
+                if not self._is_fresh():
+                    self._build(db)
+        return self._snapshot
+
+    @staticmethod
+    def _range_ids(index: _Snapshot, field, low, high) -> set:
+        values, ids = index.ranges[field]
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+        return set(ids[start:end])
+
+    @staticmethod
+    def _facet_ids(index: _Snapshot, field, wanted: Sequence) -> set:
+        postings = index.facets[field]
+        ids = set()
+        for value in wanted:
+            ids |= postings.get(_facet_key(value), set())
+        return ids
+
+    def search(self, db: Session, facets: Dict[str, Sequence], ranges: Dict[str, tuple],
+               available_only: bool = False, skip: int = 0, limit: int = 100):
+        """Return matching cars plus per-facet value counts.
+
+        A facet's counts apply every filter except that facet's own, so the
+        filter panel can show how many cars each additional value would add.
+        """
+        index = self.ensure_fresh(db)
+        base: Optional[set] = None
+        for field, (low, high) in ranges.items():
+            if low is None and high is None:
+                continue
+            ids = self._range_ids(index, field, low, high)
+            base = ids if base is None else base & ids
+        if available_only:
+            base = set(index.available) if base is None else base & index.available
+
+        selected = {field: self._facet_ids(index, field, values) for field, values in facets.items() if values}
+
+        def intersect(skip_field=None) -> set:
+            result = set(index.rows) if base is None else set(base)
+            for field, ids in selected.items():
+                if field != skip_field:
+                    result &= ids
+            return result
+
+        matches = intersect()
+        counts = {}
+        for field in FACET_FIELDS:
+            pool = intersect(field) if field in selected else matches
+            counts[field] = {}
+            for key, ids in index.facets[field].items():
+                hits = len(ids & pool)
+                if hits:
+                    counts[field][index.labels[field][key]] = hits
+        ordered = sorted(matches)
+        return {
+            "total": len(ordered),
+            "cars": [index.rows[car_id] for car_id in ordered[skip:skip + limit]],
+            "facets": counts,
+        }
@@ -0,0 +1,127 @@
+# app/car_page.py
+"""Everything the car detail page shows, in one statement.
+
+CarDetail.jsx used to call /cars/{id}/details, /reviews/cars/{id}/reviews
+and /users/{uid}/purchase-for-car/{id}: five or more queries per view.
+/cars/{id}/page returns the car, its stock, its rating, the first page of
+visible reviews with usernames and, given ?user_id=, the purchase that lets
+that user review the car, from a single SELECT. Each part is a LATERAL
+subquery joined ON true, so the car's columns repeat once per review row.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.pagination import encode_cursor
+from app.serializers import RowSerializer
+from app.models.car import Car, CarResponse, car_out, generate_car_description
+from app.models.car_inventory import CarInventory
+from app.models.car_review_stats import CarReviewStats
+from app.models.review import ReviewModel, ReviewResponse
+from app.models.user import User
+from app.models.purchase import PurchaseModel
+from app.models.order import Order
+from app.models.order_item import OrderItem
+
+class CarPageResponse(BaseModel):
+    car: CarResponse
+    review_count: int = 0
+    reviews: List[ReviewResponse]
+    reviews_next_cursor: Optional[str] = None  # continue with /reviews/cars/{id}/reviews?cursor=
+    purchase_id: Optional[int] = None  # the caller's paid purchase of this car, if any
+
+router = APIRouter(tags=["cars"])
+
+cars = Car.__table__
+inventory = CarInventory.__table__
+stats = CarReviewStats.__table__
+reviews = ReviewModel.__table__
+users = User.__table__
+purchases = PurchaseModel.__table__
+orders = Order.__table__
+order_items = OrderItem.__table__
+
+def page_statement(car_id: int, user_id: Optional[int], review_limit: int, lateral: bool = True):
+    """The page query. Without LATERAL (SQLite) each part filters on the bound car_id instead."""
+    car_key = cars.c.car_id if lateral else car_id
+
+    def as_from(query, name):
+        return query.lateral(name) if lateral else query.subquery(name)
+
+    stock = as_from(
+        select(func.sum(inventory.c.quantity).label("quantity")).where(inventory.c.car_id == car_key),
+        "stock",
+    )
+    eligible = as_from(
+        select(purchases.c.purchase_id)
+        .join(orders, orders.c.purchase_id == purchases.c.purchase_id)
+        .join(order_items, order_items.c.order_id == orders.c.order_id)
+        .where(purchases.c.user_id == user_id, purchases.c.status == "paid", order_items.c.car_id == car_key)
+        .limit(1),
+        "eligible",
+    )
+    page = as_from(
+        select(*reviews.columns, users.c.username)
+        .outerjoin(users, users.c.user_id == reviews.c.user_id)
+        .where(reviews.c.car_id == car_key, reviews.c.is_visible == True)
+        .order_by(reviews.c.review_id)
+        .limit(review_limit),
+        "page",
+    )
+
+    extras = [stock.c.quantity, stats.c.avg_rating, stats.c.review_count]
+    if user_id is not None:
+        extras.append(eligible.c.purchase_id.label("eligible_purchase_id"))
+    statement = (
+        select(*car_out.columns, *extras, *page.columns)
+        .select_from(cars)
+        .outerjoin(stock, true())
+        .outerjoin(stats, stats.c.car_id == cars.c.car_id)
+    )
+    if user_id is not None:
+        statement = statement.outerjoin(eligible, true())
+    statement = statement.outerjoin(page, true()).where(cars.c.car_id == car_id).order_by(page.c.review_id)
+    return statement
+
+# Rows are split positionally: car columns and the page extras, then the review columns
+car_page_out = RowSerializer("car_page_car", [*car_out.columns, inventory.c.quantity, stats.c.avg_rating])
+_review_columns = [*reviews.columns, users.c.username]
+car_page_review_out = RowSerializer("car_page_review", _review_columns)
+
+def get_car_page(db: Session, car_id: int, user_id: Optional[int] = None, review_limit: int = 10):
+    lateral = db.get_bind().dialect.name == "postgresql"
+    rows = db.execute(page_statement(car_id, user_id, review_limit, lateral)).all()
+    if not rows:
+        return None
+    first = rows[0]
+    car = car_page_out.from_row(first)
+    car["rating"] = car.pop("avg_rating")
+    car["description"] = generate_car_description(db, first)
+    review_rows = [row[-len(_review_columns):] for row in rows if row.review_id is not None]
+    page_reviews = car_page_review_out.rows(review_rows)
+    next_cursor = None
+    if page_reviews and len(page_reviews) == review_limit:
+        next_cursor = encode_cursor([page_reviews[-1]["review_id"]])
+    return {
+        "car": car,
+        "review_count": first.review_count or 0,
+        "reviews": page_reviews,
+        "reviews_next_cursor": next_cursor,
+        "purchase_id": first.eligible_purchase_id if user_id is not None else None,
+    }
+
+@router.get("/cars/{car_id}/page", response_model=CarPageResponse)
+def read_car_page(
+    car_id: int,
+    user_id: Optional[int] = None,
+    review_limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    car_page = get_car_page(db, car_id, user_id, review_limit)
+    if car_page is None:
+        raise HTTPException(status_code=404, detail="Car not found")
+    return car_page
@@ -0,0 +1,112 @@
+# app/checkout.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, conint, conlist
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.cache import invalidate_car
+from app.models.car import Car
+from app.models.user import User
+from app.models.purchase import PurchaseModel, PurchaseResponse
+from app.models.order import Order, OrderResponse
+from app.models.order_item import OrderItem, OrderItemResponse
+from app.models.reservation import confirm_hold, reserve_stock
+
+class CheckoutItem(BaseModel):
+    car_id: int
+    quantity: conint(gt=0) = 1
+    hold_id: Optional[int] = None  # confirm this reservation instead of taking new stock
+
+class CheckoutRequest(BaseModel):
+    user_id: int
+    items: conlist(CheckoutItem, min_items=1)
+    payment_method: Optional[str] = None
+    shipping_address: Optional[str] = None
+
+class CheckoutResponse(BaseModel):
+    purchase: PurchaseResponse
+    order: OrderResponse
+    items: List[OrderItemResponse]
+
+router = APIRouter(tags=["checkout"])
+
+cars = Car.__table__
+users = User.__table__
+purchases = PurchaseModel.__table__
+orders = Order.__table__
+order_items = OrderItem.__table__
+
+def _take_stock(db: Session, item: CheckoutItem):
+    if item.hold_id is None:
+        if reserve_stock(db, item.car_id, item.quantity) is None:
+            raise HTTPException(status_code=409, detail=f"Not enough stock for car {item.car_id}")
+        return
+    hold = confirm_hold(db, item.hold_id)
+    if hold is None or hold.car_id != item.car_id or hold.quantity != item.quantity:
+        raise HTTPException(status_code=409, detail=f"Hold {item.hold_id} is not an active hold for this item")
+
+def place_order(db: Session, request: CheckoutRequest) -> dict:
+    """Create the purchase, order, order items and stock decrement in one transaction.
+
+    Rows come back through RETURNING, so nothing is refreshed; any failure
+    rolls the whole sale back.
+    """
+    try:
+        car_ids = {item.car_id for item in request.items}
+        listed = {
+            row.car_id: row
+            for row in db.execute(select(cars.c.car_id, cars.c.price, cars.c.available).where(cars.c.car_id.in_(car_ids)))
+        }
+        for car_id in car_ids:
+            if car_id not in listed:
+                raise HTTPException(status_code=404, detail=f"Car {car_id} not found")
+            if not listed[car_id].available or listed[car_id].price is None:
+                raise HTTPException(status_code=409, detail=f"Car {car_id} is not for sale")
+        # Lock inventory rows in car_id order, so carts listing the same cars in a different order cannot deadlock
+        for item in sorted(request.items, key=lambda item: item.car_id):
+            _take_stock(db, item)
+
+        amount = sum(listed[item.car_id].price * item.quantity for item in request.items)
+        # Selecting from users makes an unknown user_id insert nothing instead of a second lookup
+        purchase = db.execute(
+            insert(purchases)
+            .from_select(
+                ["user_id", "amount", "payment_method", "status"],
+                select(users.c.user_id, literal(amount), literal(request.payment_method), literal("pending"))
+                .where(users.c.user_id == request.user_id),
+            )
+            .returning(*purchases.columns)
+        ).one_or_none()
+        if purchase is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        order = db.execute(
+            insert(orders)
+            .values(purchase_id=purchase.purchase_id, status="processing", shipping_address=request.shipping_address)
+            .returning(*orders.columns)
+        ).one()
+        items = db.execute(
+            insert(order_items).returning(*order_items.columns, sort_by_parameter_order=True),
+            [
+                {
+                    "order_id": order.order_id,
+                    "car_id": item.car_id,
+                    "quantity": item.quantity,
+                    "price_at_order": listed[item.car_id].price,
+                }
+                for item in request.items
+            ],
+        ).all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for car_id in car_ids:
+        invalidate_car(car_id)
+    return {"purchase": purchase, "order": order, "items": items}
+
+@router.post("/checkout", response_model=CheckoutResponse)
+def checkout(request: CheckoutRequest, db: Session = Depends(get_db)):
+    return place_order(db, request)
@@ -1,13 +1,21 @@
 # app/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
+from app.pool import engine_options
 
 load_dotenv()  # Load environment variables from .env
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# "sync" serves routes from Starlette's threadpool, "async" awaits the database on the event loop
+DATABASE_MODE = os.getenv("DATABASE_MODE", "sync").lower()
+# "serverless" (the default on Vercel) skips import-time DDL, pools nothing and loads routers lazily
+APP_PROFILE = os.getenv("APP_PROFILE", "serverless" if os.getenv("VERCEL") else "server").lower()
+SERVERLESS = APP_PROFILE == "serverless"
+
+engine = create_engine(DATABASE_URL, **engine_options(make_url(DATABASE_URL), serverless=SERVERLESS))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -16,4 +24,35 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def async_database_url(url: str):
+    """Map a sync DATABASE_URL onto its asyncio driver, returning (url, connect_args)."""
+    url = make_url(url)
+    query = dict(url.query)
+    connect_args = {}
+    if url.drivername.startswith("postgresql"):
+        # asyncpg takes TLS settings as a connect argument, not libpq URL options
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode and sslmode not in ("disable", "allow", "prefer"):
+            connect_args["ssl"] = True
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif url.drivername.startswith("sqlite"):
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url, connect_args
+
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_MODE == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    _async_url, _connect_args = async_database_url(os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL)
+    _async_options = engine_options(_async_url, is_async=True, serverless=SERVERLESS)
+    _async_options["connect_args"] = {**_connect_args, **_async_options.get("connect_args", {})}
+    async_engine = create_async_engine(_async_url, **_async_options)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=True)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
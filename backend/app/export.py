@@ -0,0 +1,57 @@
+# app/export.py
+"""Streaming NDJSON / CSV exports of whole tables.
+
+Rows are read through a server-side cursor in fixed-size batches on a
+connection owned by the response body, and each batch is flushed as soon as
+it is encoded, so memory stays flat and the first byte goes out before the
+table has been read.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import StreamingResponse
+
+from app.database import engine
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _ndjson(columns, batch):
+    return "".join(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in batch)
+
+def _csv(batch):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(batch)
+    return buffer.getvalue()
+
+def iter_export(statement, fmt: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield the rows of a Core select encoded as NDJSON lines or CSV, one batch at a time."""
+    columns = [column.name for column in statement.selected_columns]
+    if fmt == "csv":
+        # Header goes out before the query runs
+        yield _csv([columns])
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(statement)
+        for batch in result.partitions(batch_size):
+            yield _ndjson(columns, batch) if fmt == "ndjson" else _csv(batch)
+
+def export_response(statement, fmt: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        iter_export(statement, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,99 @@
+# app/hashing.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+from sqlalchemy.util import await_only
+
+from app.database import SERVERLESS
+from app.pool import LatencyHistogram
+
+# bcrypt work factor for new hashes; existing hashes verify at the cost they were made with
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Worker processes for hashing; 0 hashes inline on the calling thread. Serverless
+# runtimes cannot keep a process pool alive between invocations, so they default to 0.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "0" if SERVERLESS else str(min(4, os.cpu_count() or 1))))
+# Requests allowed to wait for a worker before new ones are rejected
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))
+
+# Password hashing context
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+class HashingBusy(Exception):
+    """Raised when every hashing worker is busy and the wait queue is full."""
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+class PasswordHasher:
+    """Runs bcrypt in a size-capped process pool so it never competes with request threads."""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.capacity = workers + queue_limit
+        self.latency = LatencyHistogram()
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise HashingBusy()
+            self.in_flight += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._done(started)
+            raise
+        future.add_done_callback(lambda _: self._done(started))
+        return future
+
+    def _done(self, started: float):
+        self.latency.observe(time.perf_counter() - started)
+        with self._lock:
+            self.in_flight -= 1
+
+    def run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        future = self._submit(fn, *args)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Threadpool request: block only this thread while a worker hashes
+            return future.result()
+        # Async stack (inside AsyncSession.run_sync): yield the event loop while waiting
+        return await_only(asyncio.wrap_future(future))
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self.in_flight
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "capacity": self.capacity,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot(),
+        }
+
+hasher = PasswordHasher(HASH_WORKERS, HASH_QUEUE_LIMIT)
+
+def hash_password(password: str) -> str:
+    return hasher.run(_hash, password)
+
+def verify_password(password: str, hashed: str) -> bool:
+    return hasher.run(_verify, password, hashed)
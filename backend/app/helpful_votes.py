@@ -0,0 +1,158 @@
+# app/helpful_votes.py
+"""Buffered "helpful" votes on reviews.
+
+A vote appends a row to review_helpful_votes, and the endpoint answers
+only once that row has committed. Appends share no row, so voters on a
+popular review never wait on each other or on the review's row lock.
+Every HELPFUL_FLUSH_INTERVAL seconds the flusher folds the log into
+reviews.helpful_count, one batch per transaction. Each transaction
+deletes a batch of log rows, locks the reviews they name in review_id
+order and adds the counts with one batched UPDATE. The log lives in the
+database, so any worker's flusher drains the votes taken by every
+worker, serverless instances included.
+
+Durability is at-least-once from the moment a vote is acknowledged. A
+crash never loses a logged vote. A failed flush rolls back its delete
+along with its update, so the votes stay in the log for the next pass.
+A flush whose commit acknowledgement is lost has removed its log rows in
+that same commit, so it is not applied twice.
+"""
+import logging
+import os
+import threading
+from collections import Counter
+
+from sqlalchemy import Integer, bindparam, column, delete, func, insert, select, update, values
+from sqlalchemy.orm import Session
+
+from app.database import SERVERLESS, SessionLocal
+from app.query_cache import table_versions
+
+# Seconds between flushes; 0 folds every vote in right after it is logged. Serverless
+# instances do not live long enough to run a flusher, so they default to 0.
+HELPFUL_FLUSH_INTERVAL = float(os.getenv("HELPFUL_FLUSH_INTERVAL", "0" if SERVERLESS else "2"))
+# Logged votes folded in per transaction
+HELPFUL_FLUSH_BATCH = 10000
+
+logger = logging.getLogger(__name__)
+
+class HelpfulVoteBuffer:
+    """Votes logged in `log` and not yet added to `table`'s helpful_count."""
+
+    def __init__(self, table, log):
+        self.table = table
+        self.log = log
+        # An append per click that no report reads; keep it off the shared version rows
+        table_versions.ignore(log.name)
+        self._flush_lock = threading.Lock()
+        self.flushes = 0
+        self.flushed_votes = 0
+        self.failed_flushes = 0
+
+    def add(self, db: Session, review_id: int):
+        """Log one vote in the caller's transaction; it is durable once that commits."""
+        db.execute(insert(self.log).values(review_id=review_id))
+
+    def pending(self, db: Session, review_id: int) -> int:
+        return db.execute(select(func.count()).select_from(self.log).where(self.log.c.review_id == review_id)).scalar_one()
+
+    def _flush_batch(self, db: Session) -> int:
+        reviews, log = self.table, self.log
+        is_postgresql = db.get_bind().dialect.name == "postgresql"
+        # Concurrent flushers skip each other's batches instead of queueing behind them
+        batch_ids = select(log.c.vote_id).order_by(log.c.vote_id).limit(HELPFUL_FLUSH_BATCH).with_for_update(skip_locked=True)
+        voted = db.execute(delete(log).where(log.c.vote_id.in_(batch_ids)).returning(log.c.review_id)).scalars().all()
+        if not voted:
+            db.rollback()
+            return 0
+        ordered = sorted(Counter(voted).items())
+        helpful_count = func.coalesce(reviews.c.helpful_count, 0)
+        if is_postgresql:
+            # The UPDATE's join may lock rows in any order; locking them here in key order
+            # first keeps two flushers with overlapping batches from deadlocking
+            db.execute(
+                select(reviews.c.review_id)
+                .where(reviews.c.review_id.in_([review_id for review_id, _ in ordered]))
+                .order_by(reviews.c.review_id)
+                .with_for_update()
+            )
+            deltas = values(column("review_id", Integer), column("votes", Integer), name="deltas").data(ordered)
+            db.execute(
+                update(reviews)
+                .where(reviews.c.review_id == deltas.c.review_id)
+                .values(helpful_count=helpful_count + deltas.c.votes)
+            )
+        else:
+            db.execute(
+                update(reviews)
+                .where(reviews.c.review_id == bindparam("delta_review_id"))
+                .values(helpful_count=helpful_count + bindparam("delta_votes")),
+                [{"delta_review_id": review_id, "delta_votes": votes} for review_id, votes in ordered],
+            )
+        db.commit()
+        return len(voted)
+
+    def flush(self) -> int:
+        """Fold every logged vote into the reviews, a batch per transaction. Returns the number of votes written."""
+        total = 0
+        with self._flush_lock:
+            while True:
+                db = SessionLocal()
+                try:
+                    written = self._flush_batch(db)
+                except Exception:
+                    # The batch's log rows were rolled back with it; the next flush retries them
+                    self.failed_flushes += 1
+                    raise
+                finally:
+                    db.close()
+                if written:
+                    self.flushes += 1
+                    self.flushed_votes += written
+                total += written
+                if written < HELPFUL_FLUSH_BATCH:
+                    return total
+
+    def stats(self) -> dict:
+        db = SessionLocal()
+        try:
+            pending = db.execute(select(func.count()).select_from(self.log)).scalar_one()
+        finally:
+            db.close()
+        return {
+            "pending_votes": pending,
+            "flushes": self.flushes,
+            "flushed_votes": self.flushed_votes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+class HelpfulVoteFlusher:
+    """Daemon thread that flushes a HelpfulVoteBuffer every `interval` seconds."""
+
+    def __init__(self, buffer: HelpfulVoteBuffer, interval: float):
+        self.buffer = buffer
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="helpful-vote-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.buffer.flush()
+        except Exception:
+            logger.exception("final helpful-vote flush failed")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.buffer.flush()
+            except Exception:  # the batch is still in the log; retry on the next pass
+                logger.exception("helpful-vote flush failed")
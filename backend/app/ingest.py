@@ -0,0 +1,240 @@
+# app/ingest.py
+"""Bulk car import from dealer feeds: python -m app.ingest feed.csv [--format ndjson]
+
+Rows are validated in batches; each valid batch is loaded into `cars` and
+`car_inventory` in one transaction. On PostgreSQL the batch is COPYed into a
+temporary staging table and merged with set-based INSERT ... SELECT; other
+databases fall back to executemany. Invalid rows (bad fields, unknown
+category) are reported by row number without aborting their batch.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from pydantic import ValidationError, condecimal, conint, constr
+from sqlalchemy import insert, select, text
+
+from app.database import engine
+from app.models.car import Car, CarCreate, car_index
+from app.models.car_inventory import CarInventory
+from app.models.category import Category
+from app.query_cache import table_versions
+
+INGEST_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000  # per import; later errors are counted but not listed
+DEFAULT_QUANTITY = 10  # stock given to each imported car, as admin.create_car does
+
+FORMATS = ("csv", "ndjson")
+
+# Bounds of a PostgreSQL INTEGER column
+INT_MIN, INT_MAX = -2**31, 2**31 - 1
+
+class CarImportRow(CarCreate):
+    """A feed row, held to the cars column limits so a bad value is a row error rather than a failed COPY."""
+    modelnum: constr(max_length=50)
+    manufacturer: Optional[constr(max_length=100)] = None
+    model_name: Optional[constr(max_length=100)] = None
+    year: Optional[conint(ge=INT_MIN, le=INT_MAX)] = None
+    engine_type: Optional[constr(max_length=50)] = None
+    transmission: Optional[constr(max_length=30)] = None
+    color: Optional[constr(max_length=30)] = None
+    mileage: Optional[conint(ge=INT_MIN, le=INT_MAX)] = None
+    fuel_capacity: Optional[condecimal(max_digits=5, decimal_places=2)] = None
+    seating_capacity: Optional[conint(ge=INT_MIN, le=INT_MAX)] = None
+    price: Optional[condecimal(max_digits=10, decimal_places=2)] = None
+    image_link: Optional[constr(max_length=255)] = None
+    quantity: conint(ge=0, le=INT_MAX) = DEFAULT_QUANTITY
+
+CAR_FIELDS = [name for name in CarCreate.__fields__]
+STAGING_COLUMNS = ["row_number", *CAR_FIELDS, "quantity"]
+
+STAGING_DDL = """
+    CREATE TEMPORARY TABLE car_import_staging (
+        row_number INTEGER NOT NULL,
+        car_id INTEGER,
+        category_id INTEGER NOT NULL,
+        modelnum VARCHAR(50) NOT NULL,
+        manufacturer VARCHAR(100),
+        model_name VARCHAR(100),
+        year INTEGER,
+        engine_type VARCHAR(50),
+        transmission VARCHAR(30),
+        color VARCHAR(30),
+        mileage INTEGER,
+        fuel_capacity NUMERIC(5, 2),
+        seating_capacity INTEGER,
+        price NUMERIC(10, 2),
+        available BOOLEAN NOT NULL,
+        image_link VARCHAR(255),
+        quantity INTEGER NOT NULL
+    ) ON COMMIT DROP
+"""
+
+def iter_records(stream: Iterable[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, record) from CSV or NDJSON lines; unparsable lines yield an Exception."""
+    if fmt == "csv":
+        for row_number, record in enumerate(csv.DictReader(stream), start=1):
+            # Empty cells mean "not given", so the field keeps its default
+            yield row_number, {key: value for key, value in record.items() if key is not None and value not in ("", None)}
+    else:
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as exc:
+                yield row_number, exc
+
+def _batches(records: Iterator, size: int):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _validate(batch):
+    valid, errors = [], []
+    for row_number, record in batch:
+        if isinstance(record, Exception):
+            errors.append({"row": row_number, "errors": [f"Invalid JSON: {record}"]})
+            continue
+        if not isinstance(record, dict):
+            errors.append({"row": row_number, "errors": ["Expected a JSON object"]})
+            continue
+        try:
+            valid.append((row_number, CarImportRow.parse_obj(record)))
+        except ValidationError as exc:
+            errors.append({
+                "row": row_number,
+                "errors": [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()],
+            })
+    return valid, errors
+
+def _copy_rows(valid) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row_number, row in valid:
+        values = row.dict()
+        writer.writerow([row_number] + [r"\N" if values[name] is None else values[name] for name in STAGING_COLUMNS[1:]])
+    buffer.seek(0)
+    return buffer
+
+def _load_postgresql(conn, valid):
+    """COPY the batch into staging, drop rows with unknown categories and merge the rest."""
+    conn.exec_driver_sql(STAGING_DDL)
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY car_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            _copy_rows(valid),
+        )
+    rejected = conn.execute(text("""
+        DELETE FROM car_import_staging s
+        WHERE NOT EXISTS (SELECT 1 FROM categories c WHERE c.category_id = s.category_id)
+        RETURNING s.row_number, s.category_id
+    """)).all()
+    # Allocate the ids up front so the inventory rows can refer to them without a join back
+    conn.execute(text("UPDATE car_import_staging SET car_id = nextval(pg_get_serial_sequence('cars', 'car_id'))"))
+    loaded = conn.execute(text(f"""
+        INSERT INTO cars (car_id, {', '.join(CAR_FIELDS)}, added_date)
+        SELECT car_id, {', '.join(CAR_FIELDS)}, CURRENT_DATE FROM car_import_staging ORDER BY row_number
+    """)).rowcount
+    conn.execute(text("""
+        INSERT INTO car_inventory (car_id, quantity)
+        SELECT car_id, quantity FROM car_import_staging ORDER BY row_number
+    """))
+    return loaded, rejected
+
+def _load_generic(conn, valid):
+    category_ids = {row.category_id for _, row in valid}
+    known = set(conn.execute(select(Category.category_id).where(Category.category_id.in_(category_ids))).scalars())
+    rejected = [(row_number, row.category_id) for row_number, row in valid if row.category_id not in known]
+    valid = [(row_number, row) for row_number, row in valid if row.category_id in known]
+    if not valid:
+        return 0, rejected
+    car_ids = conn.execute(
+        insert(Car.__table__).returning(Car.__table__.c.car_id, sort_by_parameter_order=True),
+        [row.dict(exclude={"quantity"}) for _, row in valid],
+    ).scalars().all()
+    conn.execute(
+        insert(CarInventory.__table__),
+        [{"car_id": car_id, "quantity": row.quantity} for car_id, (_, row) in zip(car_ids, valid)],
+    )
+    return len(car_ids), rejected
+
+def import_cars(
+    stream: Iterable[str],
+    fmt: str = "csv",
+    batch_size: int = INGEST_BATCH_SIZE,
+    on_batch: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Import cars with their inventory rows; returns totals, rows/s and per-row errors."""
+    load = _load_postgresql if engine.dialect.name == "postgresql" else _load_generic
+    totals = {"rows": 0, "loaded": 0, "rejected": 0, "errors": []}
+    started = time.perf_counter()
+    for number, batch in enumerate(_batches(iter_records(stream, fmt), batch_size), start=1):
+        batch_started = time.perf_counter()
+        valid, errors = _validate(batch)
+        loaded = 0
+        if valid:
+            # The batch bypasses the Session hooks, so it marks its tables changed for the report caches
+            with engine.begin() as conn:
+                loaded, unknown = load(conn, valid)
+                if loaded:
+                    table_versions.publish(conn, ("cars", "car_inventory"))
+            if loaded:
+                table_versions.bump(("cars", "car_inventory"))
+            errors += [{"row": row_number, "errors": [f"category_id: unknown category {category_id}"]}
+                       for row_number, category_id in unknown]
+        totals["rows"] += len(batch)
+        totals["loaded"] += loaded
+        totals["rejected"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(totals["errors"])
+        totals["errors"] += sorted(errors, key=lambda error: error["row"])[:max(room, 0)]
+        if on_batch is not None:
+            elapsed = time.perf_counter() - batch_started
+            on_batch({
+                "batch": number,
+                "rows": len(batch),
+                "loaded": loaded,
+                "rejected": len(errors),
+                "rows_per_second": round(len(batch) / elapsed, 1) if elapsed else None,
+            })
+    if totals["loaded"]:
+        car_index.invalidate()
+    elapsed = time.perf_counter() - started
+    totals["seconds"] = round(elapsed, 3)
+    totals["rows_per_second"] = round(totals["rows"] / elapsed, 1) if elapsed and totals["rows"] else None
+    return totals
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import cars and their inventory from CSV or NDJSON.")
+    parser.add_argument("path", help="feed file, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    def report(progress):
+        print(
+            f"batch {progress['batch']}: {progress['loaded']}/{progress['rows']} loaded, "
+            f"{progress['rejected']} rejected, {progress['rows_per_second']} rows/s",
+            flush=True,
+        )
+
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    with stream:
+        summary = import_cars(stream, fmt, args.batch_size, on_batch=report)
+    for error in summary["errors"]:
+        print(f"row {error['row']}: {'; '.join(error['errors'])}", file=sys.stderr)
+    print(
+        f"Imported {summary['loaded']} of {summary['rows']} rows ({summary['rejected']} rejected) "
+        f"in {summary['seconds']} s, {summary['rows_per_second']} rows/s"
+    )
+    sys.exit(1 if summary["rejected"] else 0)
@@ -0,0 +1,51 @@
+# app/internal.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.cache import CATALOG_CACHES
+from app.database import DATABASE_MODE, engine, async_engine, get_db
+from app.pool import pool_stats
+from app.query_cache import report_cache
+from app.hashing import hasher
+from app.models.reservation import sweep_expired_holds
+from app.models.review import helpful_votes
+from app.models.employee_shipment_stats import check_shipment_stats, rebuild_shipment_stats
+from app.models.sales_rollup import refresh_all_sales_rollups
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+@router.get("/cache")
+def read_cache_stats():
+    return [cache.stats() for cache in (*CATALOG_CACHES, report_cache)]
+
+@router.get("/pool")
+def read_pool_stats():
+    return pool_stats(async_engine if DATABASE_MODE == "async" else engine)
+
+@router.get("/hashing")
+def read_hashing_stats():
+    return hasher.stats()
+
+@router.post("/holds/sweep")
+def sweep_holds():
+    return {"expired": sweep_expired_holds()}
+
+@router.get("/helpful-votes")
+def read_helpful_vote_stats():
+    return helpful_votes.stats()
+
+@router.post("/helpful-votes/flush")
+def flush_helpful_votes():
+    return {"flushed": helpful_votes.flush()}
+
+@router.get("/shipment-stats/check")
+def check_shipment_stats_endpoint(db: Session = Depends(get_db)):
+    drift = check_shipment_stats(db)
+    return {"consistent": not drift, "drift": drift}
+
+@router.post("/shipment-stats/rebuild")
+def rebuild_shipment_stats_endpoint(db: Session = Depends(get_db)):
+    return {"employees": rebuild_shipment_stats(db)}
+
+@router.post("/sales-rollups/refresh")
+def refresh_sales_rollups_endpoint():
+    return {"days": refresh_all_sales_rollups()}
@@ -1,11 +1,13 @@
 # app/main.py
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.models import category, car, user, employee, car_inventory, car_inventory_log, purchase, order, order_item, shipping, review
-from app import queries
-from app.admin import admin_router
+from app.database import DATABASE_MODE, SERVERLESS
+from app.pagination import NEXT_CURSOR_HEADER
+from app.serverless import LazyRoutersMiddleware
+from app.hashing import HashingBusy
 
 app = FastAPI(title="Car Purchase API")
 
@@ -22,25 +24,82 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-# Create all database tables
-Base.metadata.create_all(bind=engine)
-
-# Include routers
-app.include_router(category.router)
-app.include_router(car.router)
-app.include_router(user.router)
-app.include_router(employee.router)
-app.include_router(car_inventory.router)
-app.include_router(car_inventory_log.router)
-app.include_router(purchase.router)
-app.include_router(order.router)
-app.include_router(order_item.router)
-app.include_router(shipping.router)
-app.include_router(review.router)
-app.include_router(queries.router)
-app.include_router(admin_router)
+# Fail fast when every pooled connection is busy instead of queueing the request
+@app.exception_handler(PoolTimeoutError)
+def pool_exhausted_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+# Shed password work beyond the hashing pool's queue instead of stalling other requests
+@app.exception_handler(HashingBusy)
+def hashing_busy_handler(request: Request, exc: HashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-ins in progress, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+def include_routers():
+    """Import the models and routers and mount them, on the async stack when DATABASE_MODE=async."""
+    from app.models import category, car, user, employee, car_inventory, car_inventory_log, purchase, order, order_item, shipping, review, reservation, sales_rollup
+    from app import queries, internal, checkout, car_page, search
+    from app.admin import admin_router
+    from app.async_routes import make_async_router
+
+    routers = [
+        category.router,
+        car.router,
+        user.router,
+        employee.router,
+        car_inventory.router,
+        car_inventory_log.router,
+        purchase.router,
+        order.router,
+        order_item.router,
+        shipping.router,
+        review.router,
+        reservation.router,
+        checkout.router,
+        sales_rollup.router,
+        car_page.router,
+        search.router,
+        queries.router,
+        admin_router,
+    ]
+    for router in routers:
+        app.include_router(make_async_router(router) if DATABASE_MODE == "async" else router)
+    app.include_router(internal.router)
+    app.openapi_schema = None
+
+if SERVERLESS:
+    # Schema changes run through `python -m app.migrate`; routers load on the first request
+    app.add_middleware(LazyRoutersMiddleware, loader=include_routers)
+else:
+    # Create all database tables
+    from app.migrate import create_tables
+    create_tables()
+    include_routers()
+
+    # Return the stock of abandoned checkout holds; serverless deployments sweep from cron instead
+    from app.models.reservation import hold_sweeper
+    app.add_event_handler("startup", hold_sweeper.start)
+    app.add_event_handler("shutdown", hold_sweeper.stop)
+
+    # Fold logged helpful votes into the reviews in batches; the shutdown hook folds what is left
+    from app.models.review import helpful_vote_flusher
+    app.add_event_handler("startup", helpful_vote_flusher.start)
+    app.add_event_handler("shutdown", helpful_vote_flusher.stop)
+
+    # Fold the days touched by sales writes into the report rollups
+    from app.models.sales_rollup import sales_rollup_refresher
+    app.add_event_handler("startup", sales_rollup_refresher.start)
+    app.add_event_handler("shutdown", sales_rollup_refresher.stop)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,70 @@
+# app/migrate.py
+"""Bring the database schema up to date: python -m app.migrate
+
+Creates missing tables from the models, then applies the numbered SQL
+files in backend/migrations/ that are not yet recorded in
+schema_migrations. Long-running servers only create tables at startup;
+the SQL migrations (index builds on large tables) run only from this
+command.
+"""
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.database import engine, Base
+import app.models  # noqa: F401  register every table on Base.metadata
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+def create_tables():
+    Base.metadata.create_all(bind=engine)
+
+def _statements(sql: str):
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith("--")]
+    # Split on semicolons outside $$-quoted bodies (functions, DO blocks)
+    statements, current = [], ""
+    for index, part in enumerate("\n".join(lines).split("$$")):
+        if index % 2:
+            current += "$$" + part + "$$"
+            continue
+        *complete, current_tail = part.split(";")
+        for chunk in complete:
+            statements.append(current + chunk)
+            current = ""
+        current += current_tail
+    statements.append(current)
+    return [statement.strip() for statement in statements if statement.strip()]
+
+def apply_migrations():
+    """Apply pending SQL migrations in file-name order. Returns the versions applied."""
+    if engine.dialect.name != "postgresql":
+        return []
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.commit()
+        applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+    done = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        if path.stem in applied:
+            continue
+        # CREATE INDEX CONCURRENTLY refuses to run inside a transaction block
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in _statements(path.read_text()):
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": path.stem})
+        done.append(path.stem)
+    return done
+
+def migrate():
+    create_tables()
+    return apply_migrations()
+
+if __name__ == "__main__":
+    applied = migrate()
+    print(f"Applied migrations: {', '.join(applied)}" if applied else "Schema is up to date")
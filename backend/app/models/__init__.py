@@ -10,4 +10,10 @@ from .purchase import PurchaseModel
 from .order import Order
 from .order_item import OrderItem
 from .shipping import Shipping
-from .review import ReviewModel
\ No newline at end of file
+from .review import ReviewModel, HelpfulVoteLog
+from .car_review_stats import CarReviewStats
+from .employee_shipment_stats import EmployeeShipmentStats
+from .category_price_stats import CategoryPriceStats
+from .sales_rollup import SalesDaily, SalesRollupDirty
+from .reservation import InventoryHold
+from app.query_cache import TableVersion
@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import Column, Integer, String, Numeric, Boolean, Date, ForeignKey, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Column, Integer, String, Numeric, Boolean, Date, ForeignKey, select
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
-from typing import List, Optional
-from app.database import get_db, Base
+from typing import Dict, List, Optional
+from app.database import get_db, Base, SessionLocal
+from app.writes import insert_row
+from app.pagination import paginate, set_next_cursor
+from app.car_index import CarFacetIndex
+from app.cache import car_cache, car_detail_cache, invalidate_car
+from app.serializers import model_serializer, projection_serializer
+from app.fast_json import FAST_JSON, fast_json, schema_serializer
 from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
 from app.models.category import Category
 from app.models.review import ReviewModel
 from app.models.car_inventory import CarInventory
 from app.models.car_inventory_log import CarInventoryLog
-from app.models.category import get_category
+from app.models.category import get_category_cached
+from app.models.car_review_stats import CarReviewStats
 
 # Car model
 class Car(Base):
@@ -37,6 +47,9 @@ class Car(Base):
     inventories = relationship("CarInventory", back_populates="car")
     order_items = relationship("OrderItem", back_populates="car")
 
+# Shared faceted-search index; admin write paths invalidate it after commit
+car_index = CarFacetIndex(Car)
+
 # Pydantic models
 class CarBase(BaseModel):
     car_id: int
@@ -85,6 +98,16 @@ class CarWithRating(CarBase):
     class Config:
         orm_mode = True
 
+class CarHomeResponse(BaseModel):
+    top_rated: List[CarWithRating]
+    new_arrivals: List[CarBase]
+    budget_friendly: List[CarBase]
+
+class CarSearchResponse(BaseModel):
+    total: int
+    cars: List[CarBase]
+    facets: Dict[str, Dict[str, int]]
+
 # New endpoint models
 class CarDetail(CarBase):
     inventory: List[dict]
@@ -98,60 +121,114 @@ class CarDetail(CarBase):
 def get_car(db: Session, car_id: int):
     return db.query(Car).filter(Car.car_id == car_id).first()
 
+def get_car_cached(db: Session, car_id: int):
+    def load():
+        car = get_car(db, car_id)
+        return CarBase.from_orm(car) if car else None
+    return car_cache.get_or_load(car_id, load)
+
 def create_car(db: Session, car: CarCreate):
-    db_car = Car(**car.dict())
-    db.add(db_car)
-    db.commit()
-    db.refresh(db_car)
+    db_car = insert_row(db, Car, car.dict())
 
-    # Create a car_inventory entry for the new car
-    db_inventory = CarInventory(car_id=db_car.car_id, quantity=10) # Default quantity 10
-    db.add(db_inventory)
+    # Create a car_inventory entry for the new car, committed together with it
+    insert_row(db, CarInventory, {"car_id": db_car.car_id, "quantity": 10}) # Default quantity 10
     db.commit()
-    db.refresh(db_inventory)
+    car_index.invalidate()
+    invalidate_car(db_car.car_id)
 
     return db_car
 
+# Row serializers for the read paths below; rows are selected as plain tuples, not ORM objects
+car_out = model_serializer(Car)
+car_with_rating_select = select(*car_out.columns, CarReviewStats.avg_rating.label("rating"))
+car_with_rating_out = projection_serializer("car_with_rating", car_with_rating_select)
+car_response_select = select(*car_out.columns, CarInventory.quantity, CarReviewStats.avg_rating.label("rating"))
+car_response_out = projection_serializer("car_response", car_response_select)
+car_list_out = schema_serializer("car_list", CarBase, car_out.columns)
+
 def get_top_rated_cars(db: Session, limit: int = 6):
-    result = (
-        db.query(
-            Car,
-            func.avg(ReviewModel.rating).label("rating"),
-        )
-        .join(ReviewModel, Car.car_id == ReviewModel.car_id, isouter=True)
-        .group_by(Car.car_id)
-        .order_by(func.avg(ReviewModel.rating).desc())
+    # Top-k walk of the avg_rating index instead of aggregating every review
+    statement = (
+        car_with_rating_select
+        .join(CarReviewStats, Car.car_id == CarReviewStats.car_id)
+        .where(CarReviewStats.avg_rating != None)
+        .order_by(CarReviewStats.avg_rating.desc(), CarReviewStats.review_count.desc())
         .limit(limit)
-        .all()
     )
-    cars_with_ratings = []
-    for car, rating in result:
-        car_dict = car.__dict__
-        car_dict['rating'] = rating
-        cars_with_ratings.append(CarWithRating.parse_obj(car_dict))
-    return cars_with_ratings
+    return car_with_rating_out.rows(db.execute(statement))
 
 def get_new_arrivals(db: Session, limit: int = 6):
-    cars = db.query(Car).filter(Car.added_date != None).order_by(Car.added_date.desc()).limit(limit).all()
-    if cars:
-        print("New Arrivals:", [car.car_id for car in cars])
-    
-    return [CarBase.from_orm(car) for car in cars] if cars else []
+    statement = select(*car_out.columns).where(Car.added_date != None).order_by(Car.added_date.desc()).limit(limit)
+    return car_out.rows(db.execute(statement))
 
 def get_budget_friendly_cars(db: Session, limit: int = 6):
-    cars = db.query(Car).filter(Car.price != None).order_by(Car.price.asc()).limit(limit).all()
-    if cars:
-        print("Budget Friendly Cars:", [car.car_id for car in cars])
-    
-    return [CarBase.from_orm(car) for car in cars] if cars else []
-
+    statement = select(*car_out.columns).where(Car.price != None).order_by(Car.price.asc()).limit(limit)
+    return car_out.rows(db.execute(statement))
+
+# Homepage sections, loaded concurrently on separate sessions
+HOME_SECTIONS = {
+    "top_rated": get_top_rated_cars,
+    "new_arrivals": get_new_arrivals,
+    "budget_friendly": get_budget_friendly_cars,
+}
+HOME_CACHE_TTL = 30.0  # seconds a computed homepage bundle is shared across requests
+_home_executor = ThreadPoolExecutor(max_workers=len(HOME_SECTIONS), thread_name_prefix="home-section")
+_home_lock = threading.Lock()
+_home_cache = {"payload": None, "expires_at": 0.0}
+
+def _load_home_section(loader):
+    db = SessionLocal()
+    try:
+        return loader(db)
+    finally:
+        db.close()
+
+def get_home_bundle():
+    """Return every homepage section, recomputing at most once per TTL."""
+    if _home_cache["payload"] is not None and time.monotonic() < _home_cache["expires_at"]:
+        return _home_cache["payload"]
+    # Only one request recomputes; the others wait and reuse its result
+    with _home_lock:
+        if _home_cache["payload"] is None or time.monotonic() >= _home_cache["expires_at"]:
+            futures = {name: _home_executor.submit(_load_home_section, loader) for name, loader in HOME_SECTIONS.items()}
+            _home_cache["payload"] = {name: future.result() for name, future in futures.items()}
+            _home_cache["expires_at"] = time.monotonic() + HOME_CACHE_TTL
+        return _home_cache["payload"]
+
+
+# Keysets for cursor pagination of the car list: sort name -> (columns, descending)
+CAR_SORT_KEYS = {
+    "car_id": ((Car.car_id,), False),
+    "price": ((Car.price, Car.car_id), False),
+    "added_date": ((Car.added_date, Car.car_id), True),
+}
+
+def get_cars(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "car_id", entities=(Car,)):
+    columns, descending = CAR_SORT_KEYS[sort]
+    query = db.query(*entities)
+    # Row comparisons never match NULL, so nullable sort keys only page over set values
+    if len(columns) > 1:
+        query = query.filter(columns[0] != None)
+    return paginate(query, columns, skip, limit, cursor, descending)
 
 # Routes (Including new route for car details)
 router = APIRouter(prefix="/cars", tags=["cars"])
 
 @router.get("/", response_model=List[CarBase])
-def read_cars(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Car).offset(skip).limit(limit).all()
+def read_cars(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "car_id", db: Session = Depends(get_db)):
+    if sort not in CAR_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort key: {sort}")
+    if FAST_JSON:
+        rows = get_cars(db, skip, limit, cursor, sort, entities=car_list_out.columns)
+        set_next_cursor(response, rows, limit, CAR_SORT_KEYS[sort][0])
+        return fast_json(car_list_out.rows(rows), response)
+    cars = get_cars(db, skip, limit, cursor, sort)
+    set_next_cursor(response, cars, limit, CAR_SORT_KEYS[sort][0])
+    return cars
+
+@router.get("/home", response_model=CarHomeResponse)
+def read_home_bundle():
+    return get_home_bundle()
 
 @router.get("/top-rated", response_model=List[CarWithRating])
 def read_top_rated_cars(db: Session = Depends(get_db)):
@@ -165,9 +242,44 @@ def read_new_arrivals(db: Session = Depends(get_db)):
 def read_budget_friendly_cars(db: Session = Depends(get_db)):
     return get_budget_friendly_cars(db)
 
+@router.get("/search", response_model=CarSearchResponse)
+def search_cars(
+    manufacturer: Optional[List[str]] = Query(None),
+    engine_type: Optional[List[str]] = Query(None),
+    transmission: Optional[List[str]] = Query(None),
+    color: Optional[List[str]] = Query(None),
+    category_id: Optional[List[int]] = Query(None),
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_mileage: Optional[int] = None,
+    max_mileage: Optional[int] = None,
+    min_seating: Optional[int] = None,
+    max_seating: Optional[int] = None,
+    available: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    facets = {
+        "manufacturer": manufacturer,
+        "engine_type": engine_type,
+        "transmission": transmission,
+        "color": color,
+        "category_id": category_id,
+    }
+    ranges = {
+        "year": (min_year, max_year),
+        "price": (min_price, max_price),
+        "mileage": (min_mileage, max_mileage),
+        "seating_capacity": (min_seating, max_seating),
+    }
+    return car_index.search(db, facets, ranges, available_only=available, skip=skip, limit=limit)
+
 @router.get("/{car_id}", response_model=CarBase)
 def read_car(car_id: int, db: Session = Depends(get_db)):
-    db_car = get_car(db, car_id)
+    db_car = get_car_cached(db, car_id)
     if db_car is None:
         raise HTTPException(status_code=404, detail="Car not found")
     return db_car
@@ -228,7 +340,7 @@ def read_car_details(car_id: int, db: Session = Depends(get_db)):
 
 @router.get("/category/{category_id}", response_model=List[CarBase])
 def read_cars_by_category(category_id: int, db: Session = Depends(get_db)):
-    db_category = get_category(db, category_id)
+    db_category = get_category_cached(db, category_id)
     if db_category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     cars = db.query(Car).filter(Car.category_id == category_id).all()
@@ -261,17 +373,18 @@ def generate_car_description(db: Session, car: Car) -> str:
 
 def get_car_details(db: Session, car_id: int):
     """Fetch car details with car_inventory data for a specific car_id."""
-    result = (
-        db.query(Car, CarInventory.quantity)
+    return car_detail_cache.get_or_load(car_id, lambda: _load_car_details(db, car_id))
+
+def _load_car_details(db: Session, car_id: int):
+    statement = (
+        car_response_select
         .join(CarInventory, Car.car_id == CarInventory.car_id, isouter=True)
-        .filter(Car.car_id == car_id)
-        .first()
+        .join(CarReviewStats, Car.car_id == CarReviewStats.car_id, isouter=True)
+        .where(Car.car_id == car_id)
     )
-    if result is None:
+    row = db.execute(statement).first()
+    if row is None:
         return None
-    car, quantity = result
-    car_dict = car.__dict__
-    car_dict['quantity'] = quantity
-    car_dict['rating'] = db.query(func.avg(ReviewModel.rating)).filter(ReviewModel.car_id == car.car_id).scalar()
-    car_dict['description'] = generate_car_description(db, car)
-    return CarResponse.parse_obj(car_dict)
\ No newline at end of file
+    car_dict = car_response_out.from_row(row)
+    car_dict['description'] = generate_car_description(db, row)
+    return car_dict
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import create_row
+from app.cache import car_detail_cache
+from app.pagination import paginate, set_next_cursor
 from app.models.review import ReviewModel  # Import ReviewModel (adjust path as needed)
 from app.models.user import User  # Import User model (adjust path as needed)
 
@@ -40,13 +43,16 @@ class CarInventoryResponse(CarInventoryBase):
     class Config:
         orm_mode = True
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (CarInventory.inventory_id,)
+
 router = APIRouter(prefix="/car_inventory", tags=["car_inventory"])
 
 def get_car_inventory(db: Session, inventory_id: int):
     return db.query(CarInventory).filter(CarInventory.inventory_id == inventory_id).first()
 
-def get_car_inventories(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(CarInventory).offset(skip).limit(limit).all()
+def get_car_inventories(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(CarInventory), PAGE_KEY, skip, limit, cursor)
 
 # Fix: Return a list of car inventories, not just one
 def get_car_inventory_by_car_id(db: Session, car_id: int):
@@ -63,10 +69,8 @@ def get_reviews_by_car_id(db: Session, car_id: int, skip: int = 0, limit: int =
     )
 
 def create_car_inventory(db: Session, car_inventory: CarInventoryCreate):
-    db_inventory = CarInventory(**car_inventory.dict())
-    db.add(db_inventory)
-    db.commit()
-    db.refresh(db_inventory)
+    db_inventory = create_row(db, CarInventory, car_inventory.dict())
+    car_detail_cache.invalidate(db_inventory.car_id)
     return db_inventory
 
 @router.post("/", response_model=CarInventoryResponse)
@@ -74,8 +78,10 @@ def create_car_inventory_endpoint(car_inventory: CarInventoryCreate, db: Session
     return create_car_inventory(db, car_inventory)
 
 @router.get("/", response_model=List[CarInventoryResponse])
-def read_car_inventories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_car_inventories(db, skip, limit)
+def read_car_inventories(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    inventories = get_car_inventories(db, skip, limit, cursor)
+    set_next_cursor(response, inventories, limit, PAGE_KEY)
+    return inventories
 
 @router.get("/{inventory_id}", response_model=CarInventoryResponse)
 def read_car_inventory(inventory_id: int, db: Session = Depends(get_db)):
@@ -103,4 +109,5 @@ def update_car_inventory_endpoint(car_id: int, inventory_update: CarInventoryUpd
 
     db.commit()
     db.refresh(db_inventory)
+    car_detail_cache.invalidate(car_id)
     return db_inventory
\ No newline at end of file
@@ -0,0 +1,91 @@
+# app/models/car_review_stats.py
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, case, cast, func, insert, select, Index
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import Base
+
+RATINGS = (1, 2, 3, 4, 5)
+
+class CarReviewStats(Base):
+    """Running review aggregates per car, counting visible reviews only."""
+    __tablename__ = "car_review_stats"
+
+    car_id = Column(Integer, ForeignKey("cars.car_id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    avg_rating = Column(Numeric(3, 2))
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_car_review_stats_avg_rating", avg_rating.desc(), review_count.desc()),
+        Index("ix_car_review_stats_review_count", review_count.desc()),
+    )
+
+def _delta_values(rating: int, sign: int):
+    count = CarReviewStats.review_count + sign
+    total = CarReviewStats.rating_sum + sign * rating
+    values = {
+        CarReviewStats.review_count: count,
+        CarReviewStats.rating_sum: total,
+        CarReviewStats.avg_rating: case((count > 0, cast(total, Numeric) / count), else_=None),
+    }
+    if rating in RATINGS:
+        bucket = getattr(CarReviewStats, f"rating_{rating}")
+        values[bucket] = bucket + sign
+    return values
+
+def apply_review_delta(db: Session, car_id: int, rating: int, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one visible review in the caller's transaction."""
+    updated = (
+        db.query(CarReviewStats)
+        .filter(CarReviewStats.car_id == car_id)
+        .update(_delta_values(rating, sign), synchronize_session=False)
+    )
+    if updated or sign < 0:
+        return
+    row = {"car_id": car_id, "review_count": 1, "rating_sum": rating, "avg_rating": rating}
+    if rating in RATINGS:
+        row[f"rating_{rating}"] = 1
+    try:
+        # A concurrent first review for the same car may win the insert race
+        with db.begin_nested():
+            db.execute(insert(CarReviewStats).values(**row))
+    except IntegrityError:
+        db.query(CarReviewStats).filter(CarReviewStats.car_id == car_id).update(
+            _delta_values(rating, sign), synchronize_session=False
+        )
+
+def rebuild_review_stats(db: Session) -> int:
+    """Recompute every car's stats from the reviews table. Returns the number of cars."""
+    from app.models.review import ReviewModel
+
+    rating = ReviewModel.rating
+    source = (
+        select(
+            ReviewModel.car_id,
+            func.count(),
+            func.sum(rating),
+            func.avg(rating),
+            *[func.sum(case((rating == r, 1), else_=0)) for r in RATINGS],
+        )
+        .where(ReviewModel.is_visible == True)
+        .group_by(ReviewModel.car_id)
+    )
+    columns = ["car_id", "review_count", "rating_sum", "avg_rating"] + [f"rating_{r}" for r in RATINGS]
+    db.query(CarReviewStats).delete(synchronize_session=False)
+    db.execute(insert(CarReviewStats).from_select(columns, source))
+    db.commit()
+    return db.query(CarReviewStats).count()
+
+if __name__ == "__main__":
+    # Backfill: python -m app.models.car_review_stats
+    import app.models  # noqa: F401  register every mapper
+    from app.database import SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine, tables=[CarReviewStats.__table__])
+    with SessionLocal() as session:
+        print(f"Rebuilt review stats for {rebuild_review_stats(session)} cars")
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import create_row
+from app.pagination import paginate, set_next_cursor
+from app.cache import category_cache
 
 class Category(Base):
     __tablename__ = "categories"
@@ -27,19 +30,26 @@ class CategoryResponse(CategoryBase):
     class Config:
         orm_mode = True
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (Category.category_id,)
+
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 def get_category(db: Session, category_id: int):
     return db.query(Category).filter(Category.category_id == category_id).first()
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Category).offset(skip).limit(limit).all()
+def get_category_cached(db: Session, category_id: int):
+    def load():
+        category = get_category(db, category_id)
+        return CategoryResponse.from_orm(category) if category else None
+    return category_cache.get_or_load(category_id, load)
+
+def get_categories(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(Category), PAGE_KEY, skip, limit, cursor)
 
 def create_category(db: Session, category: CategoryCreate):
-    db_category = Category(**category.dict())
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    db_category = create_row(db, Category, category.dict())
+    category_cache.invalidate(db_category.category_id)
     return db_category
 
 @router.post("/", response_model=CategoryResponse)
@@ -47,12 +57,14 @@ def create_category_endpoint(category: CategoryCreate, db: Session = Depends(get
     return create_category(db, category)
 
 @router.get("/", response_model=List[CategoryResponse])
-def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_categories(db, skip, limit)
+def read_categories(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    categories = get_categories(db, skip, limit, cursor)
+    set_next_cursor(response, categories, limit, PAGE_KEY)
+    return categories
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 def read_category(category_id: int, db: Session = Depends(get_db)):
-    db_category = get_category(db, category_id)
+    db_category = get_category_cached(db, category_id)
     if db_category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     return db_category
\ No newline at end of file
@@ -0,0 +1,95 @@
+# app/models/category_price_stats.py
+"""Price statistics per category for the ALL/ANY comparison reports.
+
+`price > ALL (prices of a category)` is `price > MAX`, and `price < ANY
+(...)` is `price < MAX`, once the empty category and NULL prices are dealt
+with. So the reports read one stats row and then walk ix_cars_price
+instead of scanning the category again for every car.
+
+A statement trigger on cars recomputes the rows of the categories a
+statement touched. It reads them from ix_cars_category_price, so a write
+costs a range scan of its own category and a bulk import pays once per
+statement, not once per car. Before it reads, the trigger locks those
+stats rows in category order. Under READ COMMITTED a concurrent writer to
+the same category therefore waits and then recounts with the first
+writer's cars included. See migrations/0005_category_price_stats.sql.
+
+    python -m app.models.category_price_stats --check    # report drift, exit 1 if any
+    python -m app.models.category_price_stats            # rebuild from cars
+"""
+from typing import List
+
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, text
+from sqlalchemy.orm import Session
+from app.database import Base
+
+class CategoryPriceStats(Base):
+    """Car count and price distribution of one category."""
+    __tablename__ = "category_price_stats"
+
+    category_id = Column(Integer, ForeignKey("categories.category_id", ondelete="CASCADE"), primary_key=True)
+    car_count = Column(Integer, nullable=False, default=0)
+    priced_count = Column(Integer, nullable=False, default=0)  # cars with a price; fewer than car_count means NULLs
+    min_price = Column(Numeric(10, 2))
+    max_price = Column(Numeric(10, 2))
+    median_price = Column(Numeric(12, 2))
+
+# The same stats computed from cars, for the rebuild and the checker
+_ACTUAL = """
+    SELECT category_id,
+           COUNT(*) AS car_count,
+           COUNT(price) AS priced_count,
+           MIN(price) AS min_price,
+           MAX(price) AS max_price,
+           CAST(percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS NUMERIC(12, 2)) AS median_price
+    FROM cars
+    GROUP BY category_id
+"""
+
+def check_category_price_stats(db: Session) -> List[dict]:
+    """Categories whose stored stats differ from cars; an empty list means consistent."""
+    rows = db.execute(text(f"""
+        WITH actual AS ({_ACTUAL})
+        SELECT COALESCE(a.category_id, s.category_id) AS category_id,
+               s.car_count AS stored_car_count, a.car_count AS actual_car_count,
+               s.priced_count AS stored_priced_count, a.priced_count AS actual_priced_count,
+               s.min_price AS stored_min_price, a.min_price AS actual_min_price,
+               s.max_price AS stored_max_price, a.max_price AS actual_max_price,
+               s.median_price AS stored_median_price, a.median_price AS actual_median_price
+        FROM actual a
+        FULL OUTER JOIN category_price_stats s ON s.category_id = a.category_id
+        -- A stored row of zeros stands for a category whose cars were all deleted
+        WHERE (COALESCE(s.car_count, 0), COALESCE(s.priced_count, 0)) IS DISTINCT FROM
+              (COALESCE(a.car_count, 0), COALESCE(a.priced_count, 0))
+           OR (s.min_price, s.max_price, s.median_price) IS DISTINCT FROM (a.min_price, a.max_price, a.median_price)
+        ORDER BY 1
+    """))
+    return [dict(row._mapping) for row in rows]
+
+def rebuild_category_price_stats(db: Session) -> int:
+    """Recompute every category's stats from cars. Returns the number of categories."""
+    # Hold off car writes so no trigger update lands between the delete and the insert
+    db.execute(text("LOCK TABLE cars IN SHARE MODE"))
+    db.query(CategoryPriceStats).delete(synchronize_session=False)
+    db.execute(text(f"""
+        INSERT INTO category_price_stats (category_id, car_count, priced_count, min_price, max_price, median_price)
+        {_ACTUAL}
+    """))
+    db.commit()
+    return db.query(CategoryPriceStats).count()
+
+if __name__ == "__main__":
+    import sys
+
+    import app.models  # noqa: F401  register every mapper
+    from app.database import SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine, tables=[CategoryPriceStats.__table__])
+    with SessionLocal() as session:
+        if "--check" in sys.argv[1:]:
+            drift = check_category_price_stats(session)
+            for row in drift:
+                print(row)
+            print(f"{len(drift)} category(ies) out of date")
+            sys.exit(1 if drift else 0)
+        print(f"Rebuilt price stats for {rebuild_category_price_stats(session)} categories")
@@ -1,10 +1,12 @@
 # app/models/employee.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import Column, Integer, String, Date, Numeric
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import create_row
+from app.pagination import paginate, set_next_cursor
 from datetime import date
 
 class Employee(Base):
@@ -43,29 +45,30 @@ class EmployeeResponse(EmployeeBase):
     class Config:
         orm_mode = True
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (Employee.emp_id,)
+
 # Define the router
 router = APIRouter(prefix="/employees", tags=["employees"])
 
 def get_employee(db: Session, emp_id: int):
     return db.query(Employee).filter(Employee.emp_id == emp_id).first()
 
-def get_employees(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Employee).offset(skip).limit(limit).all()
+def get_employees(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(Employee), PAGE_KEY, skip, limit, cursor)
 
 def create_employee(db: Session, employee: EmployeeCreate):
-    db_employee = Employee(**employee.dict())
-    db.add(db_employee)
-    db.commit()
-    db.refresh(db_employee)
-    return db_employee
+    return create_row(db, Employee, employee.dict())
 
 @router.post("/", response_model=EmployeeResponse)
 def create_employee_endpoint(employee: EmployeeCreate, db: Session = Depends(get_db)):
     return create_employee(db, employee)
 
 @router.get("/", response_model=List[EmployeeResponse])
-def read_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_employees(db, skip, limit)
+def read_employees(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    employees = get_employees(db, skip, limit, cursor)
+    set_next_cursor(response, employees, limit, PAGE_KEY)
+    return employees
 
 @router.get("/{emp_id}", response_model=EmployeeResponse)
 def read_employee(emp_id: int, db: Session = Depends(get_db)):
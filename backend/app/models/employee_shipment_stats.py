@@ -0,0 +1,95 @@
+# app/models/employee_shipment_stats.py
+"""Running shipment counts per employee for the staff leaderboard.
+
+The `shipping` table is written outside this API (the carriers' status
+feed), so the counts are kept by a trigger on it rather than by the
+application: every insert, delete, and change of emp_id, status or
+shipped_date adjusts the employee's row in the same transaction. See
+migrations/0003_employee_shipment_stats.sql.
+
+    python -m app.models.employee_shipment_stats --check    # report drift, exit 1 if any
+    python -m app.models.employee_shipment_stats            # rebuild from shipping
+"""
+from typing import List
+
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, text
+from sqlalchemy.orm import Session
+from app.database import Base
+
+class EmployeeShipmentStats(Base):
+    """Shipments handled per employee, by status."""
+    __tablename__ = "employee_shipment_stats"
+
+    emp_id = Column(Integer, ForeignKey("employees.emp_id", ondelete="CASCADE"), primary_key=True)
+    total_shipments = Column(Integer, nullable=False, default=0)
+    delivered = Column(Integer, nullable=False, default=0)
+    delayed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    last_shipped_date = Column(Date)
+
+    __table_args__ = (
+        # Leaderboard order: most deliveries, then most shipments
+        Index("ix_employee_shipment_stats_leaderboard", delivered.desc(), total_shipments.desc()),
+    )
+
+# The same aggregates computed from shipping, for the rebuild and the checker
+_ACTUAL = """
+    SELECT emp_id,
+           COUNT(*) AS total_shipments,
+           COUNT(*) FILTER (WHERE status = 'delivered') AS delivered,
+           COUNT(*) FILTER (WHERE status = 'delayed') AS delayed,
+           COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+           MAX(shipped_date) AS last_shipped_date
+    FROM shipping
+    WHERE emp_id IS NOT NULL
+    GROUP BY emp_id
+"""
+
+def check_shipment_stats(db: Session) -> List[dict]:
+    """Employees whose stored counts differ from shipping; an empty list means consistent."""
+    rows = db.execute(text(f"""
+        WITH actual AS ({_ACTUAL})
+        SELECT COALESCE(a.emp_id, s.emp_id) AS emp_id,
+               s.total_shipments AS stored_total, a.total_shipments AS actual_total,
+               s.delivered AS stored_delivered, a.delivered AS actual_delivered,
+               s.delayed AS stored_delayed, a.delayed AS actual_delayed,
+               s.failed AS stored_failed, a.failed AS actual_failed,
+               s.last_shipped_date AS stored_last_shipped_date, a.last_shipped_date AS actual_last_shipped_date
+        FROM actual a
+        FULL OUTER JOIN employee_shipment_stats s ON s.emp_id = a.emp_id
+        -- A stored row of zeros stands for an employee whose shipments were all deleted
+        WHERE (COALESCE(s.total_shipments, 0), COALESCE(s.delivered, 0), COALESCE(s.delayed, 0), COALESCE(s.failed, 0))
+              IS DISTINCT FROM
+              (COALESCE(a.total_shipments, 0), COALESCE(a.delivered, 0), COALESCE(a.delayed, 0), COALESCE(a.failed, 0))
+           OR s.last_shipped_date IS DISTINCT FROM a.last_shipped_date
+        ORDER BY 1
+    """))
+    return [dict(row._mapping) for row in rows]
+
+def rebuild_shipment_stats(db: Session) -> int:
+    """Recompute every employee's counts from shipping. Returns the number of employees."""
+    # Hold off shipping writes so no trigger update lands between the delete and the insert
+    db.execute(text("LOCK TABLE shipping IN SHARE MODE"))
+    db.query(EmployeeShipmentStats).delete(synchronize_session=False)
+    db.execute(text(f"""
+        INSERT INTO employee_shipment_stats (emp_id, total_shipments, delivered, delayed, failed, last_shipped_date)
+        {_ACTUAL}
+    """))
+    db.commit()
+    return db.query(EmployeeShipmentStats).count()
+
+if __name__ == "__main__":
+    import sys
+
+    import app.models  # noqa: F401  register every mapper
+    from app.database import SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine, tables=[EmployeeShipmentStats.__table__])
+    with SessionLocal() as session:
+        if "--check" in sys.argv[1:]:
+            drift = check_shipment_stats(session)
+            for row in drift:
+                print(row)
+            print(f"{len(drift)} employee(s) out of date")
+            sys.exit(1 if drift else 0)
+        print(f"Rebuilt shipment stats for {rebuild_shipment_stats(session)} employees")
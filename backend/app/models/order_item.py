@@ -1,10 +1,12 @@
 # app/models/order_item.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import Column, Integer, Numeric, ForeignKey
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import create_row
+from app.pagination import paginate, set_next_cursor
 
 class OrderItem(Base):
     __tablename__ = "order_item"
@@ -33,28 +35,29 @@ class OrderItemResponse(OrderItemBase):
     class Config:
         orm_mode = True
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (OrderItem.order_item_id,)
+
 router = APIRouter(prefix="/order_items", tags=["order_items"])
 
 def get_order_item(db: Session, order_item_id: int):
     return db.query(OrderItem).filter(OrderItem.order_item_id == order_item_id).first()
 
-def get_order_items(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(OrderItem).offset(skip).limit(limit).all()
+def get_order_items(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(OrderItem), PAGE_KEY, skip, limit, cursor)
 
 def create_order_item(db: Session, order_item: OrderItemCreate):
-    db_order_item = OrderItem(**order_item.dict())
-    db.add(db_order_item)
-    db.commit()
-    db.refresh(db_order_item)
-    return db_order_item
+    return create_row(db, OrderItem, order_item.dict())
 
 @router.post("/", response_model=OrderItemResponse)
 def create_order_item_endpoint(order_item: OrderItemCreate, db: Session = Depends(get_db)):
     return create_order_item(db, order_item)
 
 @router.get("/", response_model=List[OrderItemResponse])
-def read_order_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_order_items(db, skip, limit)
+def read_order_items(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    order_items = get_order_items(db, skip, limit, cursor)
+    set_next_cursor(response, order_items, limit, PAGE_KEY)
+    return order_items
 
 @router.get("/{order_item_id}", response_model=OrderItemResponse)
 def read_order_item(order_item_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,244 @@
+# app/models/reservation.py
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, conint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.database import get_db, Base, SessionLocal
+from app.cache import invalidate_car
+from app.models.car_inventory import CarInventory
+
+# Seconds a hold keeps its stock before the sweeper returns it
+HOLD_TTL_SECONDS = int(os.getenv("HOLD_TTL_SECONDS", "900"))
+# Seconds between sweeper passes; 0 disables the background sweeper
+HOLD_SWEEP_INTERVAL = int(os.getenv("HOLD_SWEEP_INTERVAL", "30"))
+HOLD_SWEEP_BATCH = 500
+
+logger = logging.getLogger(__name__)
+
+class InventoryHold(Base):
+    """Stock taken out of car_inventory for a buyer until it is confirmed, released or expires."""
+    __tablename__ = "inventory_holds"
+
+    hold_id = Column(Integer, primary_key=True, index=True)
+    car_id = Column(Integer, ForeignKey("cars.car_id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="held")  # held, confirmed, released, expired
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # The sweeper only walks live holds, oldest expiry first
+        Index("ix_inventory_holds_status_expires", status, expires_at),
+    )
+
+# Core tables for the DML below, which runs without loading ORM objects
+holds = InventoryHold.__table__
+inventory = CarInventory.__table__
+
+class HoldCreate(BaseModel):
+    car_id: int
+    quantity: conint(gt=0) = 1
+    ttl_seconds: Optional[conint(gt=0)] = None
+
+class HoldResponse(BaseModel):
+    hold_id: int
+    car_id: int
+    quantity: int
+    status: str
+    created_at: datetime
+    expires_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class HoldCreated(HoldResponse):
+    remaining: int  # stock left for this car after the hold
+
+# Stock primitives. Each is a single conditional UPDATE ... RETURNING, so concurrent
+# buyers serialize on the inventory row lock instead of racing a read-modify-write.
+
+def reserve_stock(db: Session, car_id: int, quantity: int) -> Optional[int]:
+    """Take `quantity` units of a car in the caller's transaction. Returns the stock left, or None if short."""
+    target = (
+        select(inventory.c.inventory_id)
+        .where(inventory.c.car_id == car_id, inventory.c.quantity >= quantity)
+        .order_by(inventory.c.quantity.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    # The quantity check is repeated on the row itself: after waiting on a concurrent
+    # buyer's lock PostgreSQL re-evaluates it against the committed stock
+    return db.execute(
+        update(inventory)
+        .where(inventory.c.inventory_id == target, inventory.c.quantity >= quantity)
+        .values(quantity=inventory.c.quantity - quantity)
+        .returning(inventory.c.quantity)
+    ).scalar()
+
+def restore_stock(db: Session, car_id: int, quantity: int) -> Optional[int]:
+    """Give `quantity` units back to a car's first inventory row. Returns the new stock."""
+    target = select(func.min(inventory.c.inventory_id)).where(inventory.c.car_id == car_id).scalar_subquery()
+    return db.execute(
+        update(inventory)
+        .where(inventory.c.inventory_id == target)
+        .values(quantity=inventory.c.quantity + quantity)
+        .returning(inventory.c.quantity)
+    ).scalar()
+
+# Holds
+
+def create_hold(db: Session, car_id: int, quantity: int = 1, ttl_seconds: Optional[int] = None):
+    """Reserve stock and record the hold in one transaction. Returns (hold, remaining) or None if short."""
+    remaining = reserve_stock(db, car_id, quantity)
+    if remaining is None:
+        db.rollback()
+        return None
+    now = datetime.utcnow()
+    hold = db.execute(
+        insert(holds)
+        .values(
+            car_id=car_id,
+            quantity=quantity,
+            status="held",
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl_seconds or HOLD_TTL_SECONDS),
+        )
+        .returning(*holds.columns)
+    ).one()
+    db.commit()
+    invalidate_car(car_id)
+    return hold, remaining
+
+def _close_hold(db: Session, hold_id: int, status: str, live_only: bool):
+    conditions = [holds.c.hold_id == hold_id, holds.c.status == "held"]
+    if live_only:
+        conditions.append(holds.c.expires_at > datetime.utcnow())
+    return db.execute(
+        update(holds)
+        .where(*conditions)
+        .values(status=status)
+        .returning(*holds.columns)
+    ).one_or_none()
+
+def release_hold(db: Session, hold_id: int):
+    """Cancel a live hold and return its stock. Returns the hold, or None if it was not held."""
+    hold = _close_hold(db, hold_id, "released", live_only=False)
+    if hold is None:
+        db.rollback()
+        return None
+    restore_stock(db, hold.car_id, hold.quantity)
+    db.commit()
+    invalidate_car(hold.car_id)
+    return hold
+
+def confirm_hold(db: Session, hold_id: int):
+    """Turn an unexpired hold into a sale in the caller's transaction; the stock stays taken."""
+    return _close_hold(db, hold_id, "confirmed", live_only=True)
+
+def expire_holds(db: Session, batch: int = HOLD_SWEEP_BATCH) -> int:
+    """Expire overdue holds and return their stock. Returns the number of holds expired."""
+    overdue = (
+        select(holds.c.hold_id)
+        .where(holds.c.status == "held", holds.c.expires_at <= datetime.utcnow())
+        .order_by(holds.c.expires_at)
+        .limit(batch)
+        # Concurrent sweepers (one per worker) split the backlog instead of blocking each other
+        .with_for_update(skip_locked=True)
+    )
+    expired = db.execute(
+        update(holds)
+        .where(holds.c.hold_id.in_(overdue), holds.c.status == "held")
+        .values(status="expired")
+        .returning(holds.c.car_id, holds.c.quantity)
+    ).all()
+    returned = {}
+    for car_id, quantity in expired:
+        returned[car_id] = returned.get(car_id, 0) + quantity
+    for car_id, quantity in sorted(returned.items()):
+        restore_stock(db, car_id, quantity)
+    db.commit()
+    for car_id in returned:
+        invalidate_car(car_id)
+    return len(expired)
+
+def sweep_expired_holds() -> int:
+    """Expire every overdue hold, one batch per transaction."""
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            expired = expire_holds(db)
+        finally:
+            db.close()
+        total += expired
+        if expired < HOLD_SWEEP_BATCH:
+            return total
+
+class HoldSweeper:
+    """Daemon thread that runs sweep_expired_holds every `interval` seconds."""
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="hold-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                sweep_expired_holds()
+            except Exception:  # keep sweeping after a transient database error
+                logger.exception("hold sweep failed")
+
+hold_sweeper = HoldSweeper(HOLD_SWEEP_INTERVAL)
+
+router = APIRouter(prefix="/reservations", tags=["reservations"])
+
+@router.post("/", response_model=HoldCreated)
+def create_hold_endpoint(hold: HoldCreate, db: Session = Depends(get_db)):
+    result = create_hold(db, hold.car_id, hold.quantity, hold.ttl_seconds)
+    if result is None:
+        raise HTTPException(status_code=409, detail="Not enough stock for this car")
+    row, remaining = result
+    return {**row._mapping, "remaining": remaining}
+
+@router.get("/{hold_id}", response_model=HoldResponse)
+def read_hold(hold_id: int, db: Session = Depends(get_db)):
+    hold = db.query(InventoryHold).filter(InventoryHold.hold_id == hold_id).first()
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return hold
+
+@router.post("/{hold_id}/release", response_model=HoldResponse)
+def release_hold_endpoint(hold_id: int, db: Session = Depends(get_db)):
+    hold = release_hold(db, hold_id)
+    if hold is None:
+        raise HTTPException(status_code=409, detail="Hold is not active")
+    return hold
+
+@router.post("/{hold_id}/confirm", response_model=HoldResponse)
+def confirm_hold_endpoint(hold_id: int, db: Session = Depends(get_db)):
+    hold = confirm_hold(db, hold_id)
+    if hold is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Hold is not active or has expired")
+    db.commit()
+    return hold
+
+if __name__ == "__main__":
+    # One-off sweep, e.g. from cron where no long-running server hosts the sweeper
+    print(f"Expired {sweep_expired_holds()} holds")
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import BigInteger, Column, Integer, Text, DateTime, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import insert_row
+from app.pagination import paginate, set_next_cursor
+from app.cache import car_detail_cache
+from app.fast_json import FAST_JSON, fast_json, schema_serializer
+from app.helpful_votes import HELPFUL_FLUSH_INTERVAL, HelpfulVoteBuffer, HelpfulVoteFlusher
 from datetime import datetime
 from app.models.user import User  # Import the User model
+from app.models.car_review_stats import apply_review_delta
 
 class ReviewModel(Base):
     __tablename__ = "reviews"
@@ -25,6 +31,18 @@ class ReviewModel(Base):
     car = relationship("Car", back_populates="reviews")
     user = relationship("User", back_populates="reviews")
 
+class HelpfulVoteLog(Base):
+    """A helpful vote not yet added to its review's helpful_count; see app.helpful_votes."""
+    __tablename__ = "review_helpful_votes"
+
+    vote_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    review_id = Column(Integer, nullable=False)
+    voted_at = Column(DateTime, default=datetime.utcnow, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (
+        Index("ix_review_helpful_votes_review", review_id),
+    )
+
 class ReviewBase(BaseModel):
     purchase_id: int
     car_id: int
@@ -38,6 +56,13 @@ class ReviewBase(BaseModel):
 class ReviewCreate(ReviewBase):
     pass
 
+class ReviewVisibilityUpdate(BaseModel):
+    is_visible: bool
+
+class HelpfulVoteResponse(BaseModel):
+    review_id: int
+    helpful_count: int  # stored count plus logged votes not folded in yet
+
 class ReviewResponse(ReviewBase):
     review_id: int
     created_at: datetime
@@ -46,29 +71,47 @@ class ReviewResponse(ReviewBase):
     class Config:
         orm_mode = True
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (ReviewModel.review_id,)
+# Keysets for cursor pagination of a car's reviews: sort name -> (columns, descending)
+REVIEW_SORT_KEYS = {
+    "review_id": (PAGE_KEY, False),
+    "helpful": ((ReviewModel.helpful_count, ReviewModel.review_id), True),
+}
+
+# Helpful votes are logged per click and written to the reviews in batches; see app.helpful_votes
+helpful_votes = HelpfulVoteBuffer(ReviewModel.__table__, HelpfulVoteLog.__table__)
+helpful_vote_flusher = HelpfulVoteFlusher(helpful_votes, HELPFUL_FLUSH_INTERVAL)
+
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 def get_review(db: Session, review_id: int):
     return db.query(ReviewModel).filter(ReviewModel.review_id == review_id).first()
 
-def get_reviews(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ReviewModel).offset(skip).limit(limit).all()
+# Rows -> ReviewResponse dicts for the fast JSON path (username stays at its default of None)
+review_list_out = schema_serializer("review_list", ReviewResponse, ReviewModel.__table__.columns)
 
-def get_reviews_by_car_id(db: Session, car_id: int, skip: int = 0, limit: int = 100):
-    return (
+def get_reviews(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, entities=(ReviewModel,)):
+    return paginate(db.query(*entities), PAGE_KEY, skip, limit, cursor)
+
+def get_reviews_by_car_id(db: Session, car_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "review_id"):
+    columns, descending = REVIEW_SORT_KEYS[sort]
+    query = (
         db.query(ReviewModel, User.username)
         .outerjoin(User, ReviewModel.user_id == User.user_id)
         .filter(ReviewModel.car_id == car_id, ReviewModel.is_visible == True)
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    # Row comparisons never match NULL, so nullable sort keys only page over set values
+    if len(columns) > 1:
+        query = query.filter(columns[0] != None)
+    return paginate(query, columns, skip, limit, cursor, descending)
 
 def create_review(db: Session, review: ReviewCreate):
-    db_review = ReviewModel(**review.dict())
-    db.add(db_review)
+    db_review = insert_row(db, ReviewModel, review.dict())
+    if db_review.is_visible:
+        apply_review_delta(db, db_review.car_id, db_review.rating)
     db.commit()
-    db.refresh(db_review)
+    car_detail_cache.invalidate(db_review.car_id)
     return db_review
 
 @router.post("/", response_model=ReviewResponse)
@@ -76,8 +119,14 @@ def create_review_endpoint(review: ReviewCreate, db: Session = Depends(get_db)):
     return create_review(db, review)
 
 @router.get("/", response_model=List[ReviewResponse])
-def read_reviews(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_reviews(db, skip, limit)
+def read_reviews(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    if FAST_JSON:
+        rows = get_reviews(db, skip, limit, cursor, entities=review_list_out.columns)
+        set_next_cursor(response, rows, limit, PAGE_KEY)
+        return fast_json(review_list_out.rows(rows), response)
+    reviews = get_reviews(db, skip, limit, cursor)
+    set_next_cursor(response, reviews, limit, PAGE_KEY)
+    return reviews
 
 @router.get("/{review_id}", response_model=ReviewResponse)
 def read_review(review_id: int, db: Session = Depends(get_db)):
@@ -86,9 +135,30 @@ def read_review(review_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Review not found")
     return db_review
 
+@router.patch("/{review_id}/visibility", response_model=ReviewResponse)
+def update_review_visibility(review_id: int, visibility: ReviewVisibilityUpdate, db: Session = Depends(get_db)):
+    db_review = get_review(db, review_id)
+    if db_review is None:
+        raise HTTPException(status_code=404, detail="Review not found")
+    # Conditional update so concurrent toggles apply the stats delta only once
+    changed = (
+        db.query(ReviewModel)
+        .filter(ReviewModel.review_id == review_id, ReviewModel.is_visible.is_distinct_from(visibility.is_visible))
+        .update({ReviewModel.is_visible: visibility.is_visible}, synchronize_session=False)
+    )
+    if changed:
+        apply_review_delta(db, db_review.car_id, db_review.rating, 1 if visibility.is_visible else -1)
+    db.commit()
+    db.refresh(db_review)
+    car_detail_cache.invalidate(db_review.car_id)
+    return db_review
+
 @router.get("/cars/{car_id}/reviews", response_model=List[ReviewResponse])
-def read_reviews_by_car_id(car_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    reviews = get_reviews_by_car_id(db, car_id, skip, limit)
+def read_reviews_by_car_id(response: Response, car_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "review_id", db: Session = Depends(get_db)):
+    if sort not in REVIEW_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort key: {sort}")
+    reviews = get_reviews_by_car_id(db, car_id, skip, limit, cursor, sort)
+    set_next_cursor(response, [review.ReviewModel for review in reviews], limit, REVIEW_SORT_KEYS[sort][0])
     return [ReviewResponse(
         review_id=review.ReviewModel.review_id,
         purchase_id=review.ReviewModel.purchase_id,
@@ -101,4 +171,19 @@ def read_reviews_by_car_id(car_id: int, skip: int = 0, limit: int = 100, db: Ses
         helpful_count=review.ReviewModel.helpful_count,
         employee_feedback=review.ReviewModel.employee_feedback,
         username=review.username
-    ) for review in reviews]
\ No newline at end of file
+    ) for review in reviews]
+
+@router.post("/{review_id}/helpful", response_model=HelpfulVoteResponse)
+def mark_review_helpful(review_id: int, db: Session = Depends(get_db)):
+    # Plain primary-key read: the vote itself takes no row lock on the review
+    stored = db.query(ReviewModel.helpful_count).filter(ReviewModel.review_id == review_id).first()
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Review not found")
+    helpful_votes.add(db, review_id)
+    if HELPFUL_FLUSH_INTERVAL <= 0:
+        db.commit()
+        helpful_votes.flush()
+        return {"review_id": review_id, "helpful_count": (stored.helpful_count or 0) + 1}
+    pending = helpful_votes.pending(db, review_id)
+    db.commit()
+    return {"review_id": review_id, "helpful_count": (stored.helpful_count or 0) + pending}
@@ -0,0 +1,223 @@
+# app/models/sales_rollup.py
+"""Daily sales rollups for the admin reports.
+
+sales_daily holds one row per (day, car, payment method) of paid sales:
+units, revenue (quantity x price_at_order) and the discount total behind
+the average. Manufacturer and category reports group those rows through
+cars, which is small, so one rollup answers every dimension.
+
+Maintenance is incremental. Triggers on purchase, orders and order_item
+append a mark for each day a write touched to sales_rollup_dirty (see
+migrations/0004_sales_rollups.sql); appends share no row, so the checkout
+path gains no contended counter. A mark becomes visible when its write
+commits, so the refresher, which recomputes the marked days from the base
+tables a batch of days per transaction, never consumes a mark before the
+data behind it is visible. The cost follows what changed rather than the
+size of order_item. Reports are as fresh as the last refresh, every
+SALES_ROLLUP_INTERVAL seconds.
+
+    python -m app.models.sales_rollup    # refresh every queued day now
+"""
+import logging
+import os
+import threading
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Column, Date, DateTime, Index, Integer, Numeric, String, text
+from sqlalchemy.orm import Session
+from app.database import get_db, Base, SessionLocal, engine
+
+# Seconds between refresher passes; 0 disables the background refresher
+SALES_ROLLUP_INTERVAL = int(os.getenv("SALES_ROLLUP_INTERVAL", "60"))
+SALES_ROLLUP_BATCH_DAYS = 31
+
+logger = logging.getLogger(__name__)
+
+class SalesDaily(Base):
+    """Paid sales of one car on one day through one payment method."""
+    __tablename__ = "sales_daily"
+
+    sales_day = Column(Date, primary_key=True)
+    car_id = Column(Integer, primary_key=True)
+    payment_method = Column(String(50), primary_key=True)  # 'unknown' when the purchase has none
+    units = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    discount_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    line_count = Column(BigInteger, nullable=False, default=0)
+
+class SalesRollupDirty(Base):
+    """A day whose rollup rows are out of date, appended by a trigger; a day may be marked many times."""
+    __tablename__ = "sales_rollup_dirty"
+
+    mark_id = Column(BigInteger, primary_key=True)
+    sales_day = Column(Date, nullable=False)
+    marked_at = Column(DateTime, default=datetime.utcnow, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (
+        Index("ix_sales_rollup_dirty_day", sales_day),
+    )
+
+class SalesReportRow(BaseModel):
+    key: Optional[str] = None  # the group: day, car id, manufacturer, category or payment method
+    label: Optional[str] = None
+    units: int
+    revenue: float
+    avg_discount: Optional[float] = None
+
+class SalesReport(BaseModel):
+    start: date
+    end: date
+    group_by: str
+    pending_days: int  # queued days not yet folded in; 0 means the report is current
+    rows: List[SalesReportRow]
+
+def refresh_sales_rollups(db: Session, batch_days: int = SALES_ROLLUP_BATCH_DAYS) -> int:
+    """Recompute one batch of queued days. Returns the number of days refreshed."""
+    # One refresher at a time: two rebuilding the same day would collide on its rows
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('sales_rollup'))")).scalar():
+        db.rollback()
+        return 0
+    # Every mark taken here was committed before this statement, so the recompute below
+    # sees the writes behind it; marks committed later stay queued for the next pass
+    days = sorted(set(db.execute(text("""
+        DELETE FROM sales_rollup_dirty
+        WHERE sales_day IN (
+            SELECT DISTINCT sales_day FROM sales_rollup_dirty
+            ORDER BY sales_day
+            LIMIT :batch
+        )
+        RETURNING sales_day
+    """), {"batch": batch_days}).scalars()))
+    if not days:
+        db.rollback()
+        return 0
+    db.execute(text("DELETE FROM sales_daily WHERE sales_day = ANY(:days)"), {"days": days})
+    db.execute(text("""
+        INSERT INTO sales_daily (sales_day, car_id, payment_method, units, revenue, discount_sum, line_count)
+        SELECT p.date, oi.car_id, COALESCE(p.payment_method, 'unknown'),
+               COALESCE(SUM(oi.quantity), 0),
+               COALESCE(SUM(oi.quantity * COALESCE(oi.price_at_order, 0)), 0),
+               SUM(COALESCE(oi.discount, 0)),
+               COUNT(*)
+        FROM purchase p
+        JOIN orders o ON o.purchase_id = p.purchase_id
+        JOIN order_item oi ON oi.order_id = o.order_id
+        -- order_item.car_id and quantity are nullable; a line without a car cannot be keyed
+        -- and would fail the whole batch, so it is left out rather than wedging the refresher
+        WHERE p.status = 'paid' AND p.date = ANY(:days) AND oi.car_id IS NOT NULL
+        GROUP BY p.date, oi.car_id, COALESCE(p.payment_method, 'unknown')
+    """), {"days": days})
+    db.commit()
+    return len(days)
+
+def refresh_all_sales_rollups() -> int:
+    """Drain the queue, one batch of days per transaction."""
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            refreshed = refresh_sales_rollups(db)
+        finally:
+            db.close()
+        total += refreshed
+        if refreshed < SALES_ROLLUP_BATCH_DAYS:
+            return total
+
+class SalesRollupRefresher:
+    """Daemon thread that runs refresh_all_sales_rollups every `interval` seconds."""
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # The marking triggers exist only on PostgreSQL, so elsewhere there is nothing to refresh
+        if self.interval <= 0 or self._thread is not None or engine.dialect.name != "postgresql":
+            return
+        self._thread = threading.Thread(target=self._run, name="sales-rollup-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                refresh_all_sales_rollups()
+            except Exception:  # keep refreshing after a transient database error
+                logger.exception("sales rollup refresh failed")
+
+sales_rollup_refresher = SalesRollupRefresher(SALES_ROLLUP_INTERVAL)
+
+# group_by -> (key expression, label expression, joins beyond sales_daily d)
+REPORT_GROUPS = {
+    "day": ("CAST(d.sales_day AS TEXT)", "NULL", ""),
+    "car": ("CAST(d.car_id AS TEXT)", "MAX(CONCAT_WS(' ', c.manufacturer, c.model_name))", "JOIN cars c ON c.car_id = d.car_id"),
+    "manufacturer": ("c.manufacturer", "NULL", "JOIN cars c ON c.car_id = d.car_id"),
+    "category": (
+        "CAST(c.category_id AS TEXT)",
+        "MAX(cat.name)",
+        "JOIN cars c ON c.car_id = d.car_id LEFT JOIN categories cat ON cat.category_id = c.category_id",
+    ),
+    "payment_method": ("d.payment_method", "NULL", ""),
+}
+
+def sales_report(db: Session, start: date, end: date, group_by: str, limit: int = 100) -> dict:
+    key, label, joins = REPORT_GROUPS[group_by]
+    # Days in date order; every other grouping best sellers first
+    order = "key" if group_by == "day" else "revenue DESC, key"
+    rows = db.execute(text(f"""
+        SELECT {key} AS key, {label} AS label,
+               SUM(d.units) AS units, SUM(d.revenue) AS revenue,
+               SUM(d.discount_sum) / NULLIF(SUM(d.line_count), 0) AS avg_discount
+        FROM sales_daily d
+        {joins}
+        WHERE d.sales_day BETWEEN :start AND :end
+        GROUP BY 1
+        ORDER BY {order}
+        LIMIT :limit
+    """), {"start": start, "end": end, "limit": limit}).all()
+    pending = db.execute(
+        text("SELECT COUNT(DISTINCT sales_day) FROM sales_rollup_dirty WHERE sales_day BETWEEN :start AND :end"),
+        {"start": start, "end": end},
+    ).scalar()
+    return {
+        "start": start,
+        "end": end,
+        "group_by": group_by,
+        "pending_days": pending,
+        "rows": [
+            {
+                "key": row.key,
+                "label": row.label,
+                "units": row.units,
+                "revenue": float(row.revenue),
+                "avg_discount": None if row.avg_discount is None else float(row.avg_discount),
+            }
+            for row in rows
+        ],
+    }
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+@router.get("/sales", response_model=SalesReport)
+def read_sales_report(
+    start: date,
+    end: date,
+    group_by: str = "day",
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    if group_by not in REPORT_GROUPS:
+        raise HTTPException(status_code=400, detail=f"Unsupported grouping: {group_by}")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end is before start")
+    return sales_report(db, start, end, group_by, limit)
+
+if __name__ == "__main__":
+    # One-off refresh, e.g. from cron where no long-running server hosts the refresher
+    print(f"Refreshed {refresh_all_sales_rollups()} days of sales rollups")
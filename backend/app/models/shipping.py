@@ -1,10 +1,12 @@
 # app/models/shipping.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import Column, Integer, String, Date, ForeignKey
 from sqlalchemy.orm import Session, relationship
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import create_row
+from app.pagination import paginate, set_next_cursor
 from datetime import date  # Fix: Import date
 
 class Shipping(Base):
@@ -38,28 +40,29 @@ class ShippingResponse(ShippingBase):
     class Config:
         orm_mode = True
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (Shipping.shipping_id,)
+
 router = APIRouter(prefix="/shippings", tags=["shippings"])
 
 def get_shipping(db: Session, shipping_id: int):
     return db.query(Shipping).filter(Shipping.shipping_id == shipping_id).first()
 
-def get_shippings(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Shipping).offset(skip).limit(limit).all()
+def get_shippings(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(Shipping), PAGE_KEY, skip, limit, cursor)
 
 def create_shipping(db: Session, shipping: ShippingCreate):
-    db_shipping = Shipping(**shipping.dict())
-    db.add(db_shipping)
-    db.commit()
-    db.refresh(db_shipping)
-    return db_shipping
+    return create_row(db, Shipping, shipping.dict())
 
 @router.post("/", response_model=ShippingResponse)
 def create_shipping_endpoint(shipping: ShippingCreate, db: Session = Depends(get_db)):
     return create_shipping(db, shipping)
 
 @router.get("/", response_model=List[ShippingResponse])
-def read_shippings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_shippings(db, skip, limit)
+def read_shippings(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    shippings = get_shippings(db, skip, limit, cursor)
+    set_next_cursor(response, shippings, limit, PAGE_KEY)
+    return shippings
 
 @router.get("/{shipping_id}", response_model=ShippingResponse)
 def read_shipping(shipping_id: int, db: Session = Depends(get_db)):
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import Column, Integer, String, Date
-from sqlalchemy.orm import Session, relationship
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import Column, Integer, String, Date, or_
+from sqlalchemy.orm import Session, load_only, relationship, selectinload
 from pydantic import BaseModel
 from typing import List, Optional
 from app.database import get_db, Base
+from app.writes import create_row
+from app.pagination import paginate, set_next_cursor
+from app.fast_json import FAST_JSON, fast_json, schema_serializer
 from datetime import date, datetime
-from passlib.context import CryptContext
+from app.hashing import HashingBusy, hash_password, verify_password
 from app.models.purchase import PurchaseModel
 from app.models.order import Order
 from app.models.order_item import OrderItem
@@ -13,9 +16,6 @@ from app.models.order_item import OrderItem
 class PurchaseIdResponse(BaseModel):
     purchase_id: Optional[int] = None
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class User(Base):
     __tablename__ = "users"
     
@@ -105,6 +105,9 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+# Keyset used by cursor pagination of the list endpoint
+PAGE_KEY = (User.user_id,)
+
 router = APIRouter(prefix="/users", tags=["users"])
 
 def get_user(db: Session, user_id: int):
@@ -113,12 +116,25 @@ def get_user(db: Session, user_id: int):
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_user_by_email_or_username(db: Session, email: str, username: str):
+    """A user holding the email or the username; the email's holder when both are taken."""
+    return (
+        db.query(User)
+        .filter(or_(User.email == email, User.username == username))
+        # At most two rows match; put the email match first so signup reports it like before
+        .order_by((User.email == email).desc())
+        .first()
+    )
+
+# Rows -> UserResponse dicts for the fast JSON path
+user_list_out = schema_serializer("user_list", UserResponse, User.__table__.columns)
+
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, entities=(User,)):
+    return paginate(db.query(*entities), PAGE_KEY, skip, limit, cursor)
 
 def create_user(db: Session, user: UserCreate):
-    hashed_password = pwd_context.hash(user.password)
-    db_user = User(
+    hashed_password = hash_password(user.password)
+    return create_row(db, User, dict(
         email=user.email,
         username=user.username,
         password=hashed_password,
@@ -127,15 +143,34 @@ def create_user(db: Session, user: UserCreate):
         dob=user.dob,
         card_num=user.card_num,
         bank_acc=user.bank_acc
+    ))
+
+def _summary_columns(model, schema):
+    """The mapped attributes of `model` that `schema` serializes."""
+    return [getattr(model, field) for field in schema.__fields__]
+
+def get_user_with_activity(db: Session, user_id: int):
+    """The user plus reviews and purchases in three queries, whatever their size.
+
+    Each collection is loaded with one IN query (no lazy load per access, no
+    join that multiplies rows) and only the columns UserWithActivityResponse
+    reads are selected.
+    """
+    review_model = User.reviews.property.mapper.class_
+    return (
+        db.query(User)
+        .options(
+            load_only(*_summary_columns(User, UserPublic)),
+            selectinload(User.reviews).load_only(*_summary_columns(review_model, ReviewSummary)),
+            selectinload(User.purchases).load_only(*_summary_columns(PurchaseModel, PurchaseSummary)),
+        )
+        .filter(User.user_id == user_id)
+        .first()
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
 
 @router.get("/{user_id}/all", response_model=UserWithActivityResponse)
 def get_user_full_info(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = get_user_with_activity(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -157,17 +192,23 @@ def update_user_endpoint(user_id: int, user_update: UserUpdate, db: Session = De
 
 @router.post("/", response_model=UserResponse)
 def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, user.email)
-    if db_user:
+    # One lookup over both unique indexes instead of one query per field
+    db_user = get_user_by_email_or_username(db, user.email, user.username)
+    if db_user and db_user.email == user.email:
         raise HTTPException(status_code=400, detail="Email already registered")
-    db_user = get_user_by_email(db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already taken")
     return create_user(db, user)
 
 @router.get("/", response_model=List[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_users(db, skip, limit)
+def read_users(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    if FAST_JSON:
+        rows = get_users(db, skip, limit, cursor, entities=user_list_out.columns)
+        set_next_cursor(response, rows, limit, PAGE_KEY)
+        return fast_json(user_list_out.rows(rows), response)
+    users = get_users(db, skip, limit, cursor)
+    set_next_cursor(response, users, limit, PAGE_KEY)
+    return users
 
 @router.get("/{user_id}", response_model=UserPublic)
 def read_user(user_id: int, db: Session = Depends(get_db)):
@@ -200,10 +241,13 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     try:
-        if not pwd_context.verify(user.password, db_user.password):
-            raise HTTPException(status_code=401, detail="Invalid email or password")
+        password_ok = verify_password(user.password, db_user.password)
+    except HashingBusy:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error verifying password")
+    if not password_ok:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
     return {
         "message": "Login successful",
         "user_id": db_user.user_id,
@@ -0,0 +1,70 @@
+# app/pagination.py
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+# Header that carries the cursor for the next page of a list endpoint
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _to_json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _from_json_value(value, column):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode the sort key of the last row of a page as an opaque token."""
+    payload = json.dumps([_to_json_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence) -> List:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_from_json_value(v, c) for v, c in zip(values, columns)]
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query, columns: Sequence, skip: int = 0, limit: int = 100,
+             cursor: Optional[str] = None, descending: bool = False):
+    """Return one page of `query` ordered by the keyset `columns`.
+
+    With a cursor the page starts right after the row the cursor was taken
+    from, so every page is an index range scan. Without one the legacy
+    `skip` offset is used.
+    """
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+    if cursor is not None:
+        values = decode_cursor(cursor, columns)
+        bound = tuple_(*values) if len(values) > 1 else values[0]
+        query = query.filter(key < bound if descending else key > bound)
+    order_by = [c.desc() if descending else c.asc() for c in columns]
+    query = query.order_by(*order_by)
+    if cursor is None and skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int, columns: Sequence):
+    """Expose the cursor for the page after `rows`, if there can be one."""
+    if not rows or len(rows) < limit:
+        return
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, c.key) for c in columns])
@@ -0,0 +1,127 @@
+# app/pool.py
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from dotenv import load_dotenv
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+load_dotenv()
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return value.lower() in ("1", "true", "yes", "on") if value not in (None, "") else default
+
+# Pool settings, all overridable from the environment
+POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 2)  # seconds to wait for a connection before answering 503
+POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", -1)  # seconds; -1 (the default) keeps connections forever
+POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)  # 0 leaves the server default
+
+class LatencyHistogram:
+    """Latency histogram with fixed millisecond buckets (per-bucket, not cumulative, counts)."""
+
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.total += 1
+            self.sum_ms += ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{b}ms" for b in self.BUCKETS_MS] + ["inf"]
+            return {
+                "count": self.total,
+                "avg_ms": round(self.sum_ms / self.total, 3) if self.total else None,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkout_latency = LatencyHistogram()
+        self.wait_time = LatencyHistogram()
+        self.timeouts = 0
+
+metrics = PoolMetrics()
+
+class InstrumentedPoolMixin:
+    """Times every checkout; checkouts that found the pool full also count as waits."""
+
+    def _do_get(self):
+        saturated = self.checkedout() >= self.size() + max(self._max_overflow, 0)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.checkout_latency.observe(elapsed)
+            if saturated:
+                metrics.wait_time.observe(elapsed)
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url, is_async: bool = False, serverless: bool = False) -> dict:
+    """Keyword arguments for create_engine / create_async_engine from the pool settings.
+
+    Serverless instances get a NullPool: each checkout opens a fresh
+    connection to the external pooler (e.g. Neon's PgBouncer endpoint) and
+    closes it on release, so frozen lambdas never hold idle connections.
+    """
+    if serverless:
+        options = {"poolclass": NullPool}
+    else:
+        options = {
+            "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "pool_recycle": POOL_RECYCLE,
+            "pool_pre_ping": POOL_PRE_PING,
+        }
+    if STATEMENT_TIMEOUT_MS and url.drivername.startswith("postgresql"):
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "null", "status": pool.status()}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": MAX_OVERFLOW,
+        "timeout_s": POOL_TIMEOUT,
+        "pre_ping": POOL_PRE_PING,
+        "timeouts": metrics.timeouts,
+        "checkout_latency": metrics.checkout_latency.snapshot(),
+        "wait_time": metrics.wait_time.snapshot(),
+    }
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.database import get_db
+from app.models.car import Car, car_index
+from app.pagination import decode_cursor, set_next_cursor
+from app.cache import invalidate_car
+from app.query_cache import cached_report
 from pydantic import BaseModel
 
 class NewCar(BaseModel):
@@ -37,8 +42,50 @@ router = APIRouter(
     tags=["queries"],
 )
 
+# Keyset of the price-ordered category comparisons, walked on ix_cars_price (price, car_id)
+PRICE_KEYSET = (Car.price, Car.car_id)
+
+def _category_price_stats(db: Session, category_id: int):
+    # Only migration 0005's triggers fill category_price_stats. Without a row for the category
+    # (migrations not run yet, or not PostgreSQL) read the same figures from ix_cars_category_price
+    if db.get_bind().dialect.name == "postgresql":
+        stats = db.execute(text("""
+            SELECT car_count , priced_count , max_price
+            FROM category_price_stats
+            WHERE category_id = :cat_id;
+        """), {"cat_id": category_id}).first()
+        if stats is not None:
+            return stats
+    return db.execute(text("""
+        SELECT COUNT(*) AS car_count , COUNT(price) AS priced_count , MAX(price) AS max_price
+        FROM cars
+        WHERE category_id = :cat_id;
+    """), {"cat_id": category_id}).first()
+
+def _price_page(db: Session, columns: str, condition: str, params: dict, descending: bool,
+                limit: int, cursor: Optional[str], response: Response):
+    """One page of priced cars matching `condition`, by price then car_id; `columns` must include both."""
+    direction, after = ("DESC", "<") if descending else ("ASC", ">")
+    if cursor is not None:
+        after_price, after_id = decode_cursor(cursor, PRICE_KEYSET)
+        params = {**params, "after_price": after_price, "after_id": after_id}
+        condition += f" AND (price , car_id) {after} (:after_price , :after_id)"
+    rows = db.execute(text(f"""
+        SELECT {columns}
+        FROM cars
+        WHERE price IS NOT NULL AND {condition}
+        ORDER BY price {direction} , car_id {direction}
+        LIMIT :limit;
+    """), {**params, "limit": limit}).fetchall()
+    set_next_cursor(response, rows, limit, PRICE_KEYSET)
+    return rows
+
+# The GET reports are cached per parameters and tagged with the tables their SQL reads;
+# see app.query_cache. Writes anywhere in the API invalidate them through Session hooks.
+
 # 1. Available Cars with Category (NATURAL JOIN)
 @router.get("/available-cars-with-category")
+@cached_report("cars", "categories")
 def get_available_cars_with_category(db: Session = Depends(get_db)):
     query = text("""
         SELECT c.model_name , c.manufacturer , c.year , c.price , cat.name AS category_name
@@ -51,6 +98,7 @@ def get_available_cars_with_category(db: Session = Depends(get_db)):
 
 # 2. All Users and Their Purchases (LEFT OUTER JOIN)
 @router.get("/users-and-purchases")
+@cached_report("users", "purchase")
 def get_users_and_purchases(db: Session = Depends(get_db)):
     query = text("""
         SELECT u.username , p.purchase_id , p.amount , p.date
@@ -63,6 +111,7 @@ def get_users_and_purchases(db: Session = Depends(get_db)):
 
 # 3. Order Details with Car Information (USING Clause)
 @router.get("/order-details-with-car-info")
+@cached_report("orders", "order_item", "cars")
 def get_order_details_with_car_info(db: Session = Depends(get_db)):
     query = text("""
         SELECT o.order_id , o.date AS order_date , c.model_name
@@ -76,6 +125,7 @@ def get_order_details_with_car_info(db: Session = Depends(get_db)):
 
 # 4. Users with Completed Purchases (EXISTS)
 @router.get("/users-with-completed-purchases")
+@cached_report("users", "purchase")
 def get_users_with_completed_purchases(db: Session = Depends(get_db)):
     query = text("""
         SELECT u.username , u.email
@@ -90,65 +140,76 @@ def get_users_with_completed_purchases(db: Session = Depends(get_db)):
     result = db.execute(query).fetchall()
     return [{"username": row[0], "email": row[1]} for row in result]
 
-# 5. Cars More Expensive Than All Cars in a Category (ALL)
+# 5. Cars More Expensive Than All Cars in a Category (ALL, via the category's maximum)
 @router.get("/cars-more-expensive-than-category/{category_id}")
-def get_cars_more_expensive_than_category(category_id: int, db: Session = Depends(get_db)):
-    query = text("""
-        SELECT model_name , price
-        FROM cars
-        WHERE price > ALL (
-            SELECT price
-            FROM cars
-            WHERE category_id = :cat_id
-        )
-        ORDER BY price DESC;
-    """)
-    result = db.execute(query, {"cat_id": category_id}).fetchall()
-    return [{"model_name": row[0], "price": row[1]} for row in result]
+@cached_report("cars", "category_price_stats")
+def get_cars_more_expensive_than_category(
+    category_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # price > ALL (...) is price > MAX(...), except that an empty category passes every car
+    # and a NULL price in the category passes none
+    stats = _category_price_stats(db, category_id)
+    if stats.car_count == 0:
+        condition, params = "TRUE", {}
+    elif stats.priced_count < stats.car_count:
+        return []
+    else:
+        condition, params = "price > :max_price", {"max_price": stats.max_price}
+    rows = _price_page(db, "car_id , model_name , price", condition, params, True, limit, cursor, response)
+    return [{"car_id": row[0], "model_name": row[1], "price": row[2]} for row in rows]
 
-# 6. Employees and Number of Orders Handled (Scalar Subquery)
+# 6. Employees and Number of Orders Handled (LEFT JOIN on maintained counts)
 @router.get("/employees-and-orders-handled")
+@cached_report("employees", "employee_shipment_stats", "shipping")
 def get_employees_and_orders_handled(db: Session = Depends(get_db)):
+    # Counts come from employee_shipment_stats (kept by a trigger on shipping), not a scan per employee
     query = text("""
         SELECT e.emp_id , e.name , e.position ,
-        (
-            SELECT COUNT(*)
-            FROM shipping s
-            WHERE s.emp_id = e.emp_id
-        ) AS total_shipments ,
-        (
-            SELECT COUNT(*)
-            FROM shipping s
-            WHERE s.emp_id = e.emp_id
-            AND s.status = 'delivered'
-        ) AS deliveries_completed
+        COALESCE(s.total_shipments, 0) AS total_shipments ,
+        COALESCE(s.delivered, 0) AS deliveries_completed ,
+        COALESCE(s.delayed, 0) AS deliveries_delayed ,
+        COALESCE(s.failed, 0) AS deliveries_failed ,
+        s.last_shipped_date
         FROM employees e
+        LEFT JOIN employee_shipment_stats s ON s.emp_id = e.emp_id
         WHERE e.status = 'active'
         ORDER BY deliveries_completed DESC, total_shipments DESC, e.name;
     """)
     result = db.execute(query).fetchall()
-    return [{"emp_id": row[0], "name": row[1], "position": row[2], "total_shipments": row[3], "deliveries_completed": row[4]} for row in result]
+    return [
+        {
+            "emp_id": row[0], "name": row[1], "position": row[2], "total_shipments": row[3], "deliveries_completed": row[4],
+            "deliveries_delayed": row[5], "deliveries_failed": row[6], "last_shipped_date": row[7],
+        }
+        for row in result
+    ]
 
 # 7. Top 5 Most Reviewed Cars (WITH/CTE)
 @router.get("/top-5-most-reviewed-cars")
+@cached_report("car_review_stats", "cars")
 def get_top_5_most_reviewed_cars(db: Session = Depends(get_db)):
     query = text("""
         WITH CarReviews AS (
-            SELECT c.model_name , c.manufacturer , COUNT(r.review_id) AS review_count
-            FROM cars c
-            LEFT JOIN reviews r ON c.car_id = r.car_id
-            GROUP BY c.model_name , c.manufacturer
+            SELECT s.car_id , s.review_count
+            FROM car_review_stats s
+            ORDER BY s.review_count DESC
+            LIMIT 5
         )
-        SELECT model_name , manufacturer , review_count
-        FROM CarReviews
-        ORDER BY review_count DESC
-        LIMIT 5;
+        SELECT c.model_name , c.manufacturer , cr.review_count
+        FROM CarReviews cr
+        JOIN cars c ON c.car_id = cr.car_id
+        ORDER BY cr.review_count DESC;
     """)
     result = db.execute(query).fetchall()
     return [{"model_name": row[0], "manufacturer": row[1], "review_count": row[2]} for row in result]
 
 # 8. Available Cars and Inventory Quantities (INNER JOIN)
 @router.get("/available-cars-and-inventory")
+@cached_report("cars", "car_inventory")
 def get_available_cars_and_inventory(db: Session = Depends(get_db)):
     query = text("""
         SELECT c.model_name , c.manufacturer , ci.quantity , ci.location
@@ -162,21 +223,35 @@ def get_available_cars_and_inventory(db: Session = Depends(get_db)):
 
 # 9. Employees and Their Shipping Records (RIGHT OUTER JOIN)
 @router.get("/employees-and-shipping-records")
+@cached_report("shipping", "employees", "employee_shipment_stats")
 def get_employees_and_shipping_records(db: Session = Depends(get_db)):
+    # Each employee's totals are one primary-key row of employee_shipment_stats
     query = text("""
         SELECT e.emp_id , e.name AS employee_name , e.department ,
         s.ship_id , s.shipping_provider , s.status AS shipping_status ,
-        s.shipped_date , s.delivery_date
+        s.shipped_date , s.delivery_date ,
+        COALESCE(st.total_shipments, 0) AS total_shipments ,
+        COALESCE(st.delivered, 0) AS deliveries_completed ,
+        st.last_shipped_date
         FROM shipping s
         RIGHT OUTER JOIN employees e ON s.emp_id = e.emp_id
+        LEFT JOIN employee_shipment_stats st ON st.emp_id = e.emp_id
         WHERE e.status = 'active'
         ORDER BY s.shipped_date DESC NULLS LAST;
     """)
     result = db.execute(query).fetchall()
-    return [{"emp_id": row[0], "employee_name": row[1], "department": row[2], "ship_id": row[3], "shipping_provider": row[4], "shipping_status": row[5], "shipped_date": row[6], "delivery_date": row[7]} for row in result]
+    return [
+        {
+            "emp_id": row[0], "employee_name": row[1], "department": row[2], "ship_id": row[3], "shipping_provider": row[4],
+            "shipping_status": row[5], "shipped_date": row[6], "delivery_date": row[7],
+            "total_shipments": row[8], "deliveries_completed": row[9], "last_shipped_date": row[10],
+        }
+        for row in result
+    ]
 
 # 10. Visible Reviews with User and Car Details (Multiple JOIN)
 @router.get("/visible-reviews")
+@cached_report("reviews", "users", "cars")
 def get_visible_reviews(db: Session = Depends(get_db)):
     query = text("""
         SELECT r.review_id , r.rating , r.review_text , u.username , c.model_name
@@ -189,13 +264,15 @@ def get_visible_reviews(db: Session = Depends(get_db)):
     result = db.execute(query).fetchall()
     return [{"review_id": row[0], "rating": row[1], "review_text": row[2], "username": row[3], "model_name": row[4]} for row in result]
 
-# 11. Electric or Hybrid Cars (Pattern Matching)
+# 11. Electric or Hybrid Cars (case-insensitive match)
 @router.get("/electric-or-hybrid-cars")
+@cached_report("cars")
 def get_electric_or_hybrid_cars(db: Session = Depends(get_db)):
+    # Same rows as engine_type ~* '^(electric|hybrid)$', but ix_cars_available_engine_type can serve it
     query = text("""
         SELECT model_name , manufacturer , engine_type
         FROM cars
-        WHERE engine_type ~* '^(electric|hybrid)$'
+        WHERE lower(engine_type) IN ('electric' , 'hybrid')
         AND available = TRUE
         ORDER BY model_name;
     """)
@@ -229,6 +306,8 @@ def create_car(car: NewCar, db: Session = Depends(get_db)):
     db.execute(inventory_query, {"car_id": car_id})
 
     db.commit()
+    car_index.invalidate()
+    invalidate_car(car_id)
     return {"car_id": car_id, "model_name": result[1], "price": result[2]}
 
 # 13. Register a New User (INSERT)
@@ -259,26 +338,32 @@ def update_car(car_id: int, car: UpdateCar, db: Session = Depends(get_db)):
     """)
     result = db.execute(query, {"car_id": car_id, "price": car.price, "available": car.available}).fetchone()
     db.commit()
+    car_index.invalidate()
+    invalidate_car(car_id)
     if result:
         return {"car_id": result[0], "model_name": result[1], "price": result[2], "available": result[3]}
     else:
         raise HTTPException(status_code=404, detail="Car not found")
 
-# 15. Cars Cheaper Than Those in a Category (ANY Subquery)
+# 15. Cars Cheaper Than Those in a Category (ANY, via the category's maximum)
 @router.get("/cars-cheaper-than-category/{category_id}")
-def get_cars_cheaper_than_category(category_id: int, db: Session = Depends(get_db)):
-    query = text("""
-        SELECT c.car_id , c.model_name , c.manufacturer , c.price
-        FROM cars c
-        WHERE c.price < ANY (
-            SELECT c2.price
-            FROM cars c2
-            WHERE c2.category_id = :cat_id
-        )
-        ORDER BY c.price ASC;
-    """)
-    result = db.execute(query, {"cat_id": category_id}).fetchall()
-    return [{"car_id": row[0], "model_name": row[1], "manufacturer": row[2], "price": row[3]} for row in result]
+@cached_report("cars", "category_price_stats")
+def get_cars_cheaper_than_category(
+    category_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # price < ANY (...) is price < MAX(...); a category without prices passes no car
+    stats = _category_price_stats(db, category_id)
+    if stats.priced_count == 0:
+        return []
+    rows = _price_page(
+        db, "car_id , model_name , manufacturer , price", "price < :max_price",
+        {"max_price": stats.max_price}, False, limit, cursor, response,
+    )
+    return [{"car_id": row[0], "model_name": row[1], "manufacturer": row[2], "price": row[3]} for row in rows]
 
 # 16. Delete User by Email (DELETE)
 @router.delete("/users/{email}")
@@ -294,3 +379,43 @@ def delete_user(email: str, db: Session = Depends(get_db)):
         return {"user_id": result[0], "username": result[1], "email": result[2]}
     else:
         raise HTTPException(status_code=404, detail="User not found")
+
+# 17. Every Category Against the Price Comparisons (batch of 5 and 15)
+@router.get("/category-price-comparison")
+@cached_report("categories", "cars", "category_price_stats")
+def get_category_price_comparison(db: Session = Depends(get_db)):
+    # One row per category: its price stats and how many cars pass each comparison, the
+    # counts being range counts on ix_cars_price above or below the category's maximum.
+    # A category without a stats row is aggregated from ix_cars_category_price instead, as
+    # every category is off PostgreSQL, where the median is not computed.
+    postgresql = db.get_bind().dialect.name == "postgresql"
+    median = (
+        "CAST(percentile_cont(0.5) WITHIN GROUP (ORDER BY c.price) AS NUMERIC(12, 2))" if postgresql else "NULL"
+    )
+    fallback = "(SELECT {} FROM cars c WHERE c.category_id = cat.category_id)"
+    query = text(f"""
+        WITH stats AS (
+            SELECT cat.category_id , cat.name ,
+            CASE WHEN s.category_id IS NULL THEN {fallback.format("COUNT(*)")} ELSE s.car_count END AS car_count ,
+            CASE WHEN s.category_id IS NULL THEN {fallback.format("COUNT(c.price)")} ELSE s.priced_count END AS priced_count ,
+            CASE WHEN s.category_id IS NULL THEN {fallback.format("MIN(c.price)")} ELSE s.min_price END AS min_price ,
+            CASE WHEN s.category_id IS NULL THEN {fallback.format("MAX(c.price)")} ELSE s.max_price END AS max_price ,
+            CASE WHEN s.category_id IS NULL THEN {fallback.format(median)} ELSE s.median_price END AS median_price
+            FROM categories cat
+            LEFT JOIN category_price_stats s ON s.category_id = cat.category_id AND :use_stats
+        )
+        SELECT category_id , name , car_count , min_price , max_price , median_price ,
+        CASE
+            WHEN car_count = 0 THEN (SELECT COUNT(*) FROM cars WHERE price IS NOT NULL)
+            WHEN priced_count < car_count THEN 0
+            ELSE (SELECT COUNT(*) FROM cars WHERE price > stats.max_price)
+        END AS more_expensive_count ,
+        CASE
+            WHEN priced_count = 0 THEN 0
+            ELSE (SELECT COUNT(*) FROM cars WHERE price < stats.max_price)
+        END AS cheaper_count
+        FROM stats
+        ORDER BY category_id;
+    """)
+    result = db.execute(query, {"use_stats": postgresql}).fetchall()
+    return [dict(row._mapping) for row in result]
@@ -0,0 +1,213 @@
+# app/query_cache.py
+"""Versioned result cache for the /queries report endpoints.
+
+Every table has a change version in the table_versions table, shared by
+all workers and serverless instances. Session hooks find the tables a
+transaction writes: DML statements sent through Session.execute,
+including text() SQL, and objects flushed by the ORM. Just before the
+transaction commits, one upsert bumps the shared versions of those
+tables, so they change in the same commit as the data and every write
+path in the routers counts without each one having to opt in. Writers
+that go around the Session, on a bare Connection (app.ingest), publish
+their tables themselves inside their transaction. Each worker also keeps
+its own counters, bumped after its commits, so its own writes show at
+once. It re-reads the shared versions at most every QUERY_VERSION_POLL
+seconds, which bounds how long another worker's write can go unseen.
+
+The cost is one more statement per write transaction. The version row
+of each written table is locked from that statement to the commit, so
+writers of one table serialize only for that last round trip. A table
+that takes a write per click and that no report reads (the helpful-vote
+log) is excluded with `table_versions.ignore()`.
+
+A cached result stores the versions of its source tables as they were
+before it was loaded. It is served only while those versions still hold.
+A write to any other table leaves it alone. A load that races a commit is
+stored under the old versions and is never served.
+
+Responses carry a strong ETag of the JSON body. A request whose
+If-None-Match still matches a valid entry gets 304 without running the
+report's SQL. Writes made outside the API (psql, triggers) bump no
+version; QUERY_CACHE_TTL bounds how long those can go unnoticed.
+"""
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from typing import Iterable, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import BigInteger, Column, String, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+from app.cache import LRUCache
+from app.database import Base, engine
+
+# Seconds a cached report may be served without a write to its tables through the API
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+# Seconds a worker reuses the shared table versions before reading them again
+QUERY_VERSION_POLL = float(os.getenv("QUERY_VERSION_POLL", "1"))
+
+logger = logging.getLogger(__name__)
+
+# Target tables of the DML in a text() statement
+_TEXT_DML_TARGET = re.compile(r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(\w+)", re.IGNORECASE)
+
+class TableVersion(Base):
+    """The change counter of one table, shared by every worker."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(100), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class TableVersions:
+    """Per-table change counters: the shared ones in table_versions, plus this process's own."""
+
+    def __init__(self, poll: float = QUERY_VERSION_POLL):
+        self.poll = poll
+        self._local = {}
+        self._shared = {}
+        self._read_at = None
+        self._ignored = set()
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+
+    def ignore(self, table: str):
+        """Leave `table` unversioned: no cached result may read it."""
+        self._ignored.add(table)
+
+    def publish(self, conn, tables: Iterable[str]):
+        """Bump the shared versions of `tables` in the transaction on `conn`."""
+        tables = sorted(set(tables) - self._ignored)
+        if not tables:
+            return
+        # Rows in key order, so two writers bumping overlapping tables cannot deadlock
+        rows = ", ".join(f"(:table_{index}, 1)" for index in range(len(tables)))
+        conn.execute(
+            text(f"""
+                INSERT INTO table_versions (table_name, version) VALUES {rows}
+                ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1
+            """),
+            {f"table_{index}": table for index, table in enumerate(tables)},
+        )
+
+    def bump(self, tables: Iterable[str]):
+        """Bump this process's versions of `tables`, after their writes committed."""
+        with self._lock:
+            for table in tables:
+                self._local[table] = self._local.get(table, 0) + 1
+
+    def _shared_versions(self) -> dict:
+        with self._poll_lock:
+            if self._read_at is None or time.monotonic() - self._read_at >= self.poll:
+                read_at = time.monotonic()
+                with engine.connect() as conn:
+                    self._shared = dict(conn.execute(text("SELECT table_name, version FROM table_versions")).all())
+                self._read_at = read_at
+            return self._shared
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[int, int], ...]:
+        shared = self._shared_versions()
+        with self._lock:
+            return tuple((shared.get(table, 0), self._local.get(table, 0)) for table in tables)
+
+table_versions = TableVersions()
+report_cache = LRUCache("query_reports", maxsize=512, ttl=QUERY_CACHE_TTL)
+
+def _written(session: Session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement(state):
+    statement = state.statement
+    if isinstance(statement, UpdateBase):
+        _written(state.session).add(statement.table.name)
+    elif isinstance(statement, TextClause):
+        _written(state.session).update(name.lower() for name in _TEXT_DML_TARGET.findall(statement.text))
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        _written(session).add(type(obj).__table__.name)
+
+@event.listens_for(Session, "before_commit")
+def _publish_written(session):
+    # Flush first: objects still pending are only written, and recorded, by the commit's own flush
+    session.flush()
+    tables = session.info.get("written_tables")
+    if tables:
+        table_versions.publish(session.connection(), tables)
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        table_versions.bump(tables)
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_uncommitted(session, transaction):
+    # A rolled-back or closed transaction changed nothing; after a commit the set is already gone
+    if transaction.parent is None:
+        session.info.pop("written_tables", None)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 asks for If-None-Match
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+def _respond(request: Request, etag: str, body: bytes, extra_headers: dict) -> Response:
+    headers = {**extra_headers, "ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def cached_report(*tables: str):
+    """Cache a GET report endpoint's result by path parameters, tagged with the tables its SQL reads.
+
+    The wrapped endpoint also takes the Request, for If-None-Match. Its `db`
+    session is only used on a miss; a hit at most reads table_versions. An
+    endpoint that declares `response: Response` gets a fresh one on a miss;
+    the headers it sets there (a next-page cursor) are cached with the body.
+    """
+    tables = tuple(sorted(tables))
+
+    def decorate(endpoint):
+        signature = inspect.signature(endpoint)
+        takes_response = "response" in signature.parameters
+        parameters = [
+            *(p for p in signature.parameters.values() if p.name != "response"),
+            inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ]
+
+        @functools.wraps(endpoint)
+        def cached_endpoint(**kwargs):
+            request = kwargs.pop("request")
+            key = (endpoint.__name__, tuple(sorted((name, value) for name, value in kwargs.items() if name != "db")))
+            versions = table_versions.snapshot(tables)
+            entry = report_cache.get(key)
+            if entry is not None and entry[0] == versions:
+                return _respond(request, *entry[1:])
+            if takes_response:
+                kwargs["response"] = Response()
+            body = JSONResponse(content=jsonable_encoder(endpoint(**kwargs))).body
+            headers = {}
+            if takes_response:
+                headers = {name: value for name, value in kwargs["response"].headers.items() if name != "content-length"}
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            report_cache.set(key, (versions, etag, body, headers))
+            return _respond(request, etag, body, headers)
+
+        cached_endpoint.__signature__ = signature.replace(parameters=parameters)
+        return cached_endpoint
+
+    return decorate
@@ -0,0 +1,131 @@
+# app/search.py
+"""Text search over the car catalog and visible review text.
+
+On PostgreSQL, cars are matched two ways and ranked together:
+  - full text on car_search_document(), which weights the name (A), the
+    model number (B) and the description fields (C) like
+    generate_car_description does;
+  - trigram word similarity on car_search_name(), so a misspelled
+    manufacturer or model still finds the car.
+Visible reviews are matched with English full text. Every match is an
+expression index from migrations/0006_text_search.sql, and PostgreSQL
+keeps those indexes current on every write.
+
+A common word can match most of the table. Each index's matches are
+ranked inside their own subquery, and only the best SEARCH_CANDIDATES of
+each are carried on. The join back to the rows and the final ranking on
+the combined score therefore stay bounded at catalog scale. Other
+databases fall back to the in-process TextSearchIndex (app.text_index),
+which matches words the same way.
+"""
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.text_index import TextSearchIndex
+
+# Best-ranked matches carried on per index; bounds a query's final ranking for very common words
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "1000"))
+SEARCH_SCOPES = ("all", "cars", "reviews")
+
+# Must match the index expressions in migrations/0006_text_search.sql to be planned onto them
+CAR_DOCUMENT = "car_search_document(c.manufacturer, c.model_name, c.modelnum, c.year, c.engine_type, c.transmission, c.color)"
+CAR_NAME = "car_search_name(c.manufacturer, c.model_name, c.modelnum)"
+REVIEW_DOCUMENT = "to_tsvector('english', COALESCE(r.review_text, ''))"
+
+# Fallback for databases without tsvector and pg_trgm
+text_index = TextSearchIndex()
+
+class CarSearchHit(BaseModel):
+    car_id: int
+    manufacturer: Optional[str] = None
+    model_name: Optional[str] = None
+    modelnum: Optional[str] = None
+    year: Optional[int] = None
+    engine_type: Optional[str] = None
+    transmission: Optional[str] = None
+    color: Optional[str] = None
+    price: Optional[float] = None
+    score: float
+
+class ReviewSearchHit(BaseModel):
+    review_id: int
+    car_id: int
+    rating: int
+    review_text: Optional[str] = None
+    created_at: Optional[datetime] = None
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    cars: List[CarSearchHit]
+    reviews: List[ReviewSearchHit]
+
+def search_cars(db: Session, q: str, limit: int) -> List[dict]:
+    if db.get_bind().dialect.name != "postgresql":
+        return text_index.search_cars(db, q, limit)
+    # Typos break the full-text match (every word must match) but not the trigram one
+    rows = db.execute(text(f"""
+        WITH matched AS (
+            (SELECT c.car_id FROM cars c
+             WHERE {CAR_DOCUMENT} @@ websearch_to_tsquery('simple', :q)
+             ORDER BY ts_rank_cd({CAR_DOCUMENT}, websearch_to_tsquery('simple', :q)) DESC, c.car_id
+             LIMIT :candidates)
+            UNION
+            (SELECT c.car_id FROM cars c
+             WHERE :q <% {CAR_NAME}
+             ORDER BY :q <<-> {CAR_NAME}, c.car_id
+             LIMIT :candidates)
+        )
+        SELECT c.car_id, c.manufacturer, c.model_name, c.modelnum, c.year,
+               c.engine_type, c.transmission, c.color, c.price,
+               ts_rank_cd({CAR_DOCUMENT}, websearch_to_tsquery('simple', :q))
+               + word_similarity(:q, {CAR_NAME}) AS score
+        FROM matched m
+        JOIN cars c ON c.car_id = m.car_id
+        ORDER BY score DESC, c.car_id
+        LIMIT :limit
+    """), {"q": q, "candidates": SEARCH_CANDIDATES, "limit": limit})
+    return [dict(row._mapping) for row in rows]
+
+def search_reviews(db: Session, q: str, limit: int) -> List[dict]:
+    if db.get_bind().dialect.name != "postgresql":
+        return text_index.search_reviews(db, q, limit)
+    rows = db.execute(text(f"""
+        WITH matched AS (
+            SELECT r.review_id FROM reviews r
+            WHERE r.is_visible AND {REVIEW_DOCUMENT} @@ websearch_to_tsquery('english', :q)
+            ORDER BY ts_rank_cd({REVIEW_DOCUMENT}, websearch_to_tsquery('english', :q)) DESC, r.review_id
+            LIMIT :candidates
+        )
+        SELECT r.review_id, r.car_id, r.rating, r.review_text, r.created_at,
+               ts_rank_cd({REVIEW_DOCUMENT}, websearch_to_tsquery('english', :q)) AS score
+        FROM matched m
+        JOIN reviews r ON r.review_id = m.review_id
+        ORDER BY score DESC, r.review_id
+        LIMIT :limit
+    """), {"q": q, "candidates": SEARCH_CANDIDATES, "limit": limit})
+    return [dict(row._mapping) for row in rows]
+
+router = APIRouter(tags=["search"])
+
+@router.get("/search", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    scope: str = "all",
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    if scope not in SEARCH_SCOPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported search scope: {scope}")
+    return {
+        "query": q,
+        "cars": search_cars(db, q, limit) if scope in ("all", "cars") else [],
+        "reviews": search_reviews(db, q, limit) if scope in ("all", "reviews") else [],
+    }
@@ -0,0 +1,23 @@
+# app/serverless.py
+import threading
+
+class LazyRoutersMiddleware:
+    """ASGI middleware that runs `loader` once, right before the first request.
+
+    Keeps model and router imports off a serverless cold start's import
+    path; the first request pays for them instead of every instance boot.
+    """
+
+    def __init__(self, app, loader):
+        self.app = app
+        self.loader = loader
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if not self._loaded and scope["type"] in ("http", "websocket"):
+            with self._lock:
+                if not self._loaded:
+                    self.loader()
+                    self._loaded = True
+        await self.app(scope, receive, send)
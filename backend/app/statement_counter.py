@@ -0,0 +1,59 @@
+# app/statement_counter.py
+import re
+from typing import List
+
+from sqlalchemy import create_engine, event
+
+# Transaction bookkeeping the counter leaves out: it is not a data round trip of the code under test
+_BOOKKEEPING = re.compile(r"^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.IGNORECASE)
+
+class StatementCounter:
+    """Count the SQL statements an engine sends while the block runs.
+
+        with StatementCounter(engine) as counter:
+            create_category(db, category)
+        assert counter.count == 1, counter.statements
+    """
+
+    def __init__(self, engine):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not _BOOKKEEPING.match(statement):
+            self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        return False
+
+def savepoint_engine(engine):
+    """An engine whose Session can nest savepoints inside an outer transaction.
+
+    The tests (tests/conftest.py) run helpers that commit inside a
+    transaction they roll back afterwards. pysqlite manages transactions
+    itself and breaks SAVEPOINT nesting, so on SQLite BEGIN is handed back
+    to SQLAlchemy on a separate engine; other databases use `engine` as it is.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+    sqlite_engine = create_engine(engine.url)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _no_implicit_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sqlite_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return sqlite_engine
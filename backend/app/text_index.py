@@ -0,0 +1,171 @@
+# app/text_index.py
+import math
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.query_cache import table_versions
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Field weights of the car document, as setweight A/B/C in the PostgreSQL index
+CAR_FIELD_WEIGHTS = (
+    (("manufacturer", "model_name"), 1.0),
+    (("modelnum",), 0.4),
+    (("year", "engine_type", "transmission", "color"), 0.2),
+)
+# Word similarity a query needs to a car's name to match it (pg_trgm's word_similarity_threshold)
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+def tokenize(value) -> List[str]:
+    return _WORD.findall(str(value).lower()) if value is not None else []
+
+def trigrams(value) -> List[str]:
+    """The trigrams of each word of `value` in order, padded like pg_trgm so a word's start weighs more."""
+    result = []
+    for word in tokenize(value):
+        padded = f"  {word} "
+        result.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+def word_similarity(wanted: Set[str], target: List[str]) -> float:
+    """pg_trgm's word_similarity: the best match of the query trigrams `wanted` to a run of `target`'s."""
+    best = 0.0
+    for start in range(len(target)):
+        if target[start] not in wanted:
+            continue  # a run that starts on a miss only scores lower than the one after it
+        seen, shared = set(), 0
+        for trigram in target[start:]:
+            if trigram not in seen:
+                seen.add(trigram)
+                shared += trigram in wanted
+            best = max(best, shared / (len(wanted) + len(seen) - shared))
+    return best
+
+class _Snapshot(NamedTuple):
+    """One build of the index; replaced whole, so a search never mixes two builds."""
+    cars: Dict[int, dict]
+    car_postings: Dict[str, Dict[int, float]]
+    name_trigrams: Dict[int, List[str]]
+    trigram_cars: Dict[str, Set[int]]
+    reviews: Dict[int, dict]
+    review_postings: Dict[str, Dict[int, int]]
+    review_lengths: Dict[int, int]
+
+EMPTY_SNAPSHOT = _Snapshot({}, {}, {}, {}, {}, {}, {})
+
+class TextSearchIndex:
+    """In-process inverted index over car names and visible review text.
+
+    The fallback for /search where PostgreSQL's full-text and trigram
+    indexes are not available (SQLite test databases). It holds the whole
+    catalog and review text in memory, so it is sized for test data, not
+    production. The index is rebuilt on the next search after a committed
+    write to cars or reviews in this process (see app.query_cache), and at
+    least every `max_age` seconds for writes made elsewhere.
+    """
+
+    TABLES = ("cars", "reviews")
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._versions = None
+        self._snapshot = EMPTY_SNAPSHOT
+
+    def invalidate(self):
+        self._built_at = None
+
+    def _is_fresh(self):
+        return (
+            self._built_at is not None
+            and time.monotonic() - self._built_at < self.max_age
+            and table_versions.snapshot(self.TABLES) == self._versions
+        )
+
+    def _build(self, db: Session):
+        versions = table_versions.snapshot(self.TABLES)
+        cars, car_postings, name_trigrams, trigram_cars = {}, {}, {}, {}
+        for row in db.execute(text("""
+            SELECT car_id, manufacturer, model_name, modelnum, year, engine_type, transmission, color, price
+            FROM cars
+        """)):
+            car = dict(row._mapping)
+            cars[car["car_id"]] = car
+            for fields, weight in CAR_FIELD_WEIGHTS:
+                for field in fields:
+                    for word in tokenize(car[field]):
+                        postings = car_postings.setdefault(word, {})
+                        postings[car["car_id"]] = max(postings.get(car["car_id"], 0.0), weight)
+            # The name car_search_name() builds for the trigram match
+            name_trigrams[car["car_id"]] = trigrams(f"{car['manufacturer'] or ''} {car['model_name'] or ''} {car['modelnum'] or ''}")
+            for trigram in name_trigrams[car["car_id"]]:
+                trigram_cars.setdefault(trigram, set()).add(car["car_id"])
+
+        reviews, review_postings, review_lengths = {}, {}, {}
+        for row in db.execute(text("""
+            SELECT review_id, car_id, rating, review_text, created_at
+            FROM reviews
+            WHERE is_visible = TRUE AND review_text IS NOT NULL
+        """)):
+            review = dict(row._mapping)
+            words = tokenize(review["review_text"])
+            reviews[review["review_id"]] = review
+            review_lengths[review["review_id"]] = len(words)
+            for word in words:
+                postings = review_postings.setdefault(word, {})
+                postings[review["review_id"]] = postings.get(review["review_id"], 0) + 1
+
+        self._snapshot = _Snapshot(cars, car_postings, name_trigrams, trigram_cars, reviews, review_postings, review_lengths)
+        self._versions = versions
+        self._built_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session) -> _Snapshot:
+        """Rebuild if stale; returns the build to search, which a concurrent rebuild leaves intact."""
+        if not self._is_fresh():
+            with self._lock:
+                if not self._is_fresh():
+                    self._build(db)
+        return self._snapshot
+
+    def search_cars(self, db: Session, query: str, limit: int) -> List[dict]:
+        """Cars matching like the PostgreSQL branch of app.search, best first.
+
+        A car matches when its document holds every query word (the full-text
+        AND of websearch_to_tsquery, without its quote and OR operators) or
+        when the query's word similarity to its name reaches the threshold
+        (the `<%` trigram match). The score is the field-weighted word match
+        plus the word similarity, as ts_rank_cd plus word_similarity there.
+        """
+        index = self.ensure_fresh(db)
+        words = set(tokenize(query))
+        if not words:
+            return []
+        postings = [index.car_postings.get(word, {}) for word in words]
+        scores = {car_id: sum(p[car_id] for p in postings) for car_id in set.intersection(*(set(p) for p in postings))}
+        wanted = set(trigrams(query))
+        for car_id in set().union(*(index.trigram_cars.get(trigram, ()) for trigram in wanted)):
+            similarity = word_similarity(wanted, index.name_trigrams[car_id])
+            if car_id in scores or similarity >= WORD_SIMILARITY_THRESHOLD:
+                scores[car_id] = scores.get(car_id, 0.0) + similarity
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{**index.cars[car_id], "score": round(score, 4)} for car_id, score in ranked]
+
+    def search_reviews(self, db: Session, query: str, limit: int) -> List[dict]:
+        """Visible reviews containing every query word, ranked by term frequency over length."""
+        index = self.ensure_fresh(db)
+        words = set(tokenize(query))
+        if not words:
+            return []
+        postings = [index.review_postings.get(word, {}) for word in words]
+        matches = set.intersection(*(set(p) for p in postings))
+        scores = {
+            review_id: sum(p[review_id] for p in postings) / math.log2(2 + index.review_lengths[review_id])
+            for review_id in matches
+        }
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{**index.reviews[review_id], "score": round(score, 4)} for review_id, score in ranked]
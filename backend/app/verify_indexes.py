@@ -0,0 +1,241 @@
+# app/verify_indexes.py
+"""Check that the router queries are planned onto the hot-path indexes.
+
+    python -m app.verify_indexes                 # plan against the current data
+    python -m app.verify_indexes --seed 1000000  # plan against 1M synthetic cars
+
+With --seed, synthetic rows are inserted and ANALYZEd inside a transaction
+that is rolled back afterwards, so the planner sees production-sized tables
+without leaving anything behind. Exits non-zero if any query misses its
+index.
+"""
+import argparse
+import json
+import sys
+
+from sqlalchemy import text
+
+from app.database import engine
+
+# name -> (query as issued by the router, parameters, index the plan must use)
+CHECKS = {
+    "reviews of a car (reviews.read_reviews_by_car_id)": (
+        "SELECT * FROM reviews WHERE car_id = :car_id AND is_visible = TRUE ORDER BY review_id LIMIT 100",
+        {"car_id": "car"},
+        "ix_reviews_car_visible",
+    ),
+    "latest visible reviews (queries.get_visible_reviews)": (
+        "SELECT * FROM reviews WHERE is_visible = TRUE ORDER BY created_at DESC LIMIT 100",
+        {},
+        "ix_reviews_visible_created",
+    ),
+    "reviews by user (users.get_user_full_info)": (
+        "SELECT * FROM reviews WHERE user_id = :user_id",
+        {"user_id": "user"},
+        "ix_reviews_user_id",
+    ),
+    "items of an order (order_item.read_order_items_by_order)": (
+        "SELECT * FROM order_item WHERE order_id = :order_id",
+        {"order_id": "order"},
+        "ix_order_item_order_id",
+    ),
+    "orders of a purchase (order.read_orders_by_purchase)": (
+        "SELECT * FROM orders WHERE purchase_id = :purchase_id",
+        {"purchase_id": "purchase"},
+        "ix_orders_purchase_id",
+    ),
+    "paid purchases of a user (users.get_purchase_id_for_car)": (
+        "SELECT purchase_id FROM purchase WHERE user_id = :user_id AND status = 'paid'",
+        {"user_id": "user"},
+        "ix_purchase_user_status",
+    ),
+    "order items of a car (users.get_purchase_id_for_car)": (
+        "SELECT order_id FROM order_item WHERE car_id = :car_id",
+        {"car_id": "car"},
+        "ix_order_item_car_id",
+    ),
+    "last shipment of an employee (employee_shipment_stats trigger)": (
+        "SELECT MAX(shipped_date) FROM shipping WHERE emp_id = :emp_id",
+        {"emp_id": "employee"},
+        "ix_shipping_emp_status",
+    ),
+    "stock of a car (car.get_car_details)": (
+        "SELECT quantity FROM car_inventory WHERE car_id = :car_id",
+        {"car_id": "car"},
+        "ix_car_inventory_car_id",
+    ),
+    "cars of a category (car.read_cars_by_category)": (
+        "SELECT * FROM cars WHERE category_id = :category_id",
+        {"category_id": "category"},
+        "ix_cars_category_price",
+    ),
+    "new arrivals (car.get_new_arrivals)": (
+        "SELECT * FROM cars WHERE added_date IS NOT NULL ORDER BY added_date DESC, car_id DESC LIMIT 6",
+        {},
+        "ix_cars_added_date",
+    ),
+    "budget picks (car.get_budget_friendly_cars)": (
+        "SELECT * FROM cars WHERE price IS NOT NULL ORDER BY price, car_id LIMIT 6",
+        {},
+        "ix_cars_price",
+    ),
+    "price keyset page (car.read_cars?sort=price)": (
+        "SELECT * FROM cars WHERE price IS NOT NULL AND (price, car_id) > (:price, :car_id) ORDER BY price, car_id LIMIT 100",
+        {"price": 50000, "car_id": "car"},
+        "ix_cars_price",
+    ),
+    "available cars by price": (
+        "SELECT * FROM cars WHERE available = TRUE ORDER BY price, car_id LIMIT 100",
+        {},
+        "ix_cars_available_price",
+    ),
+    "electric or hybrid cars (queries.get_electric_or_hybrid_cars)": (
+        "SELECT * FROM cars WHERE lower(engine_type) IN ('electric', 'hybrid') AND available = TRUE",
+        {},
+        "ix_cars_available_engine_type",
+    ),
+    "car full-text match (search.search_cars)": (
+        "SELECT c.car_id FROM cars c WHERE car_search_document(c.manufacturer, c.model_name, c.modelnum, c.year, "
+        "c.engine_type, c.transmission, c.color) @@ websearch_to_tsquery('simple', :q) LIMIT 1000",
+        {"q": "toyota"},
+        "ix_cars_search_document",
+    ),
+    "car name typo match (search.search_cars)": (
+        "SELECT c.car_id FROM cars c WHERE :q <% car_search_name(c.manufacturer, c.model_name, c.modelnum) LIMIT 1000",
+        {"q": "toyta"},
+        "ix_cars_search_name",
+    ),
+    "review full-text match (search.search_reviews)": (
+        "SELECT r.review_id FROM reviews r WHERE r.is_visible "
+        "AND to_tsvector('english', COALESCE(r.review_text, '')) @@ websearch_to_tsquery('english', :q) LIMIT 1000",
+        {"q": "review 42"},
+        "ix_reviews_text_search",
+    ),
+    "signup / login lookup (users.create_user_endpoint)": (
+        "SELECT * FROM users WHERE email = :email OR username = :username",
+        {"email": "seed-1@example.com", "username": "seed-1"},
+        "users_email_key",
+    ),
+}
+
+# table -> (primary key, row-count factor relative to --seed cars)
+SEED_TABLES = {
+    "categories": ("category_id", 0),
+    "employees": ("emp_id", 0),
+    "cars": ("car_id", 1),
+    "users": ("user_id", 0.1),
+    "purchase": ("purchase_id", 0.2),
+    "orders": ("order_id", 0.2),
+    "order_item": ("order_item_id", 0.2),
+    "shipping": ("ship_id", 0.2),
+    "reviews": ("review_id", 1),
+    "car_inventory": ("inventory_id", 1),
+}
+
+SEED_SQL = [
+    """INSERT INTO categories (category_id, name)
+       SELECT {categories} + g, 'Seed category ' || g FROM generate_series(1, 20) g""",
+    """INSERT INTO employees (emp_id, name, email, status)
+       SELECT {employees} + g, 'Seed employee ' || g, 'seed-emp-' || ({employees} + g) || '@example.com', 'active'
+       FROM generate_series(1, 200) g""",
+    """INSERT INTO cars (car_id, category_id, modelnum, manufacturer, model_name, year, engine_type,
+                         transmission, color, mileage, price, available, added_date)
+       SELECT {cars} + g, {categories} + 1 + g % 20, 'SEED-' || g,
+              (ARRAY['Toyota', 'BMW', 'Tesla', 'Audi', 'Ford'])[1 + g % 5], 'Model ' || g % 500,
+              2000 + g % 25, (ARRAY['Petrol', 'Diesel', 'Hybrid', 'Electric'])[1 + g % 4],
+              (ARRAY['Manual', 'Automatic'])[1 + g % 2], (ARRAY['Red', 'Black', 'White', 'Blue'])[1 + g % 4],
+              g % 200000, 5000 + (g * 7919) % 195000, g % 10 <> 0, CURRENT_DATE - (g % 3650)
+       FROM generate_series(1, {n_cars}) g""",
+    """INSERT INTO users (user_id, email, username, password)
+       SELECT {users} + g, 'seed-' || ({users} + g) || '@example.com', 'seed-' || ({users} + g), 'x'
+       FROM generate_series(1, {n_users}) g""",
+    """INSERT INTO purchase (purchase_id, user_id, amount, status)
+       SELECT {purchase} + g, {users} + 1 + g % {n_users}, 20000,
+              (ARRAY['paid', 'pending', 'refunded'])[1 + g % 3]
+       FROM generate_series(1, {n_purchase}) g""",
+    """INSERT INTO orders (order_id, purchase_id, status)
+       SELECT {orders} + g, {purchase} + g, (ARRAY['processing', 'shipped', 'delivered'])[1 + g % 3]
+       FROM generate_series(1, {n_orders}) g""",
+    """INSERT INTO order_item (order_item_id, order_id, car_id, quantity, price_at_order)
+       SELECT {order_item} + g, {orders} + g, {cars} + 1 + (g * 31) % {n_cars}, 1, 20000
+       FROM generate_series(1, {n_order_item}) g""",
+    """INSERT INTO shipping (ship_id, emp_id, order_id, status, shipped_date)
+       SELECT {shipping} + g, {employees} + 1 + g % 200, {orders} + g,
+              (ARRAY['shipped', 'delivered', 'delayed', 'failed'])[1 + g % 4], CURRENT_DATE - (g % 365)
+       FROM generate_series(1, {n_shipping}) g""",
+    """INSERT INTO reviews (review_id, purchase_id, car_id, user_id, rating, review_text, is_visible, created_at)
+       SELECT {reviews} + g, {purchase} + 1 + g % {n_purchase}, {cars} + 1 + (g * 17) % {n_cars},
+              {users} + 1 + g % {n_users}, 1 + g % 5, 'Seed review ' || g, g % 20 <> 0,
+              now() - (g % 100000) * interval '1 minute'
+       FROM generate_series(1, {n_reviews}) g""",
+    """INSERT INTO car_inventory (inventory_id, car_id, quantity)
+       SELECT {car_inventory} + g, {cars} + g, 10 FROM generate_series(1, {n_car_inventory}) g""",
+]
+
+def _index_names(plan) -> set:
+    names = set()
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            names.add(plan["Index Name"])
+        for value in plan.values():
+            names |= _index_names(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            names |= _index_names(item)
+    return names
+
+def _seed(conn, cars: int) -> dict:
+    """Insert synthetic rows after the current max keys; returns one sample key per entity."""
+    bases = {
+        table: conn.execute(text(f"SELECT COALESCE(MAX({pk}), 0) FROM {table}")).scalar()
+        for table, (pk, _) in SEED_TABLES.items()
+    }
+    counts = {f"n_{table}": max(1, int(cars * factor)) for table, (_, factor) in SEED_TABLES.items() if factor}
+    for statement in SEED_SQL:
+        conn.execute(text(statement.format(**bases, **counts)))
+    for table in SEED_TABLES:
+        conn.execute(text(f"ANALYZE {table}"))
+    return {
+        "car": bases["cars"] + 1,
+        "user": bases["users"] + 1,
+        "order": bases["orders"] + 1,
+        "purchase": bases["purchase"] + 1,
+        "employee": bases["employees"] + 1,
+        "category": bases["categories"] + 1,
+    }
+
+def _existing_samples(conn) -> dict:
+    def first(sql):
+        return conn.execute(text(sql)).scalar() or 1
+    return {
+        "car": first("SELECT MIN(car_id) FROM cars"),
+        "user": first("SELECT MIN(user_id) FROM users"),
+        "order": first("SELECT MIN(order_id) FROM orders"),
+        "purchase": first("SELECT MIN(purchase_id) FROM purchase"),
+        "employee": first("SELECT MIN(emp_id) FROM employees"),
+        "category": first("SELECT MIN(category_id) FROM categories"),
+    }
+
+def verify(seed: int = 0) -> bool:
+    ok = True
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            samples = _seed(conn, seed) if seed else _existing_samples(conn)
+            for name, (sql, params, index) in CHECKS.items():
+                bound = {key: samples.get(value, value) for key, value in params.items()}
+                plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), bound).scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                used = _index_names(plan)
+                passed = index in used
+                ok = ok and passed
+                print(f"{'PASS' if passed else 'FAIL'}  {name}: expected {index}, plan uses {sorted(used) or 'no index'}")
+        finally:
+            transaction.rollback()
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify the router queries use the hot-path indexes.")
+    parser.add_argument("--seed", type=int, default=0, help="number of synthetic cars to plan against (rolled back)")
+    args = parser.parse_args()
+    sys.exit(0 if verify(args.seed) else 1)
@@ -0,0 +1,21 @@
+# app/writes.py
+"""Shared insert path for the create_* helpers.
+
+The row is written with INSERT ... RETURNING, so generated keys and column
+defaults come back with the insert itself instead of from a refresh SELECT
+after the commit. The returned Row has the same attribute names as the
+model, so orm_mode response models read it directly.
+"""
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+def insert_row(db: Session, model, values: dict):
+    """Insert one row in the caller's transaction and return it as stored."""
+    table = model.__table__
+    return db.execute(insert(table).values(**values).returning(*table.columns)).one()
+
+def create_row(db: Session, model, values: dict):
+    """Insert one row, commit, and return it: one statement plus the commit."""
+    row = insert_row(db, model, values)
+    db.commit()
+    return row
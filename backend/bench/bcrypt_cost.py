@@ -0,0 +1,46 @@
+# bench/bcrypt_cost.py
+"""Measure bcrypt latency and hashing-pool throughput per work factor.
+
+Use it to pick BCRYPT_ROUNDS and HASH_WORKERS against a login latency target:
+
+    python bench/bcrypt_cost.py --rounds 10 11 12 13 --workers 4 --logins 64
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+def verify_once(args):
+    rounds, hashed = args
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).verify("benchmark-password", hashed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--logins", type=int, default=32, help="concurrent verifications pushed through the pool")
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for rounds in args.rounds:
+            context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+            hashed = context.hash("benchmark-password")
+            samples = []
+            for _ in range(args.samples):
+                started = time.perf_counter()
+                context.verify("benchmark-password", hashed)
+                samples.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            list(pool.map(verify_once, [(rounds, hashed)] * args.logins))
+            elapsed = time.perf_counter() - started
+            print(
+                f"rounds {rounds:>2}: verify median {1000 * statistics.median(samples):7.1f} ms  "
+                f"pool of {args.workers}: {args.logins / elapsed:6.1f} logins/s, "
+                f"last of {args.logins} done after {1000 * elapsed:7.1f} ms"
+            )
+
+if __name__ == "__main__":
+    main()
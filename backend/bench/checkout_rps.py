@@ -0,0 +1,119 @@
+# bench/checkout_rps.py
+"""Checkouts per second: the /checkout transaction against the old three-call flow.
+
+Concurrent buyers place one-car orders in-process, either through
+app.checkout.place_order (one transaction, RETURNING) or through
+create_purchase + create_order + create_order_item with a stock write, each
+committing and refreshing. Runs against DATABASE_URL from .env; the rows
+created and the car's stock are cleaned up afterwards:
+
+    python bench/checkout_rps.py --user-id 1 --car-id 1 --buyers 50 --duration 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from dotenv import load_dotenv  # noqa: E402
+from sqlalchemy import create_engine, delete, select, update  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+
+from app.checkout import CheckoutRequest, place_order  # noqa: E402
+from app.models.car import Car  # noqa: E402
+from app.models.car_inventory import CarInventory  # noqa: E402
+from app.models.order import Order, OrderCreate, create_order  # noqa: E402
+from app.models.order_item import OrderItem, OrderItemCreate, create_order_item  # noqa: E402
+from app.models.purchase import PurchaseCreate, PurchaseModel, create_purchase  # noqa: E402
+
+def checkout_transaction(db: Session, user_id: int, car_id: int) -> int:
+    result = place_order(db, CheckoutRequest(user_id=user_id, items=[{"car_id": car_id}]))
+    return result["purchase"].purchase_id
+
+def checkout_three_calls(db: Session, user_id: int, car_id: int) -> int:
+    price = db.query(Car.price).filter(Car.car_id == car_id).scalar()
+    purchase = create_purchase(db, PurchaseCreate(user_id=user_id, amount=float(price), status="pending"))
+    order = create_order(db, OrderCreate(purchase_id=purchase.purchase_id, status="processing"))
+    create_order_item(db, OrderItemCreate(order_id=order.order_id, car_id=car_id, quantity=1, price_at_order=float(price)))
+    stock = db.query(CarInventory).filter(CarInventory.car_id == car_id).first()
+    stock.quantity -= 1
+    db.commit()
+    return purchase.purchase_id
+
+FLOWS = {"checkout": checkout_transaction, "three-calls": checkout_three_calls}
+
+def run(engine, flow, args):
+    latencies, purchase_ids = [], []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + args.duration
+
+    def buyer():
+        timings, mine = [], []
+        with Session(engine) as db:
+            while time.monotonic() < stop_at:
+                began = time.perf_counter()
+                mine.append(flow(db, args.user_id, args.car_id))
+                timings.append(time.perf_counter() - began)
+        with lock:
+            latencies.extend(timings)
+            purchase_ids.extend(mine)
+
+    threads = [threading.Thread(target=buyer) for _ in range(args.buyers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), purchase_ids
+
+def cleanup(engine, purchase_ids):
+    with Session(engine) as db:
+        order_ids = select(Order.order_id).where(Order.purchase_id.in_(purchase_ids)).scalar_subquery()
+        db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        db.execute(delete(Order).where(Order.purchase_id.in_(purchase_ids)))
+        db.execute(delete(PurchaseModel).where(PurchaseModel.purchase_id.in_(purchase_ids)))
+        db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--car-id", type=int, required=True)
+    parser.add_argument("--buyers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=list(FLOWS))
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"], pool_size=args.buyers, max_overflow=0)
+    with Session(engine) as db:
+        original = dict(db.execute(
+            select(CarInventory.inventory_id, CarInventory.quantity).where(CarInventory.car_id == args.car_id)
+        ).all())
+        if not original:
+            sys.exit(f"car {args.car_id} has no inventory row")
+
+    print(f"{args.buyers} buyers for {args.duration}s, one car per checkout")
+    for name in args.flows:
+        with Session(engine) as db:
+            # Enough stock that no flow sells out mid-run
+            db.execute(update(CarInventory).where(CarInventory.inventory_id == min(original)).values(quantity=10_000_000))
+            db.commit()
+        latencies, purchase_ids = run(engine, FLOWS[name], args)
+        cleanup(engine, purchase_ids)
+        print(
+            f"  {name:>11}: {len(latencies) / args.duration:8.1f} checkouts/s  "
+            f"p50 {1000 * statistics.median(latencies):.1f} ms  "
+            f"p99 {1000 * latencies[int(0.99 * (len(latencies) - 1))]:.1f} ms"
+        )
+
+    with Session(engine) as db:
+        for inventory_id, quantity in original.items():
+            db.execute(update(CarInventory).where(CarInventory.inventory_id == inventory_id).values(quantity=quantity))
+        db.commit()
+
+if __name__ == "__main__":
+    main()
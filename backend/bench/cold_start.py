@@ -0,0 +1,66 @@
+# bench/cold_start.py
+"""Measure cold-start time: fresh interpreter -> `import app.main` -> first response.
+
+Each run is a new Python process, as on a new serverless instance:
+
+    python bench/cold_start.py --profiles server serverless --runs 10 --path /cars/1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child process; TestClient setup is excluded from the timings
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+client_ready = time.perf_counter()
+response = client.get({path!r})
+answered = time.perf_counter()
+print(json.dumps({{
+    "import_ms": 1000 * (imported - started),
+    "first_response_ms": 1000 * ((answered - client_ready) + (imported - started)),
+    "status": response.status_code,
+}}))
+"""
+
+def run_once(profile: str, path: str) -> dict:
+    env = dict(os.environ, APP_PROFILE=profile)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(path=path)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["server", "serverless"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/cars/?limit=1")
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        results = [run_once(profile, args.path) for _ in range(args.runs)]
+        imports = [r["import_ms"] for r in results]
+        firsts = [r["first_response_ms"] for r in results]
+        statuses = sorted({r["status"] for r in results})
+        print(
+            f"{profile:>10}: import median {statistics.median(imports):7.1f} ms  "
+            f"import-to-first-response median {statistics.median(firsts):7.1f} ms  "
+            f"max {max(firsts):7.1f} ms  status {statuses}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench/db_stack_rps.py
+"""Compare requests per second of the sync and async database stacks.
+
+Starts uvicorn once per DATABASE_MODE against the DATABASE_URL in .env and
+drives one endpoint at a fixed concurrency with httpx:
+
+    python bench/db_stack_rps.py --path /cars/1/details --concurrency 500 --duration 20
+
+httpx comes from requirements-dev.txt. In async mode the whole sync
+handler body runs through AsyncSession.run_sync on the event-loop thread
+(app.async_routes), so only the database waits yield. Any CPU-bound work
+in the handler, such as serialization or description building, blocks
+the loop for every other request. The sync stack instead spreads that
+work over the threadpool. Read the A/B numbers with that in mind: a
+CPU-heavy endpoint can favour the sync stack even when the database is
+the same.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def wait_until_up(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+async def drive(base_url: str, path: str, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        stop_at = time.monotonic() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": 1000 * latencies[len(latencies) // 2] if latencies else None,
+        "p99_ms": 1000 * latencies[int(len(latencies) * 0.99)] if latencies else None,
+        "errors": errors,
+    }
+
+def run_mode(mode: str, args) -> dict:
+    env = dict(os.environ, DATABASE_MODE=mode)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_until_up(base_url))
+        asyncio.run(drive(base_url, args.path, args.concurrency, args.warmup))
+        return asyncio.run(drive(base_url, args.path, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/cars/?limit=20")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+
+    print(f"GET {args.path} at concurrency {args.concurrency} for {args.duration}s")
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        print(
+            f"{mode:>5}: {result['rps']:8.1f} req/s  p50 {result['p50_ms']:.1f} ms  "
+            f"p99 {result['p99_ms']:.1f} ms  errors {result['errors']}"
+        )
+
+if __name__ == "__main__":
+    main()
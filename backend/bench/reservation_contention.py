@@ -0,0 +1,118 @@
+# bench/reservation_contention.py
+"""Hammer one car's stock with concurrent buyers and check it never oversells.
+
+Every buyer takes one unit at a time until the car is sold out, through
+either the atomic reservation (conditional UPDATE ... RETURNING) or the old
+read-modify-write. Run against the PostgreSQL DATABASE_URL in .env; the
+car's original stock is put back afterwards:
+
+    python bench/reservation_contention.py --car-id 1 --stock 5000 --buyers 200
+    python bench/reservation_contention.py --car-id 1 --stock 5000 --buyers 200 --mode read-modify-write
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from dotenv import load_dotenv  # noqa: E402
+from sqlalchemy import create_engine, func, select, update  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+
+from app.models.car_inventory import CarInventory  # noqa: E402
+from app.models.reservation import reserve_stock  # noqa: E402
+
+def reserve_atomic(db: Session, car_id: int) -> bool:
+    taken = reserve_stock(db, car_id, 1) is not None
+    db.commit()
+    return taken
+
+def reserve_read_modify_write(db: Session, car_id: int) -> bool:
+    # What admin.update_car_stock-style code does: read, check in Python, write back
+    row = db.query(CarInventory).filter(CarInventory.car_id == car_id).first()
+    if row is None or row.quantity < 1:
+        db.rollback()
+        return False
+    row.quantity = row.quantity - 1
+    db.commit()
+    return True
+
+MODES = {"atomic": reserve_atomic, "read-modify-write": reserve_read_modify_write}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--car-id", type=int, required=True)
+    parser.add_argument("--stock", type=int, default=5000)
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--mode", choices=MODES, default="atomic")
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"], pool_size=args.buyers, max_overflow=0)
+    reserve = MODES[args.mode]
+    with Session(engine) as db:
+        inventory_ids = db.execute(
+            select(CarInventory.inventory_id).where(CarInventory.car_id == args.car_id).order_by(CarInventory.inventory_id)
+        ).scalars().all()
+        if not inventory_ids:
+            sys.exit(f"car {args.car_id} has no inventory row")
+        original = dict(db.execute(
+            select(CarInventory.inventory_id, CarInventory.quantity).where(CarInventory.car_id == args.car_id)
+        ).all())
+        # All the stock on one row, the hot-model case
+        db.execute(update(CarInventory).where(CarInventory.car_id == args.car_id).values(quantity=0))
+        db.execute(update(CarInventory).where(CarInventory.inventory_id == inventory_ids[0]).values(quantity=args.stock))
+        db.commit()
+
+    latencies, sold = [], [0]
+    lock = threading.Lock()
+    start = threading.Barrier(args.buyers + 1)
+
+    def buyer():
+        mine, timings = 0, []
+        with Session(engine) as db:
+            start.wait()
+            while True:
+                began = time.perf_counter()
+                taken = reserve(db, args.car_id)
+                timings.append(time.perf_counter() - began)
+                if not taken:
+                    break
+                mine += 1
+        with lock:
+            sold[0] += mine
+            latencies.extend(timings)
+
+    threads = [threading.Thread(target=buyer) for _ in range(args.buyers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    with Session(engine) as db:
+        final = db.execute(select(func.sum(CarInventory.quantity)).where(CarInventory.car_id == args.car_id)).scalar()
+        for inventory_id, quantity in original.items():
+            db.execute(update(CarInventory).where(CarInventory.inventory_id == inventory_id).values(quantity=quantity))
+        db.commit()
+
+    latencies.sort()
+    print(f"mode {args.mode}, {args.buyers} buyers, stock {args.stock}")
+    print(f"  reservations granted {sold[0]}, final stock {final}, oversold {max(0, sold[0] - args.stock)}")
+    print(f"  {sold[0] / elapsed:,.0f} reservations/s over {elapsed:.2f} s")
+    print(
+        f"  latency p50 {1000 * statistics.median(latencies):.1f} ms, "
+        f"p99 {1000 * latencies[int(0.99 * (len(latencies) - 1))]:.1f} ms"
+    )
+    if final < 0 or sold[0] > args.stock:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench/serializer_cost.py
+"""Per-row serialization cost of the old and the precompiled serializers.
+
+Runs in-process without a database, on Car, User and Order payloads:
+
+    python bench/serializer_cost.py --rows 10000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.models.car import Car, CarBase, CarWithRating  # noqa: E402
+from app.models.order import Order  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.serializers import model_serializer  # noqa: E402
+
+PAYLOADS = {
+    Car: dict(
+        car_id=1, category_id=2, modelnum="X5-2024", manufacturer="BMW", model_name="X5", year=2024,
+        engine_type="Hybrid", transmission="Automatic", color="Black", mileage=1200,
+        fuel_capacity=Decimal("83.00"), seating_capacity=5, price=Decimal("65999.00"), available=True,
+        added_date=date(2024, 5, 1), image_link="https://example.com/x5.jpg",
+    ),
+    User: dict(
+        user_id=1, email="jane@example.com", username="jane", password="$2b$12$" + "x" * 53,
+        address="12 Lake Road", phone="555-0100", dob=date(1990, 1, 1), card_num="4111111111111111", bank_acc="12345678",
+    ),
+    Order: dict(
+        order_id=1, purchase_id=7, status="shipped", shipping_address="12 Lake Road",
+        tracking_number="TRK123", expected_delivery=date(2024, 6, 1),
+    ),
+}
+
+def model_to_dict(obj):
+    # The column walk admin.py used before the compiled serializers
+    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+
+def car_with_rating(car):
+    car_dict = dict(car.__dict__)
+    car_dict["rating"] = Decimal("4.50")
+    return CarWithRating.parse_obj(car_dict)
+
+def per_row_us(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - started)
+    return 1e6 * best / len(items)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for model, payload in PAYLOADS.items():
+        serializer = model_serializer(model)
+        objects = [model(**payload) for _ in range(args.rows)]
+        rows = [tuple(payload[key] for key in serializer.keys) for _ in range(args.rows)]
+        candidates = {
+            "model_to_dict (ORM object)": (model_to_dict, objects),
+            "compiled from_object": (serializer.from_object, objects),
+            "compiled from_row (Core row)": (serializer.from_row, rows),
+        }
+        if model is Car:
+            candidates["CarBase.from_orm"] = (CarBase.from_orm, objects)
+            candidates["CarWithRating.parse_obj"] = (car_with_rating, objects)
+        print(f"{model.__name__} ({len(serializer.keys)} columns)")
+        for label, (fn, items) in candidates.items():
+            print(f"  {label:<30} {per_row_us(fn, items, args.repeat):8.2f} us/row")
+
+if __name__ == "__main__":
+    main()
@@ -129,4 +129,293 @@ CREATE TABLE reviews (
     is_visible BOOLEAN DEFAULT TRUE, -- moderation toggle
     helpful_count INT DEFAULT 0, -- like upvotes
     employee_feedback TEXT -- optional if staff behavior is reviewed
-);
\ No newline at end of file
+);
+
+-- Running review aggregates per car (visible reviews only), maintained by the API
+-- Backfill with: python -m app.models.car_review_stats
+CREATE TABLE car_review_stats (
+    car_id INT PRIMARY KEY REFERENCES cars(car_id) ON DELETE CASCADE,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    avg_rating NUMERIC(3, 2),
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX ix_car_review_stats_avg_rating ON car_review_stats (avg_rating DESC, review_count DESC);
+CREATE INDEX ix_car_review_stats_review_count ON car_review_stats (review_count DESC);
+
+-- Shipments handled per employee for the staff leaderboard, kept by a trigger on shipping
+-- (also shipped as migrations/0003_employee_shipment_stats.sql)
+-- Check or rebuild with: python -m app.models.employee_shipment_stats [--check]
+CREATE TABLE employee_shipment_stats (
+    emp_id INT PRIMARY KEY REFERENCES employees(emp_id) ON DELETE CASCADE,
+    total_shipments INT NOT NULL DEFAULT 0,
+    delivered INT NOT NULL DEFAULT 0,
+    delayed INT NOT NULL DEFAULT 0,
+    failed INT NOT NULL DEFAULT 0,
+    last_shipped_date DATE
+);
+
+CREATE INDEX ix_employee_shipment_stats_leaderboard ON employee_shipment_stats (delivered DESC, total_shipments DESC);
+
+CREATE OR REPLACE FUNCTION employee_shipment_stats_apply() RETURNS trigger AS $$
+BEGIN
+    -- Take the old row out
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.emp_id IS NOT NULL THEN
+        UPDATE employee_shipment_stats SET
+            total_shipments = total_shipments - 1,
+            delivered = delivered - CASE WHEN OLD.status = 'delivered' THEN 1 ELSE 0 END,
+            delayed = delayed - CASE WHEN OLD.status = 'delayed' THEN 1 ELSE 0 END,
+            failed = failed - CASE WHEN OLD.status = 'failed' THEN 1 ELSE 0 END
+        WHERE emp_id = OLD.emp_id;
+    END IF;
+    -- Put the new row in; the upsert covers an employee's first shipment
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.emp_id IS NOT NULL THEN
+        INSERT INTO employee_shipment_stats AS s (emp_id, total_shipments, delivered, delayed, failed, last_shipped_date)
+        VALUES (
+            NEW.emp_id, 1,
+            CASE WHEN NEW.status = 'delivered' THEN 1 ELSE 0 END,
+            CASE WHEN NEW.status = 'delayed' THEN 1 ELSE 0 END,
+            CASE WHEN NEW.status = 'failed' THEN 1 ELSE 0 END,
+            NEW.shipped_date
+        )
+        ON CONFLICT (emp_id) DO UPDATE SET
+            total_shipments = s.total_shipments + 1,
+            delivered = s.delivered + EXCLUDED.delivered,
+            delayed = s.delayed + EXCLUDED.delayed,
+            failed = s.failed + EXCLUDED.failed,
+            last_shipped_date = GREATEST(s.last_shipped_date, EXCLUDED.last_shipped_date);
+    END IF;
+    -- A max cannot be decremented: re-read it only when the old row held it
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.emp_id IS NOT NULL AND OLD.shipped_date IS NOT NULL THEN
+        UPDATE employee_shipment_stats
+        SET last_shipped_date = (SELECT MAX(shipped_date) FROM shipping WHERE emp_id = OLD.emp_id)
+        WHERE emp_id = OLD.emp_id AND last_shipped_date = OLD.shipped_date;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER shipping_employee_stats
+AFTER INSERT OR DELETE OR UPDATE OF emp_id, status, shipped_date ON shipping
+FOR EACH ROW EXECUTE FUNCTION employee_shipment_stats_apply();
+
+-- Daily sales rollups for the admin reports; triggers queue the days a write touched
+-- (also shipped as migrations/0004_sales_rollups.sql)
+-- Refresh with: python -m app.models.sales_rollup
+CREATE TABLE sales_daily (
+    sales_day DATE NOT NULL,
+    car_id INT NOT NULL,
+    payment_method VARCHAR(50) NOT NULL,
+    units BIGINT NOT NULL DEFAULT 0,
+    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    discount_sum NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    line_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_day, car_id, payment_method)
+);
+
+CREATE TABLE sales_rollup_dirty (
+    mark_id BIGSERIAL PRIMARY KEY,
+    sales_day DATE NOT NULL,
+    marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX ix_sales_rollup_dirty_day ON sales_rollup_dirty (sales_day);
+CREATE INDEX IF NOT EXISTS ix_purchase_paid_date ON purchase (date) WHERE status = 'paid';
+
+CREATE OR REPLACE FUNCTION sales_rollup_mark_purchase() RETURNS trigger AS $$
+BEGIN
+    -- Only paid purchases count, so pending checkouts never touch the queue.
+    -- Marks are plain appends: no row is shared between concurrent writers.
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'paid' AND OLD.date IS NOT NULL THEN
+        INSERT INTO sales_rollup_dirty (sales_day) VALUES (OLD.date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'paid' AND NEW.date IS NOT NULL THEN
+        INSERT INTO sales_rollup_dirty (sales_day) VALUES (NEW.date);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sales_rollup_mark_order() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM purchase p
+        WHERE p.purchase_id = OLD.purchase_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM purchase p
+        WHERE p.purchase_id = NEW.purchase_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sales_rollup_mark_order_item() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM orders o JOIN purchase p ON p.purchase_id = o.purchase_id
+        WHERE o.order_id = OLD.order_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM orders o JOIN purchase p ON p.purchase_id = o.purchase_id
+        WHERE o.order_id = NEW.order_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER purchase_sales_rollup
+AFTER INSERT OR DELETE OR UPDATE OF date, status, payment_method ON purchase
+FOR EACH ROW EXECUTE FUNCTION sales_rollup_mark_purchase();
+
+CREATE TRIGGER orders_sales_rollup
+AFTER INSERT OR DELETE OR UPDATE OF purchase_id ON orders
+FOR EACH ROW EXECUTE FUNCTION sales_rollup_mark_order();
+
+CREATE TRIGGER order_item_sales_rollup
+AFTER INSERT OR DELETE OR UPDATE ON order_item
+FOR EACH ROW EXECUTE FUNCTION sales_rollup_mark_order_item();
+
+-- Price statistics per category for the ALL/ANY comparison reports, kept by statement triggers on cars
+-- (also shipped as migrations/0005_category_price_stats.sql)
+-- Check or rebuild with: python -m app.models.category_price_stats [--check]
+CREATE TABLE category_price_stats (
+    category_id INT PRIMARY KEY REFERENCES categories(category_id) ON DELETE CASCADE,
+    car_count INT NOT NULL DEFAULT 0,
+    priced_count INT NOT NULL DEFAULT 0,
+    min_price NUMERIC(10, 2),
+    max_price NUMERIC(10, 2),
+    median_price NUMERIC(12, 2)
+);
+
+CREATE OR REPLACE FUNCTION category_price_stats_refresh() RETURNS trigger AS $$
+DECLARE
+    touched INT[];
+BEGIN
+    -- The categories this statement changed: every row of an insert or delete,
+    -- and for an update only the rows whose category or price moved
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT category_id) INTO touched FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT category_id) INTO touched FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT v.category_id) INTO touched
+        FROM old_rows o
+        JOIN new_rows n ON n.car_id = o.car_id
+        CROSS JOIN LATERAL (VALUES (o.category_id), (n.category_id)) AS v(category_id)
+        WHERE o.category_id IS DISTINCT FROM n.category_id OR o.price IS DISTINCT FROM n.price;
+    END IF;
+    IF touched IS NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Lock the rows, in key order so two writers cannot deadlock; the recount
+    -- below then sees every car committed by a writer that held them first
+    INSERT INTO category_price_stats (category_id, car_count, priced_count)
+    SELECT category_id, 0, 0 FROM unnest(touched) AS t(category_id)
+    ON CONFLICT (category_id) DO NOTHING;
+    PERFORM 1 FROM category_price_stats
+    WHERE category_id = ANY(touched)
+    ORDER BY category_id
+    FOR UPDATE;
+    UPDATE category_price_stats s SET
+        car_count = a.car_count,
+        priced_count = a.priced_count,
+        min_price = a.min_price,
+        max_price = a.max_price,
+        median_price = a.median_price
+    FROM (
+        SELECT t.category_id,
+               COUNT(c.car_id) AS car_count,
+               COUNT(c.price) AS priced_count,
+               MIN(c.price) AS min_price,
+               MAX(c.price) AS max_price,
+               CAST(percentile_cont(0.5) WITHIN GROUP (ORDER BY c.price) AS NUMERIC(12, 2)) AS median_price
+        FROM unnest(touched) AS t(category_id)
+        LEFT JOIN cars c ON c.category_id = t.category_id
+        GROUP BY t.category_id
+    ) a
+    WHERE s.category_id = a.category_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER cars_category_price_stats_insert
+AFTER INSERT ON cars REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION category_price_stats_refresh();
+
+CREATE TRIGGER cars_category_price_stats_update
+AFTER UPDATE ON cars REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION category_price_stats_refresh();
+
+CREATE TRIGGER cars_category_price_stats_delete
+AFTER DELETE ON cars REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION category_price_stats_refresh();
+
+-- Hot-path secondary indexes (also shipped as migrations/0001_hot_path_indexes.sql)
+CREATE INDEX IF NOT EXISTS ix_reviews_car_visible ON reviews (car_id, review_id) WHERE is_visible;
+CREATE INDEX IF NOT EXISTS ix_reviews_car_helpful ON reviews (car_id, helpful_count DESC, review_id DESC) WHERE is_visible;
+CREATE INDEX IF NOT EXISTS ix_reviews_visible_created ON reviews (created_at DESC) WHERE is_visible;
+CREATE INDEX IF NOT EXISTS ix_reviews_user_id ON reviews (user_id);
+CREATE INDEX IF NOT EXISTS ix_order_item_order_id ON order_item (order_id);
+CREATE INDEX IF NOT EXISTS ix_order_item_car_id ON order_item (car_id);
+CREATE INDEX IF NOT EXISTS ix_orders_purchase_id ON orders (purchase_id);
+CREATE INDEX IF NOT EXISTS ix_purchase_user_status ON purchase (user_id, status);
+CREATE INDEX IF NOT EXISTS ix_shipping_emp_status ON shipping (emp_id, status);
+CREATE INDEX IF NOT EXISTS ix_car_inventory_car_id ON car_inventory (car_id);
+CREATE INDEX IF NOT EXISTS ix_car_inventory_log_car_id ON car_inventory_log (car_id);
+CREATE INDEX IF NOT EXISTS ix_cars_category_price ON cars (category_id, price);
+CREATE INDEX IF NOT EXISTS ix_cars_added_date ON cars (added_date DESC, car_id DESC);
+CREATE INDEX IF NOT EXISTS ix_cars_price ON cars (price, car_id);
+CREATE INDEX IF NOT EXISTS ix_cars_available_price ON cars (price, car_id) WHERE available;
+
+-- Text search for /search (also shipped as migrations/0006_text_search.sql)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- The car document: name (A), model number (B) and the descriptive fields
+-- of generate_car_description (C). 'simple' keeps brand names unstemmed.
+CREATE OR REPLACE FUNCTION car_search_document(
+    manufacturer TEXT, model_name TEXT, modelnum TEXT, year INT, engine_type TEXT, transmission TEXT, color TEXT
+) RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(manufacturer, '') || ' ' || COALESCE(model_name, '')), 'A')
+        || setweight(to_tsvector('simple', COALESCE(modelnum, '')), 'B')
+        || setweight(to_tsvector('simple',
+               COALESCE(year::TEXT, '') || ' ' || COALESCE(engine_type, '') || ' '
+               || COALESCE(transmission, '') || ' ' || COALESCE(color, '')), 'C')
+$$;
+
+-- The lowercased name that the typo-tolerant trigram match compares query words with
+CREATE OR REPLACE FUNCTION car_search_name(manufacturer TEXT, model_name TEXT, modelnum TEXT)
+RETURNS TEXT LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(COALESCE(manufacturer, '') || ' ' || COALESCE(model_name, '') || ' ' || COALESCE(modelnum, ''))
+$$;
+
+CREATE INDEX IF NOT EXISTS ix_cars_search_document
+ON cars USING GIN (car_search_document(manufacturer, model_name, modelnum, year, engine_type, transmission, color));
+CREATE INDEX IF NOT EXISTS ix_cars_search_name
+ON cars USING GIN (car_search_name(manufacturer, model_name, modelnum) gin_trgm_ops);
+-- Visible review text; the search filters on is_visible, which this predicate matches
+CREATE INDEX IF NOT EXISTS ix_reviews_text_search
+ON reviews USING GIN (to_tsvector('english', COALESCE(review_text, ''))) WHERE is_visible;
+-- Case-insensitive engine type of available cars (/queries/electric-or-hybrid-cars)
+CREATE INDEX IF NOT EXISTS ix_cars_available_engine_type ON cars (lower(engine_type)) WHERE available;
+
+-- Checkout holds: stock taken from car_inventory until confirmed, released or expired
+CREATE TABLE inventory_holds (
+    hold_id SERIAL PRIMARY KEY,
+    car_id INT NOT NULL REFERENCES cars(car_id) ON DELETE CASCADE,
+    quantity INT NOT NULL CHECK (quantity > 0),
+    status VARCHAR(20) NOT NULL DEFAULT 'held', -- held, confirmed, released, expired
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX ix_inventory_holds_status_expires ON inventory_holds (status, expires_at);
@@ -0,0 +1,27 @@
+-- Secondary indexes for the foreign keys and filters on the API's hot paths.
+-- Built CONCURRENTLY so large tables stay writable; the runner executes each
+-- statement outside a transaction.
+
+-- Visible reviews of a car, in the keyset order of /reviews/cars/{car_id}/reviews
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_car_visible ON reviews (car_id, review_id) WHERE is_visible;
+-- Newest visible reviews first (/queries/visible-reviews)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_visible_created ON reviews (created_at DESC) WHERE is_visible;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_user_id ON reviews (user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_item_order_id ON order_item (order_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_item_car_id ON order_item (car_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_purchase_id ON orders (purchase_id);
+-- A user's purchases, optionally narrowed to a status ('paid' checks)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_purchase_user_status ON purchase (user_id, status);
+-- Shipments per employee, optionally narrowed to a status (staff leaderboard)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shipping_emp_status ON shipping (emp_id, status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_car_inventory_car_id ON car_inventory (car_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_car_inventory_log_car_id ON car_inventory_log (car_id);
+
+-- Cars of a category, price-ordered for the ALL/ANY category comparisons
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_category_price ON cars (category_id, price);
+-- Keyset pagination and new arrivals: (added_date, car_id) newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_added_date ON cars (added_date DESC, car_id DESC);
+-- Keyset pagination and budget picks: (price, car_id) cheapest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_price ON cars (price, car_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_available_price ON cars (price, car_id) WHERE available;
@@ -0,0 +1,3 @@
+-- Visible reviews of a car, most helpful first
+-- (/reviews/cars/{car_id}/reviews?sort=helpful).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_car_helpful ON reviews (car_id, helpful_count DESC, review_id DESC) WHERE is_visible;
@@ -0,0 +1,62 @@
+-- Keep employee_shipment_stats in step with shipping (see app/models/employee_shipment_stats.py).
+-- The table is created from the model before migrations run.
+
+CREATE OR REPLACE FUNCTION employee_shipment_stats_apply() RETURNS trigger AS $$
+BEGIN
+    -- Take the old row out
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.emp_id IS NOT NULL THEN
+        UPDATE employee_shipment_stats SET
+            total_shipments = total_shipments - 1,
+            delivered = delivered - CASE WHEN OLD.status = 'delivered' THEN 1 ELSE 0 END,
+            delayed = delayed - CASE WHEN OLD.status = 'delayed' THEN 1 ELSE 0 END,
+            failed = failed - CASE WHEN OLD.status = 'failed' THEN 1 ELSE 0 END
+        WHERE emp_id = OLD.emp_id;
+    END IF;
+    -- Put the new row in; the upsert covers an employee's first shipment
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.emp_id IS NOT NULL THEN
+        INSERT INTO employee_shipment_stats AS s (emp_id, total_shipments, delivered, delayed, failed, last_shipped_date)
+        VALUES (
+            NEW.emp_id, 1,
+            CASE WHEN NEW.status = 'delivered' THEN 1 ELSE 0 END,
+            CASE WHEN NEW.status = 'delayed' THEN 1 ELSE 0 END,
+            CASE WHEN NEW.status = 'failed' THEN 1 ELSE 0 END,
+            NEW.shipped_date
+        )
+        ON CONFLICT (emp_id) DO UPDATE SET
+            total_shipments = s.total_shipments + 1,
+            delivered = s.delivered + EXCLUDED.delivered,
+            delayed = s.delayed + EXCLUDED.delayed,
+            failed = s.failed + EXCLUDED.failed,
+            last_shipped_date = GREATEST(s.last_shipped_date, EXCLUDED.last_shipped_date);
+    END IF;
+    -- A max cannot be decremented: re-read it only when the old row held it
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.emp_id IS NOT NULL AND OLD.shipped_date IS NOT NULL THEN
+        UPDATE employee_shipment_stats
+        SET last_shipped_date = (SELECT MAX(shipped_date) FROM shipping WHERE emp_id = OLD.emp_id)
+        WHERE emp_id = OLD.emp_id AND last_shipped_date = OLD.shipped_date;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Install the trigger and backfill in one transaction, with shipping writes
+-- held off, so no shipment is counted twice or missed
+DO $$
+BEGIN
+    LOCK TABLE shipping IN SHARE ROW EXCLUSIVE MODE;
+    DROP TRIGGER IF EXISTS shipping_employee_stats ON shipping;
+    CREATE TRIGGER shipping_employee_stats
+    AFTER INSERT OR DELETE OR UPDATE OF emp_id, status, shipped_date ON shipping
+    FOR EACH ROW EXECUTE FUNCTION employee_shipment_stats_apply();
+    DELETE FROM employee_shipment_stats;
+    INSERT INTO employee_shipment_stats (emp_id, total_shipments, delivered, delayed, failed, last_shipped_date)
+    SELECT emp_id, COUNT(*),
+           COUNT(*) FILTER (WHERE status = 'delivered'),
+           COUNT(*) FILTER (WHERE status = 'delayed'),
+           COUNT(*) FILTER (WHERE status = 'failed'),
+           MAX(shipped_date)
+    FROM shipping
+    WHERE emp_id IS NOT NULL
+    GROUP BY emp_id;
+END;
+$$;
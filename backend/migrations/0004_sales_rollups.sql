@@ -0,0 +1,75 @@
+-- Sales rollups (see app/models/sales_rollup.py). The tables are created from
+-- the models before migrations run; this file adds what the models cannot:
+-- the index the refresher aggregates through and the triggers that mark
+-- the days a write touched.
+
+-- Paid purchases of one day: what a day's refresh aggregates
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_purchase_paid_date ON purchase (date) WHERE status = 'paid';
+
+CREATE OR REPLACE FUNCTION sales_rollup_mark_purchase() RETURNS trigger AS $$
+BEGIN
+    -- Only paid purchases count, so pending checkouts never touch the queue.
+    -- Marks are plain appends: no row is shared between concurrent writers.
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'paid' AND OLD.date IS NOT NULL THEN
+        INSERT INTO sales_rollup_dirty (sales_day) VALUES (OLD.date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'paid' AND NEW.date IS NOT NULL THEN
+        INSERT INTO sales_rollup_dirty (sales_day) VALUES (NEW.date);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sales_rollup_mark_order() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM purchase p
+        WHERE p.purchase_id = OLD.purchase_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM purchase p
+        WHERE p.purchase_id = NEW.purchase_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sales_rollup_mark_order_item() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM orders o JOIN purchase p ON p.purchase_id = o.purchase_id
+        WHERE o.order_id = OLD.order_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO sales_rollup_dirty (sales_day)
+        SELECT p.date FROM orders o JOIN purchase p ON p.purchase_id = o.purchase_id
+        WHERE o.order_id = NEW.order_id AND p.status = 'paid' AND p.date IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Install the triggers and queue every day with paid sales in one transaction,
+-- so the first refresh builds the full history and nothing written meanwhile is missed
+DO $$
+BEGIN
+    DROP TRIGGER IF EXISTS purchase_sales_rollup ON purchase;
+    CREATE TRIGGER purchase_sales_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF date, status, payment_method ON purchase
+    FOR EACH ROW EXECUTE FUNCTION sales_rollup_mark_purchase();
+    DROP TRIGGER IF EXISTS orders_sales_rollup ON orders;
+    CREATE TRIGGER orders_sales_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF purchase_id ON orders
+    FOR EACH ROW EXECUTE FUNCTION sales_rollup_mark_order();
+    DROP TRIGGER IF EXISTS order_item_sales_rollup ON order_item;
+    CREATE TRIGGER order_item_sales_rollup
+    AFTER INSERT OR DELETE OR UPDATE ON order_item
+    FOR EACH ROW EXECUTE FUNCTION sales_rollup_mark_order_item();
+    INSERT INTO sales_rollup_dirty (sales_day)
+    SELECT DISTINCT date FROM purchase WHERE status = 'paid' AND date IS NOT NULL
+   ;
+END;
+$$;
@@ -0,0 +1,80 @@
+-- Keep category_price_stats in step with cars (see app/models/category_price_stats.py).
+-- The table is created from the model before migrations run; the stats are
+-- read from ix_cars_category_price (0001_hot_path_indexes.sql).
+
+CREATE OR REPLACE FUNCTION category_price_stats_refresh() RETURNS trigger AS $$
+DECLARE
+    touched INT[];
+BEGIN
+    -- The categories this statement changed: every row of an insert or delete,
+    -- and for an update only the rows whose category or price moved
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT category_id) INTO touched FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT category_id) INTO touched FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT v.category_id) INTO touched
+        FROM old_rows o
+        JOIN new_rows n ON n.car_id = o.car_id
+        CROSS JOIN LATERAL (VALUES (o.category_id), (n.category_id)) AS v(category_id)
+        WHERE o.category_id IS DISTINCT FROM n.category_id OR o.price IS DISTINCT FROM n.price;
+    END IF;
+    IF touched IS NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Lock the rows, in key order so two writers cannot deadlock; the recount
+    -- below then sees every car committed by a writer that held them first
+    INSERT INTO category_price_stats (category_id, car_count, priced_count)
+    SELECT category_id, 0, 0 FROM unnest(touched) AS t(category_id)
+    ON CONFLICT (category_id) DO NOTHING;
+    PERFORM 1 FROM category_price_stats
+    WHERE category_id = ANY(touched)
+    ORDER BY category_id
+    FOR UPDATE;
+    UPDATE category_price_stats s SET
+        car_count = a.car_count,
+        priced_count = a.priced_count,
+        min_price = a.min_price,
+        max_price = a.max_price,
+        median_price = a.median_price
+    FROM (
+        SELECT t.category_id,
+               COUNT(c.car_id) AS car_count,
+               COUNT(c.price) AS priced_count,
+               MIN(c.price) AS min_price,
+               MAX(c.price) AS max_price,
+               CAST(percentile_cont(0.5) WITHIN GROUP (ORDER BY c.price) AS NUMERIC(12, 2)) AS median_price
+        FROM unnest(touched) AS t(category_id)
+        LEFT JOIN cars c ON c.category_id = t.category_id
+        GROUP BY t.category_id
+    ) a
+    WHERE s.category_id = a.category_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger and no column list, so there
+-- are three triggers, and the update one filters out rows whose price held
+DO $$
+BEGIN
+    LOCK TABLE cars IN SHARE ROW EXCLUSIVE MODE;
+    DROP TRIGGER IF EXISTS cars_category_price_stats_insert ON cars;
+    DROP TRIGGER IF EXISTS cars_category_price_stats_update ON cars;
+    DROP TRIGGER IF EXISTS cars_category_price_stats_delete ON cars;
+    CREATE TRIGGER cars_category_price_stats_insert
+    AFTER INSERT ON cars REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_price_stats_refresh();
+    CREATE TRIGGER cars_category_price_stats_update
+    AFTER UPDATE ON cars REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_price_stats_refresh();
+    CREATE TRIGGER cars_category_price_stats_delete
+    AFTER DELETE ON cars REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_price_stats_refresh();
+    DELETE FROM category_price_stats;
+    INSERT INTO category_price_stats (category_id, car_count, priced_count, min_price, max_price, median_price)
+    SELECT category_id, COUNT(*), COUNT(price), MIN(price), MAX(price),
+           CAST(percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS NUMERIC(12, 2))
+    FROM cars
+    GROUP BY category_id;
+END;
+$$;
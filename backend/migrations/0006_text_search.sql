@@ -0,0 +1,33 @@
+-- Text search indexes for /search (see app/search.py). Every index is on an
+-- expression, so PostgreSQL maintains it on write and no table is rewritten
+-- for a new column. Built CONCURRENTLY so cars and reviews stay writable.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- The car document: name (A), model number (B) and the descriptive fields
+-- of generate_car_description (C). 'simple' keeps brand names unstemmed.
+CREATE OR REPLACE FUNCTION car_search_document(
+    manufacturer TEXT, model_name TEXT, modelnum TEXT, year INT, engine_type TEXT, transmission TEXT, color TEXT
+) RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(manufacturer, '') || ' ' || COALESCE(model_name, '')), 'A')
+        || setweight(to_tsvector('simple', COALESCE(modelnum, '')), 'B')
+        || setweight(to_tsvector('simple',
+               COALESCE(year::TEXT, '') || ' ' || COALESCE(engine_type, '') || ' '
+               || COALESCE(transmission, '') || ' ' || COALESCE(color, '')), 'C')
+$$;
+
+-- The lowercased name that the typo-tolerant trigram match compares query words with
+CREATE OR REPLACE FUNCTION car_search_name(manufacturer TEXT, model_name TEXT, modelnum TEXT)
+RETURNS TEXT LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(COALESCE(manufacturer, '') || ' ' || COALESCE(model_name, '') || ' ' || COALESCE(modelnum, ''))
+$$;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_search_document
+ON cars USING GIN (car_search_document(manufacturer, model_name, modelnum, year, engine_type, transmission, color));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_search_name
+ON cars USING GIN (car_search_name(manufacturer, model_name, modelnum) gin_trgm_ops);
+-- Visible review text; the search filters on is_visible, which this predicate matches
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_text_search
+ON reviews USING GIN (to_tsvector('english', COALESCE(review_text, ''))) WHERE is_visible;
+-- Case-insensitive engine type of available cars (/queries/electric-or-hybrid-cars)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cars_available_engine_type ON cars (lower(engine_type)) WHERE available;
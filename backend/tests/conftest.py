@@ -0,0 +1,33 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# The app reads its settings at import, so point it at a throwaway SQLite database first
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='car-api-tests-'), 'test.db')}"
+os.environ["APP_PROFILE"] = "server"
+os.environ["DATABASE_MODE"] = "sync"
+os.environ["HASH_WORKERS"] = "0"
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.migrate import create_tables
+from app.statement_counter import savepoint_engine
+
+@pytest.fixture(scope="session")
+def test_engine():
+    create_tables()
+    return savepoint_engine(engine)
+
+@pytest.fixture
+def db(test_engine):
+    """A Session inside an outer transaction rolled back after the test; its commits only release savepoints."""
+    with test_engine.connect() as conn:
+        transaction = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
@@ -0,0 +1,56 @@
+# tests/test_query_counts.py
+"""The user activity and admin detail views load in a fixed number of queries, however many rows they hold."""
+import pytest
+from sqlalchemy import insert
+
+from app.statement_counter import StatementCounter
+from app.admin import get_order_details, get_purchase_details, get_user_details
+from app.models.category import Category
+from app.models.car import Car
+from app.models.user import User, UserWithActivityResponse, get_user_with_activity
+from app.models.purchase import PurchaseModel
+from app.models.order import Order
+from app.models.review import ReviewModel
+
+def _seed(db, rows: int) -> dict:
+    """A user with `rows` purchases, each reviewed, and `rows` orders on the first purchase."""
+    category_id = db.execute(insert(Category.__table__).values(name="query-count").returning(Category.__table__.c.category_id)).scalar_one()
+    car_id = db.execute(insert(Car.__table__).values(category_id=category_id, modelnum="query-count").returning(Car.__table__.c.car_id)).scalar_one()
+    user_id = db.execute(
+        insert(User.__table__)
+        .values(email="query-count@example.com", username="query-count", password="query-count")
+        .returning(User.__table__.c.user_id)
+    ).scalar_one()
+    purchase_ids = db.execute(
+        insert(PurchaseModel.__table__).returning(PurchaseModel.__table__.c.purchase_id, sort_by_parameter_order=True),
+        [{"user_id": user_id, "amount": 1, "status": "paid"} for _ in range(rows)],
+    ).scalars().all()
+    order_ids = db.execute(
+        insert(Order.__table__).returning(Order.__table__.c.order_id, sort_by_parameter_order=True),
+        [{"purchase_id": purchase_ids[0]} for _ in range(rows)],
+    ).scalars().all()
+    db.execute(
+        insert(ReviewModel.__table__),
+        [{"purchase_id": purchase_id, "car_id": car_id, "user_id": user_id, "rating": 5} for purchase_id in purchase_ids],
+    )
+    db.flush()
+    return {"user_id": user_id, "purchase_id": purchase_ids[0], "order_id": order_ids[0]}
+
+# (view, queries expected, call); each call serializes like its route, so lazy loads in the response count too
+VIEWS = [
+    # User, then one IN query each for reviews and purchases
+    ("GET /users/{id}/all", 3, lambda db, seeded: UserWithActivityResponse.from_orm(get_user_with_activity(db, seeded["user_id"])).dict()),
+    ("GET /admin/users/{id}", 3, lambda db, seeded: get_user_details(seeded["user_id"], db)),
+    # Purchase joined to its user, then one IN query for the orders
+    ("GET /admin/purchases/{id}", 2, lambda db, seeded: get_purchase_details(seeded["purchase_id"], db)),
+    ("GET /admin/orders/{id}", 2, lambda db, seeded: get_order_details(seeded["order_id"], db)),
+]
+
+@pytest.mark.parametrize("rows", [1, 3000])
+@pytest.mark.parametrize("view, expected, call", VIEWS, ids=[view for view, _, _ in VIEWS])
+def test_view_query_count(db, test_engine, rows, view, expected, call):
+    seeded = _seed(db, rows)
+    db.expunge_all()  # nothing left in the identity map from the seed
+    with StatementCounter(test_engine) as counter:
+        call(db, seeded)
+    assert counter.count == expected, counter.statements[:10]
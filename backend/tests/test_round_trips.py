@@ -0,0 +1,50 @@
+# tests/test_round_trips.py
+"""Every create_* helper writes in a fixed number of statements (no refresh SELECT after commit)."""
+import pytest
+
+from app.statement_counter import StatementCounter
+from app.models.category import CategoryCreate, create_category
+from app.models.car import CarCreate, create_car
+from app.models.user import UserCreate, create_user
+from app.models.employee import EmployeeCreate, create_employee
+from app.models.car_inventory import CarInventoryCreate, create_car_inventory
+from app.models.car_inventory_log import CarInventoryLogCreate, create_car_inventory_log
+from app.models.purchase import PurchaseCreate, create_purchase
+from app.models.order import OrderCreate, create_order
+from app.models.order_item import OrderItemCreate, create_order_item
+from app.models.shipping import ShippingCreate, create_shipping
+from app.models.review import ReviewCreate, create_review
+
+# (helper name, data statements expected, call) in foreign-key order; each call sees the earlier results
+STEPS = [
+    ("create_category", 1, lambda db, made: create_category(db, CategoryCreate(name="round-trip"))),
+    # The car and its default inventory row: two INSERTs, one commit
+    ("create_car", 2, lambda db, made: create_car(db, CarCreate(category_id=made["create_category"].category_id, modelnum="round-trip"))),
+    ("create_user", 1, lambda db, made: create_user(db, UserCreate(email="round-trip@example.com", username="round-trip", password="round-trip"))),
+    ("create_employee", 1, lambda db, made: create_employee(db, EmployeeCreate(name="Round Trip", email="round-trip-emp@example.com"))),
+    ("create_car_inventory", 1, lambda db, made: create_car_inventory(db, CarInventoryCreate(car_id=made["create_car"].car_id, quantity=1))),
+    ("create_car_inventory_log", 1, lambda db, made: create_car_inventory_log(db, CarInventoryLogCreate(
+        inventory_id=made["create_car_inventory"].inventory_id, car_id=made["create_car"].car_id, quantity=1))),
+    ("create_purchase", 1, lambda db, made: create_purchase(db, PurchaseCreate(user_id=made["create_user"].user_id, amount=1))),
+    ("create_order", 1, lambda db, made: create_order(db, OrderCreate(purchase_id=made["create_purchase"].purchase_id))),
+    ("create_order_item", 1, lambda db, made: create_order_item(db, OrderItemCreate(
+        order_id=made["create_order"].order_id, car_id=made["create_car"].car_id, quantity=1))),
+    ("create_shipping", 1, lambda db, made: create_shipping(db, ShippingCreate(
+        order_id=made["create_order"].order_id, emp_id=made["create_employee"].emp_id))),
+    # The review plus its car_review_stats upkeep: UPDATE, then INSERT for a car's first review
+    ("create_review", 3, lambda db, made: create_review(db, ReviewCreate(
+        purchase_id=made["create_purchase"].purchase_id, car_id=made["create_car"].car_id,
+        user_id=made["create_user"].user_id, rating=5))),
+]
+
+@pytest.mark.parametrize("position", range(len(STEPS)), ids=[name for name, _, _ in STEPS])
+def test_create_statement_count(db, test_engine, position):
+    made = {}
+    for name, _, call in STEPS[:position]:
+        made[name] = call(db, made)
+    name, expected, call = STEPS[position]
+    with StatementCounter(test_engine) as counter:
+        made[name] = call(db, made)
+    # Plus the one upsert, right before the commit, that bumps the written tables' shared versions
+    assert counter.count == expected + 1, counter.statements
+    assert "INSERT INTO table_versions" in counter.statements[-1]
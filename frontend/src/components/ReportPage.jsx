@@ -2,7 +2,7 @@ import React from 'react';
 import ReportCard from './ReportCard';
 import '../pages/admin/Admin.css';
 
-const ReportPage = ({ title, loading, error, data, renderItem, searchForm }) => {
+const ReportPage = ({ title, loading, error, data, renderItem, searchForm, footer }) => {
   return (
     <div className="admin-page">
       <h1>{title}</h1>
@@ -20,6 +20,7 @@ const ReportPage = ({ title, loading, error, data, renderItem, searchForm }) =>
       ) : (
         !loading && <div className="text-center">No data available.</div>
       )}
+      {footer}
     </div>
   );
 };
@@ -49,6 +49,15 @@ const getCarImage = (manufacturer) => {
   return carImage; // default image
 };
 
+// Reviews load a page at a time: the first with /cars/{id}/page, later ones by cursor
+const REVIEW_PAGE_SIZE = 10;
+
+const toReview = (review) => ({
+  username: review.username || 'Anonymous',
+  review_text: review.review_text || 'No comment',
+  rating: review.rating || 0,
+});
+
 const CarDetail = () => {
   const { carId } = useParams();
   const navigate = useNavigate();
@@ -70,6 +79,8 @@ const CarDetail = () => {
     available: false,
   });
   const [reviews, setReviews] = useState([]);
+  const [reviewsCursor, setReviewsCursor] = useState(null);
+  const [loadingReviews, setLoadingReviews] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [purchaseIdForReview, setPurchaseIdForReview] = useState(null);
@@ -87,23 +98,19 @@ const CarDetail = () => {
         }
 
         console.log('Fetching car data for carId:', carId);
-        const [carResponse, reviewsResponse] = await Promise.all([
-          axios.get(`http://localhost:8000/cars/${carId}/details`).catch(err => {
-            if (err.response?.status === 404) {
-              throw new Error('Car not found. It may have been removed or doesn’t exist.');
-            }
-            throw new Error(`Car API error: ${err.response?.status} ${err.response?.data?.detail || err.message}`);
-          }),
-          axios.get(`http://localhost:8000/reviews/cars/${carId}/reviews`).catch(err => {
-            if (err.response?.status === 404) {
-              return { data: [] }; // Handle missing reviews gracefully
-            }
-            throw new Error(`Reviews API error: ${err.response?.status} ${err.response?.data?.detail || err.message}`);
-          }),
-        ]);
+        // Car, stock, rating, reviews and review eligibility in one request
+        const pageResponse = await axios.get(`http://localhost:8000/cars/${carId}/page`, {
+          // axios leaves out undefined params, so a signed-out view sends no user_id
+          params: { user_id: user?.user_id, review_limit: REVIEW_PAGE_SIZE },
+        }).catch(err => {
+          if (err.response?.status === 404) {
+            throw new Error('Car not found. It may have been removed or doesn’t exist.');
+          }
+          throw new Error(`Car API error: ${err.response?.status} ${err.response?.data?.detail || err.message}`);
+        });
+        const carResponse = { data: pageResponse.data.car };
 
-        console.log('Car Details Response:', carResponse.data);
-        console.log('Reviews Response:', reviewsResponse.data);
+        console.log('Car Page Response:', pageResponse.data);
 
         const carImageResult = getCarImage(carResponse.data.manufacturer);
 
@@ -123,18 +130,10 @@ const CarDetail = () => {
           seatingCapacity: carResponse.data.seating_capacity || 'N/A',
           available: carResponse.data.quantity > 0,
         });
-        setReviews(
-          reviewsResponse.data.map(review => ({
-            username: review.username || 'Anonymous',
-            review_text: review.review_text || 'No comment',
-            rating: review.rating || 0,
-          }))
-        );
+        setReviews(pageResponse.data.reviews.map(toReview));
+        setReviewsCursor(pageResponse.data.reviews_next_cursor);
 
-        if (user) {
-          const purchaseResponse = await axios.get(`http://localhost:8000/users/${user.user_id}/purchase-for-car/${carId}`);
-          setPurchaseIdForReview(purchaseResponse.data.purchase_id);
-        }
+        setPurchaseIdForReview(pageResponse.data.purchase_id);
 
       } catch (err) {
         console.error('Fetch error:', err);
@@ -180,21 +179,36 @@ const CarDetail = () => {
         review_text: reviewText,
       });
       setShowReviewForm(false);
-      // Refresh reviews
-      const reviewsResponse = await axios.get(`http://localhost:8000/reviews/cars/${carId}/reviews`);
-      setReviews(
-        reviewsResponse.data.map((review) => ({
-          username: review.username || 'Anonymous',
-          review_text: review.review_text || 'No comment',
-          rating: review.rating || 0,
-        }))
-      );
+      // Refresh reviews from the first page again, like the initial load
+      const pageResponse = await axios.get(`http://localhost:8000/cars/${carId}/page`, {
+        params: { user_id: user.user_id, review_limit: REVIEW_PAGE_SIZE },
+      });
+      setReviews(pageResponse.data.reviews.map(toReview));
+      setReviewsCursor(pageResponse.data.reviews_next_cursor);
+      setCarDetails(previous => ({ ...previous, rating: pageResponse.data.car.rating || 0 }));
     } catch (error) {
       console.error('Error submitting review:', error);
       setError('Failed to submit review.');
     }
   };
 
+  // The next page continues after the last review shown; X-Next-Cursor is absent after the last page
+  const handleLoadMoreReviews = async () => {
+    setLoadingReviews(true);
+    try {
+      const reviewsResponse = await axios.get(`http://localhost:8000/reviews/cars/${carId}/reviews`, {
+        params: { cursor: reviewsCursor, limit: REVIEW_PAGE_SIZE },
+      });
+      setReviews(previous => [...previous, ...reviewsResponse.data.map(toReview)]);
+      setReviewsCursor(reviewsResponse.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading reviews:', error);
+      setError('Failed to load more reviews.');
+    } finally {
+      setLoadingReviews(false);
+    }
+  };
+
   return (
     <ErrorBoundary>
       <div className="page">
@@ -283,6 +297,11 @@ const CarDetail = () => {
                     </div>
                   ))
                 )}
+                {reviewsCursor && (
+                  <button onClick={handleLoadMoreReviews} disabled={loadingReviews} className="load-more-reviews-button">
+                    {loadingReviews ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
                 {purchaseIdForReview && !showReviewForm && (
                   <button onClick={() => setShowReviewForm(true)} className="write-review-button">Write a Review</button>
                 )}
@@ -440,7 +459,7 @@ const CarDetail = () => {
           .back-button:hover {
             background: #db2777;
           }
-          .write-review-button, .submit-review-button {
+          .write-review-button, .submit-review-button, .load-more-reviews-button {
             background-color: #22d3ee;
             color: #1e293b;
             border: none;
@@ -16,15 +16,10 @@ const Home = () => {
   useEffect(() => {
     const fetchCars = async () => {
       try {
-        const [topRated, newArrivals, budgetFriendly] = await Promise.all([
-          axios.get("http://localhost:8000/cars/top-rated"),
-          axios.get("http://localhost:8000/cars/new-arrivals"),
-          axios.get("http://localhost:8000/cars/budget-friendly"),
-        ]);
-
-        console.log('Top Rated:', topRated.data);
-        console.log('New Arrivals:', newArrivals.data);
-        console.log('Budget Friendly:', budgetFriendly.data);
+        const response = await axios.get("http://localhost:8000/cars/home");
+        const topRated = { data: response.data.top_rated };
+        const newArrivals = { data: response.data.new_arrivals };
+        const budgetFriendly = { data: response.data.budget_friendly };
 
         const formattedData = [
           {
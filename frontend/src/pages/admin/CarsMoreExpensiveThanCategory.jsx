@@ -7,20 +7,23 @@ const CarsMoreExpensiveThanCategory = () => {
     const [categoryId, setCategoryId] = useState('');
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
 
-    const handleSubmit = (e) => {
-        e.preventDefault();
+    // The report is paged; X-Next-Cursor points at the page after the last one loaded
+    const fetchCars = (cursor) => {
         setLoading(true);
         setError(null);
-        fetch(`http://localhost:8000/queries/cars-more-expensive-than-category/${categoryId}`)
+        const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        fetch(`http://localhost:8000/queries/cars-more-expensive-than-category/${categoryId}${params}`)
             .then(response => {
                 if (!response.ok) {
                     throw new Error('Network response was not ok');
                 }
+                setNextCursor(response.headers.get('X-Next-Cursor'));
                 return response.json();
             })
             .then(data => {
-                setCars(data);
+                setCars(previous => (cursor ? [...previous, ...data] : data));
                 setLoading(false);
             })
             .catch(error => {
@@ -29,6 +32,11 @@ const CarsMoreExpensiveThanCategory = () => {
             });
     };
 
+    const handleSubmit = (e) => {
+        e.preventDefault();
+        fetchCars(null);
+    };
+
     const renderCar = (car) => (
         <>
             <h2>{car.model_name}</h2>
@@ -56,6 +64,11 @@ const CarsMoreExpensiveThanCategory = () => {
             data={cars}
             renderItem={renderCar}
             searchForm={searchForm}
+            footer={nextCursor && !loading && (
+                <div className="search-form">
+                    <button onClick={() => fetchCars(nextCursor)}>Load more</button>
+                </div>
+            )}
         />
     );
 };